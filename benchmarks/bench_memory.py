@@ -0,0 +1,127 @@
+"""bytes per defect of the content returned by readKlarf on a synthetic klarf
+
+Defect objects ("objects"), their slotted variant ("compact") and the
+columnar format are measured by default, a format unknown to the reference
+is reported as null.
+
+python benchmarks/bench_memory.py --defects 200000 --reference HEAD~1
+"""
+
+# MODULES
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from bench_parser import ROOT, export_reference
+from synthetic import generate_klarf
+
+MEASURE = """
+import gc, json, sys, tracemalloc
+from klarf_reader.readers.klarf_file_reader import readKlarf
+
+path, defects_format, custom_columns = sys.argv[1], sys.argv[2], json.loads(sys.argv[3])
+gc.collect()
+tracemalloc.start()
+try:
+    klarf_content, _ = readKlarf(
+        klarf=path,
+        defects_format=defects_format,
+        custom_columns_defect=custom_columns or None,
+    )
+except ValueError:
+    # the defects format does not exist in this source
+    print(json.dumps(None))
+    sys.exit()
+gc.collect()
+size, peak = tracemalloc.get_traced_memory()
+print(json.dumps([size, peak]))
+"""
+
+
+def measure(
+    source: Path, klarf: Path, defects_format: str, custom_columns
+) -> Optional[list]:
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            MEASURE,
+            str(klarf),
+            defects_format,
+            json.dumps(custom_columns),
+        ],
+        cwd=source,
+        env={**os.environ, "PYTHONPATH": str(source)},
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    return json.loads(result.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--wafers", type=int, default=1)
+    parser.add_argument("--defects", type=int, default=100_000)
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        default=["objects", "compact", "columnar"],
+        help="defects formats",
+    )
+    parser.add_argument(
+        "--custom-columns",
+        nargs="*",
+        default=["REVIEWSAMPLE"],
+        help="custom defect columns, none to read without custom columns",
+    )
+    parser.add_argument("--reference", help="git reference to compare with")
+    args = parser.parse_args()
+
+    number_of_defects = args.wafers * args.defects
+
+    with tempfile.TemporaryDirectory() as directory:
+        klarf = generate_klarf(
+            path=Path(directory) / "synthetic.klarf",
+            number_of_wafers=args.wafers,
+            number_of_defects=args.defects,
+        )
+
+        sources = {"current": ROOT}
+        if args.reference:
+            sources[args.reference] = export_reference(
+                reference=args.reference,
+                directory=Path(directory) / "reference",
+            )
+
+        results = {}
+        for name, source in sources.items():
+            results[name] = {}
+            for defects_format in args.formats:
+                measures = measure(
+                    source=source,
+                    klarf=klarf,
+                    defects_format=defects_format,
+                    custom_columns=args.custom_columns,
+                )
+                if measures is None:
+                    results[name][defects_format] = None
+                    continue
+
+                size, peak = measures
+                results[name][defects_format] = {
+                    "bytes_per_defect": size / number_of_defects,
+                    "peak_bytes_per_defect": peak / number_of_defects,
+                }
+
+    print(json.dumps({"defects": number_of_defects, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
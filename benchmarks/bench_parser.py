@@ -0,0 +1,100 @@
+"""lines/s of readKlarf on a synthetic klarf
+
+    python benchmarks/bench_parser.py --defects 200000 --reference HEAD~1
+"""
+
+# MODULES
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+from synthetic import generate_klarf
+
+ROOT = Path(__file__).resolve().parents[1]
+
+MEASURE = """
+import json, sys, time
+from klarf_reader.readers.klarf_file_reader import readKlarf
+
+path, repeat = sys.argv[1], int(sys.argv[2])
+timings = []
+for _ in range(repeat):
+    start = time.perf_counter()
+    readKlarf(klarf=path)
+    timings.append(time.perf_counter() - start)
+print(json.dumps(min(timings)))
+"""
+
+
+def measure(source: Path, klarf: Path, repeat: int) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE, str(klarf), str(repeat)],
+        cwd=source,
+        env={**os.environ, "PYTHONPATH": str(source)},
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    return json.loads(result.stdout)
+
+
+def export_reference(reference: str, directory: Path) -> Path:
+    archive = subprocess.run(
+        ["git", "-C", str(ROOT), "archive", reference, "klarf_reader"],
+        check=True,
+        capture_output=True,
+    ).stdout
+    with tarfile.open(fileobj=BytesIO(archive)) as tar:
+        # extraction filters exist since 3.12 and 3.11.4, "data" is the default of 3.14
+        if hasattr(tarfile, "data_filter"):
+            tar.extractall(directory, filter="data")
+        else:
+            tar.extractall(directory)
+
+    return directory
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--wafers", type=int, default=1)
+    parser.add_argument("--defects", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--reference", help="git reference to compare with")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        klarf = generate_klarf(
+            path=Path(directory) / "synthetic.klarf",
+            number_of_wafers=args.wafers,
+            number_of_defects=args.defects,
+        )
+        with open(klarf, "rb") as f:
+            number_of_lines = sum(1 for _ in f)
+
+        sources = {"current": ROOT}
+        if args.reference:
+            sources[args.reference] = export_reference(
+                reference=args.reference,
+                directory=Path(directory) / "reference",
+            )
+
+        results = {}
+        for name, source in sources.items():
+            seconds = measure(source=source, klarf=klarf, repeat=args.repeat)
+            results[name] = {
+                "seconds": seconds,
+                "lines_per_second": number_of_lines / seconds,
+            }
+
+    print(json.dumps({"lines": number_of_lines, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
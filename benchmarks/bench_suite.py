@@ -0,0 +1,187 @@
+"""lines/s, defects/s, peak RSS and time to first wafer of the Klarf entry points on a synthetic klarf
+
+python benchmarks/bench_suite.py --defects 200000 --wafers 4 --reference master --output results.json
+"""
+
+# MODULES
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from bench_parser import ROOT, export_reference
+from synthetic import generate_klarf
+
+SCENARIOS = [
+    "load_from_file",
+    "defects_as_generator",
+    "load_from_file_with_raw_content",
+    "convert_to_single_klarf_content",
+    "iter_wafers",
+]
+
+# each scenario consumes the whole content and returns
+# (number of defects, seconds until the first defect of the first wafer is available)
+MEASURE = """
+import json, resource, sys, time
+from klarf_reader.klarf import Klarf
+from klarf_reader.utils.klarf_convert import convert_to_single_klarf_content
+
+def load_from_file(path, start):
+    content = Klarf.load_from_file(filepath=path)
+    first_wafer = time.perf_counter() - start
+    return sum(len(wafer.defects) for wafer in content.wafers), first_wafer
+
+def defects_as_generator(path, start):
+    content = Klarf.load_from_file(filepath=path, defects_as_generator=True)
+    number_of_defects, first_wafer = 0, None
+    for wafer in content.wafers:
+        for _ in wafer.defects:
+            if first_wafer is None:
+                first_wafer = time.perf_counter() - start
+            number_of_defects += 1
+    return number_of_defects, first_wafer
+
+def load_from_file_with_raw_content(path, start):
+    content, raw_content = Klarf.load_from_file_with_raw_content(filepath=path)
+    first_wafer = time.perf_counter() - start
+    for _ in raw_content:
+        pass
+    return sum(len(wafer.defects) for wafer in content.wafers), first_wafer
+
+def convert_to_single_klarf_content_(path, start):
+    content = Klarf.load_from_file(filepath=path)
+    number_of_defects, first_wafer = 0, None
+    for wafer_index in range(content.number_of_wafers):
+        single_klarf_content = convert_to_single_klarf_content(
+            klarf_content=content, wafer_index=wafer_index
+        )
+        if first_wafer is None:
+            first_wafer = time.perf_counter() - start
+        number_of_defects += len(single_klarf_content.wafer.defects)
+    return number_of_defects, first_wafer
+
+def iter_wafers(path, start):
+    number_of_defects, first_wafer = 0, None
+    for single_klarf_content in Klarf.iter_wafers(filepath=path):
+        if first_wafer is None:
+            first_wafer = time.perf_counter() - start
+        number_of_defects += len(single_klarf_content.wafer.defects)
+    return number_of_defects, first_wafer
+
+scenarios = dict(
+    load_from_file=load_from_file,
+    defects_as_generator=defects_as_generator,
+    load_from_file_with_raw_content=load_from_file_with_raw_content,
+    convert_to_single_klarf_content=convert_to_single_klarf_content_,
+    iter_wafers=iter_wafers,
+)
+
+scenario, path, repeat = sys.argv[1], sys.argv[2], int(sys.argv[3])
+if scenario == "iter_wafers" and not hasattr(Klarf, "iter_wafers"):
+    print(json.dumps(dict(error="not available")))
+    sys.exit()
+
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+timings, first_wafers = [], []
+for _ in range(repeat):
+    start = time.perf_counter()
+    number_of_defects, first_wafer = scenarios[scenario](path, start)
+    timings.append(time.perf_counter() - start)
+    first_wafers.append(first_wafer)
+
+# ru_maxrss is in kilobytes on linux
+print(json.dumps(dict(
+    seconds=min(timings),
+    time_to_first_wafer=min(first_wafers),
+    number_of_defects=number_of_defects,
+    peak_rss=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    peak_rss_before=rss_before * 1024,
+)))
+"""
+
+
+def measure(source: Path, scenario: str, klarf: Path, repeat: int) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE, scenario, str(klarf), str(repeat)],
+        cwd=source,
+        env={**os.environ, "PYTHONPATH": str(source)},
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return dict(error=result.stderr.strip().splitlines()[-1])
+
+    return json.loads(result.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--wafers", type=int, default=1)
+    parser.add_argument("--defects", type=int, default=100_000)
+    parser.add_argument(
+        "--custom-columns", type=int, default=0, help="number of extra columns"
+    )
+    parser.add_argument("--no-summary", action="store_true")
+    parser.add_argument("--sample-test-plan-size", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scenarios", nargs="+", default=SCENARIOS, choices=SCENARIOS)
+    parser.add_argument("--reference", help="git reference to compare with")
+    parser.add_argument("--output", type=Path, help="json file, stdout when missing")
+    args = parser.parse_args()
+
+    settings = dict(
+        number_of_wafers=args.wafers,
+        number_of_defects=args.defects,
+        custom_columns=[f"CUSTOM{index}" for index in range(args.custom_columns)],
+        summary=not args.no_summary,
+        sample_test_plan_size=args.sample_test_plan_size,
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        klarf = generate_klarf(path=Path(directory) / "synthetic.klarf", **settings)
+        with open(klarf, "rb") as f:
+            number_of_lines = sum(1 for _ in f)
+        number_of_bytes = os.path.getsize(klarf)
+
+        sources = {"current": ROOT}
+        if args.reference:
+            sources[args.reference] = export_reference(
+                reference=args.reference,
+                directory=Path(directory) / "reference",
+            )
+
+        results = {}
+        for name, source in sources.items():
+            results[name] = {}
+            for scenario in args.scenarios:
+                result = measure(
+                    source=source, scenario=scenario, klarf=klarf, repeat=args.repeat
+                )
+                if "seconds" in result:
+                    result["lines_per_second"] = number_of_lines / result["seconds"]
+                    result["defects_per_second"] = (
+                        result["number_of_defects"] / result["seconds"]
+                    )
+                results[name][scenario] = result
+
+    output = json.dumps(
+        dict(
+            klarf=dict(settings, lines=number_of_lines, bytes=number_of_bytes),
+            python=sys.version.split()[0],
+            results=results,
+        ),
+        indent=2,
+    )
+
+    if args.output is not None:
+        args.output.write_text(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# MODULES
+import random
+from pathlib import Path
+from typing import List
+
+DEFECT_RECORD_SPEC = [
+    "DEFECTID",
+    "XREL",
+    "YREL",
+    "XINDEX",
+    "YINDEX",
+    "XSIZE",
+    "YSIZE",
+    "DEFECTAREA",
+    "DSIZE",
+    "CLASSNUMBER",
+    "TEST",
+    "CLUSTERNUMBER",
+    "ROUGHBINNUMBER",
+    "FINEBINNUMBER",
+    "REVIEWSAMPLE",
+    "IMAGECOUNT",
+]
+
+
+def generate_klarf(
+    path: Path,
+    number_of_wafers: int = 1,
+    number_of_defects: int = 1000,
+    seed: int = 0,
+    custom_columns: List[str] = None,
+    summary: bool = True,
+    sample_test_plan_size: int = 0,
+) -> Path:
+    """write a synthetic klarf file
+
+    Args:
+        path (Path): the path of the klarf file to write
+        number_of_wafers (int, optional): number of wafers. Defaults to 1.
+        number_of_defects (int, optional): number of defects per wafer. Defaults to 1000.
+        seed (int, optional): seed of the random values. Defaults to 0.
+        custom_columns (List[str], optional): extra DefectRecordSpec columns after the standard ones,
+            alternately holding floats, integers and categorical strings
+        summary (bool, optional): write a SummaryList per wafer. Defaults to True.
+        sample_test_plan_size (int, optional): number of dies of the SampleTestPlan, none when 0. Defaults to 0.
+
+    Returns:
+        Path: the path of the klarf file
+    """
+
+    rand = random.Random(seed)
+    custom_columns = custom_columns or []
+    defect_record_spec = DEFECT_RECORD_SPEC + custom_columns
+
+    with open(path, "w") as f:
+        f.write(
+            "FileVersion 1 1;\n"
+            "FileTimestamp 01-02-23 12:34:56;\n"
+            'InspectionStationID "KLA" "2835" "TOOL1";\n'
+            "SampleType WAFER;\n"
+            "ResultTimestamp 01-02-23 12:35:00;\n"
+            'LotID "LOT1";\n'
+            "SampleSize 1 300;\n"
+            'DeviceID "DEVICE1";\n'
+            'SetupID "SETUP1" 01-02-23 10:00:00;\n'
+            'StepID "STEP1";\n'
+            "SampleOrientationMarkType NOTCH;\n"
+            "OrientationMarkLocation DOWN;\n"
+            "DiePitch 1.0e+04 1.2e+04;\n"
+            "DieOrigin 0.0 0.0;\n"
+        )
+
+        if sample_test_plan_size:
+            f.write(f"SampleTestPlan {sample_test_plan_size}\n")
+            for die_index in range(sample_test_plan_size):
+                end = ";" if die_index == sample_test_plan_size - 1 else ""
+                f.write(f" {die_index % 30} {die_index // 30}{end}\n")
+
+        for wafer_index in range(number_of_wafers):
+            f.write(
+                f'WaferID "W{wafer_index:02d}";\n'
+                f"Slot {wafer_index + 1};\n"
+                "SampleCenterLocation 1.5e+05 1.45e+05;\n"
+                "InspectionTest 1;\n"
+                "AreaPerTest 7.0e+10;\n"
+                f"DefectRecordSpec {len(defect_record_spec)} {' '.join(defect_record_spec)};\n"
+            )
+            # a DefectList without rows is closed on its own record
+            f.write("DefectList\n" if number_of_defects else "DefectList;\n")
+
+            for defect_index in range(number_of_defects):
+                end = ";" if defect_index == number_of_defects - 1 else ""
+                f.write(
+                    f" {defect_index + 1}"
+                    f" {rand.uniform(0, 1e4):.3f} {rand.uniform(0, 1.2e4):.3f}"
+                    f" {rand.randint(0, 29)} {rand.randint(0, 24)}"
+                    f" {rand.uniform(0, 5):.3f} {rand.uniform(0, 5):.3f}"
+                    f" {rand.uniform(0, 25):.4f} {rand.uniform(0, 7):.3f}"
+                    f" {rand.randint(0, 50)} 1 0 {rand.randint(0, 9)}"
+                    f" {rand.randint(0, 99)} 0 1"
+                )
+                for column_index in range(len(custom_columns)):
+                    if column_index % 3 == 0:
+                        f.write(f" {rand.random():.3f}")
+                    elif column_index % 3 == 1:
+                        f.write(f" {rand.randint(0, 999)}")
+                    else:
+                        f.write(f" P{rand.randint(0, 9)}")
+                f.write(f"{end}\n")
+
+            if summary:
+                f.write(
+                    "SummarySpec 5 TESTNO NDEFECT DEFDENSITY NDIE NDEFDIE;\n"
+                    "SummaryList\n"
+                    f" 1 {number_of_defects} 0.5 600 {min(number_of_defects, 600)};\n"
+                )
+
+        f.write("EndOfFile;\n")
+
+    return path
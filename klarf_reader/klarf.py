@@ -1,29 +1,105 @@
 # MODULES
 from pathlib import Path
-from typing import Generator, List, Tuple
+from typing import Callable, Dict, Generator, Iterable, List, Tuple, Union
 
 # MODELS
-from .models.klarf_content import KlarfContent
+from .models.defect_filter import DefectFilter
+from .models.klarf_content import (
+    KlarfContent,
+    KlarfLoadResult,
+    SingleKlarfContent,
+    Wafer,
+)
+from .models.klarf_index import KlarfIndex
+from .models.parse_stats import ParseStats
 
 # READERS
-from .readers import klarf_file_reader
+from .readers import (
+    klarf_batch_reader,
+    klarf_binary_reader,
+    klarf_file_reader,
+    klarf_index_reader,
+    klarf_parallel_reader,
+)
+from .readers.klarf_follower import KlarfFollower
+from .readers.klarf_raw_content import KlarfRawContent
+
+# UTILS
+from .utils.klarf_cache import KlarfCache
 
 
 class Klarf:
     @staticmethod
     def load_from_file(
         filepath: Path,
-        custom_columns_wafer: List[str] = None,
-        custom_columns_defect: List[str] = None,
+        custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+        custom_columns_defect: Union[List[str], Dict[str, type]] = None,
         parse_summary: bool = True,
         defects_as_generator: bool = False,
+        defects_format: str = "objects",
+        engine: str = "python",
+        defect_filter: DefectFilter = None,
+        defect_columns: List[str] = None,
+        cache: KlarfCache = None,
+        stats: ParseStats = None,
+        on_progress: Callable[[int], None] = None,
+        on_wafer: Callable[[Wafer, int], None] = None,
+        workers: int = 1,
     ) -> KlarfContent:
-        klarf_content, _ = Klarf.load_from_file_with_raw_content(
-            filepath=filepath,
+        has_hooks = stats is not None or on_progress is not None or on_wafer is not None
+
+        if cache is not None:
+            if defects_as_generator:
+                raise ValueError("defects_as_generator can not be used with a cache")
+
+            if has_hooks:
+                raise ValueError("parse stats and hooks can not be used with a cache")
+
+            if workers != 1:
+                raise ValueError("workers can not be used with a cache")
+
+            return cache.load(
+                filepath=filepath,
+                custom_columns_wafer=custom_columns_wafer,
+                custom_columns_defect=custom_columns_defect,
+                parse_summary=parse_summary,
+                defects_format=defects_format,
+                engine=engine,
+                defect_filter=defect_filter,
+                defect_columns=defect_columns,
+            )
+
+        if workers != 1:
+            if has_hooks:
+                raise ValueError("parse stats and hooks can not be used with workers")
+
+            return klarf_parallel_reader.readKlarfParallel(
+                klarf=filepath,
+                workers=workers,
+                custom_columns_wafer=custom_columns_wafer,
+                custom_columns_defect=custom_columns_defect,
+                parse_summary=parse_summary,
+                defects_as_generator=defects_as_generator,
+                defects_format=defects_format,
+                engine=engine,
+                defect_filter=defect_filter,
+                defect_columns=defect_columns,
+            )
+
+        klarf_content, _ = klarf_file_reader.readKlarf(
+            klarf=filepath,
             custom_columns_wafer=custom_columns_wafer,
             custom_columns_defect=custom_columns_defect,
             parse_summary=parse_summary,
             defects_as_generator=defects_as_generator,
+            defects_format=defects_format,
+            engine=engine,
+            defect_filter=defect_filter,
+            defect_columns=defect_columns,
+            stats=stats,
+            on_progress=on_progress,
+            on_wafer=on_wafer,
+            with_raw_content=False,
         )
 
         return klarf_content
@@ -31,17 +107,204 @@ class Klarf:
     @staticmethod
     def load_from_file_with_raw_content(
         filepath: Path,
-        custom_columns_wafer: List[str] = None,
-        custom_columns_defect: List[str] = None,
+        custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+        custom_columns_defect: Union[List[str], Dict[str, type]] = None,
         parse_summary: bool = True,
         defects_as_generator: bool = False,
-    ) -> Tuple[KlarfContent, Generator[str, None, None],]:
+        defects_format: str = "objects",
+        engine: str = "python",
+        defect_filter: DefectFilter = None,
+        defect_columns: List[str] = None,
+        stats: ParseStats = None,
+        on_progress: Callable[[int], None] = None,
+        on_wafer: Callable[[Wafer, int], None] = None,
+    ) -> Tuple[KlarfContent, KlarfRawContent,]:
         return klarf_file_reader.readKlarf(
             klarf=filepath,
             custom_columns_wafer=custom_columns_wafer,
             custom_columns_defect=custom_columns_defect,
             parse_summary=parse_summary,
             defects_as_generator=defects_as_generator,
+            defects_format=defects_format,
+            engine=engine,
+            defect_filter=defect_filter,
+            defect_columns=defect_columns,
+            stats=stats,
+            on_progress=on_progress,
+            on_wafer=on_wafer,
+        )
+
+    @staticmethod
+    def load_many(
+        filepaths: Iterable[Path],
+        workers: int = None,
+        ordered: bool = True,
+        max_in_flight: int = None,
+        custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+        custom_columns_defect: Union[List[str], Dict[str, type]] = None,
+        parse_summary: bool = True,
+        defects_as_generator: bool = False,
+        defects_format: str = "objects",
+        engine: str = "python",
+        defect_filter: DefectFilter = None,
+        defect_columns: List[str] = None,
+    ) -> Generator[KlarfLoadResult, None, None]:
+        return klarf_batch_reader.iterKlarfs(
+            klarfs=filepaths,
+            workers=workers,
+            ordered=ordered,
+            max_in_flight=max_in_flight,
+            custom_columns_wafer=custom_columns_wafer,
+            custom_columns_defect=custom_columns_defect,
+            parse_summary=parse_summary,
+            defects_as_generator=defects_as_generator,
+            defects_format=defects_format,
+            engine=engine,
+            defect_filter=defect_filter,
+            defect_columns=defect_columns,
+        )
+
+    @staticmethod
+    def load_header(
+        filepath: Path,
+        custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+        parse_summary: bool = True,
+    ) -> KlarfContent:
+        return Klarf.load_from_file(
+            filepath=filepath,
+            custom_columns_wafer=custom_columns_wafer,
+            parse_summary=parse_summary,
+            defects_format="skip",
+        )
+
+    @staticmethod
+    def load_index(filepath: Path, persist: bool = False) -> KlarfIndex:
+        return klarf_index_reader.readKlarfIndex(klarf=filepath, persist=persist)
+
+    @staticmethod
+    def load_wafer(
+        filepath: Path,
+        wafer_id: str,
+        index: KlarfIndex = None,
+        persist_index: bool = False,
+        custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+        custom_columns_defect: Union[List[str], Dict[str, type]] = None,
+        parse_summary: bool = True,
+        defects_format: str = "objects",
+        engine: str = "python",
+        defect_filter: DefectFilter = None,
+        defect_columns: List[str] = None,
+    ) -> SingleKlarfContent:
+        return klarf_index_reader.readKlarfWafer(
+            klarf=filepath,
+            wafer_id=wafer_id,
+            index=index,
+            persist_index=persist_index,
+            custom_columns_wafer=custom_columns_wafer,
+            custom_columns_defect=custom_columns_defect,
+            parse_summary=parse_summary,
+            defects_format=defects_format,
+            engine=engine,
+            defect_filter=defect_filter,
+            defect_columns=defect_columns,
+        )
+
+    @staticmethod
+    def load_binary(filepath: Path, defects_format: str = "columnar") -> KlarfContent:
+        return klarf_binary_reader.readKlarfBinary(
+            path=filepath, defects_format=defects_format
+        )
+
+    @staticmethod
+    def load_from_bytes(
+        data: bytes,
+        custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+        custom_columns_defect: Union[List[str], Dict[str, type]] = None,
+        parse_summary: bool = True,
+        defects_as_generator: bool = False,
+        defects_format: str = "objects",
+        engine: str = "python",
+        defect_filter: DefectFilter = None,
+        defect_columns: List[str] = None,
+    ) -> KlarfContent:
+        return klarf_file_reader.readKlarfBuffer(
+            buffer=data,
+            custom_columns_wafer=custom_columns_wafer,
+            custom_columns_defect=custom_columns_defect,
+            parse_summary=parse_summary,
+            defects_as_generator=defects_as_generator,
+            defects_format=defects_format,
+            engine=engine,
+            defect_filter=defect_filter,
+            defect_columns=defect_columns,
+        )
+
+    @staticmethod
+    def load_from_buffer(
+        buffer: memoryview,
+        custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+        custom_columns_defect: Union[List[str], Dict[str, type]] = None,
+        parse_summary: bool = True,
+        defects_as_generator: bool = False,
+        defects_format: str = "objects",
+        engine: str = "python",
+        defect_filter: DefectFilter = None,
+        defect_columns: List[str] = None,
+    ) -> KlarfContent:
+        return klarf_file_reader.readKlarfBuffer(
+            buffer=buffer,
+            custom_columns_wafer=custom_columns_wafer,
+            custom_columns_defect=custom_columns_defect,
+            parse_summary=parse_summary,
+            defects_as_generator=defects_as_generator,
+            defects_format=defects_format,
+            engine=engine,
+            defect_filter=defect_filter,
+            defect_columns=defect_columns,
+        )
+
+    @staticmethod
+    def iter_wafers(
+        filepath: Path,
+        custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+        custom_columns_defect: Union[List[str], Dict[str, type]] = None,
+        parse_summary: bool = True,
+        defects_format: str = "objects",
+        engine: str = "python",
+        defect_filter: DefectFilter = None,
+        defect_columns: List[str] = None,
+    ) -> Generator[SingleKlarfContent, None, None]:
+        return klarf_file_reader.iterKlarf(
+            klarf=filepath,
+            custom_columns_wafer=custom_columns_wafer,
+            custom_columns_defect=custom_columns_defect,
+            parse_summary=parse_summary,
+            defects_format=defects_format,
+            engine=engine,
+            defect_filter=defect_filter,
+            defect_columns=defect_columns,
+        )
+
+    @staticmethod
+    def follow(
+        filepath: Path,
+        custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+        custom_columns_defect: Union[List[str], Dict[str, type]] = None,
+        parse_summary: bool = True,
+        defects_format: str = "objects",
+        engine: str = "python",
+        defect_filter: DefectFilter = None,
+        defect_columns: List[str] = None,
+    ) -> KlarfFollower:
+        return KlarfFollower(
+            klarf=filepath,
+            custom_columns_wafer=custom_columns_wafer,
+            custom_columns_defect=custom_columns_defect,
+            parse_summary=parse_summary,
+            defects_format=defects_format,
+            engine=engine,
+            defect_filter=defect_filter,
+            defect_columns=defect_columns,
         )
 
     def __repr__(self):
@@ -0,0 +1,258 @@
+# MODULES
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+
+# UTILS
+from ..utils.numba_utils import jit
+
+
+@dataclass
+class DefectCluster:
+    label: int
+    number_of_defects: int
+    x_min: float
+    y_min: float
+    x_max: float
+    y_max: float
+
+    @property
+    def area(self) -> float:
+        """area of the bounding box of the defects of the cluster"""
+
+        return (self.x_max - self.x_min) * (self.y_max - self.y_min)
+
+
+@dataclass
+class DefectClusters:
+    """result of a density based clustering of the defects of a wafer
+
+    labels holds the cluster of each defect (in the order of the defects),
+    -1 for noise. Clusters are numbered in the order of their first defect.
+    """
+
+    labels: np.ndarray
+    clusters: List[DefectCluster] = field(default_factory=lambda: [])
+
+    @property
+    def number_of_clusters(self) -> int:
+        return len(self.clusters)
+
+
+@jit
+def _find_root(parents: np.ndarray, point: int) -> int:
+    root = point
+    while parents[root] != root:
+        root = parents[root]
+
+    while parents[point] != root:
+        parents[point], point = root, parents[point]
+
+    return root
+
+
+@jit
+def _cluster_grid(
+    x: np.ndarray,
+    y: np.ndarray,
+    cell_keys: np.ndarray,
+    cell_starts: np.ndarray,
+    cell_columns: np.ndarray,
+    cell_rows: np.ndarray,
+    number_of_rows: int,
+    eps: float,
+    min_pts: int,
+) -> np.ndarray:
+    # points are sorted by cell: the points of cell_keys[c] are cell_starts[c]:cell_starts[c + 1]
+    size = x.shape[0]
+    squared_eps = eps * eps
+    number_of_cells = cell_keys.shape[0]
+
+    # neighbor cells of each cell, -1 when they have no point
+    neighbors = np.full((number_of_cells, 9), -1, np.int64)
+    for cell in range(number_of_cells):
+        neighbor = 0
+        for column in range(cell_columns[cell] - 1, cell_columns[cell] + 2):
+            for row in range(cell_rows[cell] - 1, cell_rows[cell] + 2):
+                if column < 0 or row < 0 or row >= number_of_rows:
+                    continue
+
+                key = column * number_of_rows + row
+                position = np.searchsorted(cell_keys, key)
+                if position < number_of_cells and cell_keys[position] == key:
+                    neighbors[cell, neighbor] = position
+                    neighbor += 1
+
+    point_cells = np.empty(size, np.int64)
+    for cell in range(number_of_cells):
+        for point in range(cell_starts[cell], cell_starts[cell + 1]):
+            point_cells[point] = cell
+
+    # core points have at least min_pts points at a distance lower or equal to eps, themselves included
+    is_core = np.zeros(size, np.bool_)
+    for point in range(size):
+        count = 0
+        for neighbor in neighbors[point_cells[point]]:
+            if neighbor < 0:
+                break
+            for other in range(cell_starts[neighbor], cell_starts[neighbor + 1]):
+                dx = x[point] - x[other]
+                dy = y[point] - y[other]
+                if dx * dx + dy * dy <= squared_eps:
+                    count += 1
+        is_core[point] = count >= min_pts
+
+    # core points closer than eps are in the same cluster
+    parents = np.arange(size)
+    for point in range(size):
+        if not is_core[point]:
+            continue
+        for neighbor in neighbors[point_cells[point]]:
+            if neighbor < 0:
+                break
+            for other in range(cell_starts[neighbor], cell_starts[neighbor + 1]):
+                if other <= point or not is_core[other]:
+                    continue
+                dx = x[point] - x[other]
+                dy = y[point] - y[other]
+                if dx * dx + dy * dy <= squared_eps:
+                    root, other_root = _find_root(parents, point), _find_root(
+                        parents, other
+                    )
+                    if root != other_root:
+                        parents[max(root, other_root)] = min(root, other_root)
+
+    # border points join the cluster of their first core neighbor, the others are noise
+    roots = np.full(size, -1, np.int64)
+    for point in range(size):
+        if is_core[point]:
+            roots[point] = _find_root(parents, point)
+            continue
+
+        closest_core = size
+        for neighbor in neighbors[point_cells[point]]:
+            if neighbor < 0:
+                break
+            for other in range(cell_starts[neighbor], cell_starts[neighbor + 1]):
+                if not is_core[other] or other >= closest_core:
+                    continue
+                dx = x[point] - x[other]
+                dy = y[point] - y[other]
+                if dx * dx + dy * dy <= squared_eps:
+                    closest_core = other
+        if closest_core < size:
+            roots[point] = _find_root(parents, closest_core)
+
+    return roots
+
+
+def _get_cells(values: np.ndarray, eps: float) -> np.ndarray:
+    # cells more than one apart are brought two apart: neighbor cells stay neighbors and cells
+    # are lower than twice the number of points, so that cell keys can not overflow int64
+    cells, inverse = np.unique((values - values.min()) // eps, return_inverse=True)
+    steps = np.minimum(np.diff(cells), 2).astype(np.int64)
+
+    return np.concatenate(([0], np.cumsum(steps)))[inverse]
+
+
+def get_defect_clusters(
+    x: np.ndarray, y: np.ndarray, eps: float, min_pts: int = 5
+) -> DefectClusters:
+    """cluster points with DBSCAN using a grid hash
+
+    The points are hashed in square cells of side eps, empty rows and columns
+    of cells being collapsed, the neighbors of a point are only searched in
+    the 3x3 cells around its own one, which makes
+    the clustering close to linear in the number of points for a given
+    density. Border points reachable from several clusters join the cluster
+    of their first core neighbor in the order of the sorted cells. Points
+    without finite coordinates are noise.
+
+    Args:
+        x (np.ndarray): the x coordinates
+        y (np.ndarray): the y coordinates
+        eps (float): the maximum distance between two neighbors
+        min_pts (int, optional): the minimum number of neighbors of a core point, itself included. Defaults to 5.
+
+    Returns:
+        DefectClusters: the labels of the points and the summary of each cluster
+    """
+
+    if not eps > 0:
+        raise ValueError(f"eps not valid (current={eps} | accepted=eps > 0)")
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    labels = np.full(len(x), -1, dtype=np.int64)
+
+    indexed = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if not len(indexed):
+        return DefectClusters(labels=labels)
+
+    columns = _get_cells(values=x[indexed], eps=eps)
+    rows = _get_cells(values=y[indexed], eps=eps)
+    number_of_rows = int(rows.max()) + 1
+    keys = columns * number_of_rows + rows
+
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    cell_keys, cell_starts = np.unique(sorted_keys, return_index=True)
+    cell_starts = np.append(cell_starts, len(sorted_keys))
+
+    roots = _cluster_grid(
+        x[indexed][order],
+        y[indexed][order],
+        cell_keys,
+        cell_starts,
+        cell_keys // number_of_rows,
+        cell_keys % number_of_rows,
+        number_of_rows,
+        float(eps),
+        int(min_pts),
+    )
+
+    positions = indexed[order]
+    clustered = roots >= 0
+    labels[positions[clustered]] = roots[clustered]
+
+    # clusters are numbered in the order of their first defect
+    clustered_positions = np.flatnonzero(labels >= 0)
+    if not len(clustered_positions):
+        return DefectClusters(labels=labels)
+
+    unique_roots, first_positions, inverse = np.unique(
+        labels[clustered_positions], return_index=True, return_inverse=True
+    )
+    numbers = np.empty(len(unique_roots), dtype=np.int64)
+    numbers[np.argsort(first_positions, kind="stable")] = np.arange(len(unique_roots))
+    labels[clustered_positions] = numbers[inverse]
+
+    cluster_order = np.argsort(labels[clustered_positions], kind="stable")
+    sorted_positions = clustered_positions[cluster_order]
+    counts = np.bincount(labels[sorted_positions])
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    cluster_x, cluster_y = x[sorted_positions], y[sorted_positions]
+
+    return DefectClusters(
+        labels=labels,
+        clusters=[
+            DefectCluster(
+                label=label,
+                number_of_defects=number_of_defects,
+                x_min=x_min,
+                y_min=y_min,
+                x_max=x_max,
+                y_max=y_max,
+            )
+            for label, (number_of_defects, x_min, y_min, x_max, y_max) in enumerate(
+                zip(
+                    counts.tolist(),
+                    np.minimum.reduceat(cluster_x, starts).tolist(),
+                    np.minimum.reduceat(cluster_y, starts).tolist(),
+                    np.maximum.reduceat(cluster_x, starts).tolist(),
+                    np.maximum.reduceat(cluster_y, starts).tolist(),
+                )
+            )
+        ],
+    )
@@ -0,0 +1,113 @@
+# MODULES
+from dataclasses import dataclass
+from typing import Dict, Tuple, Union
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class DefectFilter:
+    """declarative condition on the defects to keep while parsing
+
+    Every condition that is set must be met, bounds are inclusive.
+    bounding_box is (x_min, y_min, x_max, y_max) on the converted coordinates
+    (Defect.point). By default rows are evaluated one at a time, right after
+    they are tokenized, and rejected rows are never converted to Defect. With
+    vectorized, the whole DefectList block is converted to columns and
+    filtered with numpy, which is always the case with the numba engine.
+    """
+
+    class_numbers: Tuple[int, ...] = None
+    test_ids: Tuple[int, ...] = None
+    min_d_size: float = None
+    max_d_size: float = None
+    bounding_box: Tuple[float, float, float, float] = None
+    vectorized: bool = False
+
+    def __post_init__(self):
+        # tuples keep the filter hashable (cache keys, pickling)
+        for name in ("class_numbers", "test_ids", "bounding_box"):
+            value = getattr(self, name)
+            if value is not None:
+                object.__setattr__(self, name, tuple(value))
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """names of the Defect attributes needed to evaluate the filter, x and y excluded"""
+
+        fields = []
+        if self.class_numbers is not None:
+            fields.append("class_number")
+        if self.test_ids is not None:
+            fields.append("test_id")
+        if self.min_d_size is not None or self.max_d_size is not None:
+            fields.append("d_size")
+        if self.bounding_box is not None:
+            fields.extend(["x_rel", "y_rel", "x_index", "y_index"])
+
+        return tuple(fields)
+
+    def matches(self, values: Dict[str, Union[int, float]]) -> bool:
+        """evaluate the filter on one defect
+
+        Args:
+            values (Dict[str, Union[int, float]]): the values of the fields, with x and y
+                when bounding_box is set
+
+        Returns:
+            bool: True if the defect is kept
+        """
+
+        if (
+            self.class_numbers is not None
+            and values["class_number"] not in self.class_numbers
+        ):
+            return False
+
+        if self.test_ids is not None and values["test_id"] not in self.test_ids:
+            return False
+
+        if self.min_d_size is not None and not values["d_size"] >= self.min_d_size:
+            return False
+
+        if self.max_d_size is not None and not values["d_size"] <= self.max_d_size:
+            return False
+
+        if self.bounding_box is not None:
+            x_min, y_min, x_max, y_max = self.bounding_box
+            if not (x_min <= values["x"] <= x_max and y_min <= values["y"] <= y_max):
+                return False
+
+        return True
+
+    def get_mask(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """evaluate the filter on whole columns
+
+        Args:
+            columns (Dict[str, np.ndarray]): the values per column, with x and y
+                when bounding_box is set
+
+        Returns:
+            np.ndarray: True for the defects that are kept
+        """
+
+        mask = np.ones(len(columns["id"]), dtype=np.bool_)
+
+        if self.class_numbers is not None:
+            mask &= np.isin(columns["class_number"], self.class_numbers)
+
+        if self.test_ids is not None:
+            mask &= np.isin(columns["test_id"], self.test_ids)
+
+        if self.min_d_size is not None:
+            mask &= columns["d_size"] >= self.min_d_size
+
+        if self.max_d_size is not None:
+            mask &= columns["d_size"] <= self.max_d_size
+
+        if self.bounding_box is not None:
+            x_min, y_min, x_max, y_max = self.bounding_box
+            mask &= (columns["x"] >= x_min) & (columns["x"] <= x_max)
+            mask &= (columns["y"] >= y_min) & (columns["y"] <= y_max)
+
+        return mask
@@ -0,0 +1,269 @@
+# MODULES
+import sys
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Collection, Dict, Iterator, List, Union
+
+import numpy as np
+
+# MODELS
+from .klarf_content import Defect
+
+# (table column, is integer, is required) for each DefectRecordSpec column
+RAW_DEFECT_COLUMNS = {
+    "DEFECTID": ("id", True, True),
+    "XREL": ("x_rel", False, True),
+    "YREL": ("y_rel", False, True),
+    "XINDEX": ("x_index", True, True),
+    "YINDEX": ("y_index", True, True),
+    "XSIZE": ("x_size", False, True),
+    "YSIZE": ("y_size", False, True),
+    "DEFECTAREA": ("area", False, True),
+    "DSIZE": ("d_size", False, True),
+    "CLASSNUMBER": ("class_number", True, True),
+    "TEST": ("test_id", True, True),
+    "CLUSTERNUMBER": ("cluster_number", True, False),
+    "ROUGHBINNUMBER": ("roughbin", True, False),
+    "FINEBINNUMBER": ("finebin", True, False),
+    "IMAGECOUNT": ("image_count", True, False),
+}
+
+DEFECT_TABLE_COLUMNS = {
+    "id": np.int64,
+    "x_rel": np.float64,
+    "y_rel": np.float64,
+    "x_index": np.int64,
+    "y_index": np.int64,
+    "x_size": np.float64,
+    "y_size": np.float64,
+    "area": np.float64,
+    "d_size": np.float64,
+    "class_number": np.int64,
+    "test_id": np.int64,
+    "cluster_number": np.int64,
+    "image_count": np.int64,
+    "roughbin": np.int64,
+    "finebin": np.int64,
+    "x": np.float64,
+    "y": np.float64,
+}
+
+# array dtype of each type of a custom column schema, strings are kept as objects
+# so that the interned values are shared instead of copied in fixed-size cells
+CUSTOM_COLUMN_DTYPES = {
+    int: np.int64,
+    float: np.float64,
+    str: object,
+}
+
+# columns needed to compute x and y
+COORDINATE_COLUMNS = ("x_rel", "y_rel", "x_index", "y_index")
+
+
+@dataclass
+class DefectTable:
+    """structure-of-arrays storage of the defects of a wafer
+
+    Each attribute of Defect is stored as a numpy array, x and y hold the
+    converted coordinates (Defect.point). Defect objects are only built when
+    the table is indexed with an integer or iterated. Columns left out by a
+    projection (defect_columns) are None, like the matching Defect attributes.
+    Custom columns hold strings, or the dtype of their type in a custom
+    column schema (CUSTOM_COLUMN_DTYPES).
+    """
+
+    id: np.ndarray
+    x_rel: np.ndarray
+    y_rel: np.ndarray
+    x_index: np.ndarray
+    y_index: np.ndarray
+    x_size: np.ndarray
+    y_size: np.ndarray
+    area: np.ndarray
+    d_size: np.ndarray
+    class_number: np.ndarray
+    test_id: np.ndarray
+    cluster_number: np.ndarray
+    image_count: np.ndarray
+    roughbin: np.ndarray
+    finebin: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    custom_attribute: Dict[str, np.ndarray] = field(default_factory=lambda: {})
+
+    @classmethod
+    def from_columns(
+        cls,
+        columns: Dict[str, Union[List, np.ndarray]],
+        custom_attribute: Dict[str, Union[List, np.ndarray]] = None,
+        projection: Collection[str] = None,
+    ) -> "DefectTable":
+        """build a table from the values of each column
+
+        Args:
+            columns (Dict[str, Union[List, np.ndarray]]): values per column of DEFECT_TABLE_COLUMNS,
+                missing columns are filled with 0
+            custom_attribute (Dict[str, Union[List, np.ndarray]], optional): values per custom column,
+                lists are stored as strings and arrays as they are
+            projection (Collection[str], optional): the columns of the table, the other ones are None
+
+        Returns:
+            DefectTable: the table
+        """
+
+        size = len(columns["id"]) if "id" in columns else 0
+
+        return cls(
+            **{
+                column: (
+                    None
+                    if projection is not None and column not in projection
+                    else (
+                        np.asarray(columns[column], dtype=dtype)
+                        if column in columns
+                        else np.zeros(size, dtype=dtype)
+                    )
+                )
+                for column, dtype in DEFECT_TABLE_COLUMNS.items()
+            },
+            custom_attribute={
+                column: (
+                    values
+                    if isinstance(values, np.ndarray)
+                    else np.array(values, dtype=str)
+                )
+                for column, values in (custom_attribute or {}).items()
+            },
+        )
+
+    @property
+    def point(self) -> np.ndarray:
+        if self.x is None or self.y is None:
+            return None
+
+        return np.column_stack((self.x, self.y))
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def __getitem__(self, index: Union[int, slice, np.ndarray]):
+        if isinstance(index, (int, np.integer)):
+            return self._get_defect_getter()(index)
+
+        return DefectTable(
+            **{
+                column: values[index] if values is not None else None
+                for column, values in self._get_columns().items()
+            },
+            custom_attribute={
+                column: values[index]
+                for column, values in self.custom_attribute.items()
+            },
+        )
+
+    def __iter__(self) -> Iterator[Defect]:
+        get_defect = self._get_defect_getter()
+        for index in range(len(self)):
+            yield get_defect(index)
+
+    def to_list(self, defect_class: type = Defect) -> List[Defect]:
+        """build an object for each defect
+
+        Args:
+            defect_class (type, optional): Defect, or SlottedDefect for the "compact" format. Defaults to Defect.
+
+        Returns:
+            List[Defect]: the defects in the order of the table
+        """
+
+        get_defect = self._get_defect_getter(defect_class=defect_class)
+
+        return [get_defect(index) for index in range(len(self))]
+
+    def _get_columns(self) -> Dict[str, np.ndarray]:
+        return {column: getattr(self, column) for column in DEFECT_TABLE_COLUMNS}
+
+    def _get_defect_getter(
+        self, defect_class: type = Defect
+    ) -> Callable[[int], Defect]:
+        columns = self._get_columns()
+        if all(values is not None for values in columns.values()):
+            return partial(self._get_defect, defect_class=defect_class)
+
+        # columns left out by a projection give None attributes
+        x, y = columns.pop("x"), columns.pop("y")
+        converted_columns = [
+            (column, values, int if values.dtype.kind == "i" else float)
+            for column, values in columns.items()
+            if values is not None
+        ]
+        missing_columns = {
+            column: None for column, values in columns.items() if values is None
+        }
+
+        def get_defect(index: int) -> Defect:
+            return defect_class(
+                **{
+                    column: convert(values[index])
+                    for column, values, convert in converted_columns
+                },
+                **missing_columns,
+                point=(
+                    (float(x[index]), float(y[index]))
+                    if x is not None and y is not None
+                    else None
+                ),
+                custom_attribute=self._get_custom_attribute(index),
+            )
+
+        return get_defect
+
+    def _get_defect(self, index: int, defect_class: type = Defect) -> Defect:
+        return defect_class(
+            id=int(self.id[index]),
+            x_rel=float(self.x_rel[index]),
+            y_rel=float(self.y_rel[index]),
+            x_index=int(self.x_index[index]),
+            y_index=int(self.y_index[index]),
+            x_size=float(self.x_size[index]),
+            y_size=float(self.y_size[index]),
+            area=float(self.area[index]),
+            d_size=float(self.d_size[index]),
+            class_number=int(self.class_number[index]),
+            test_id=int(self.test_id[index]),
+            cluster_number=int(self.cluster_number[index]),
+            image_count=int(self.image_count[index]),
+            roughbin=int(self.roughbin[index]),
+            finebin=int(self.finebin[index]),
+            point=(float(self.x[index]), float(self.y[index])),
+            custom_attribute=self._get_custom_attribute(index),
+        )
+
+    def _get_custom_attribute(self, index: int) -> Dict[str, Any]:
+        # no dict without custom columns, strings are interned like in the parser
+        if not self.custom_attribute:
+            return None
+
+        custom_attribute = {}
+        for column, values in self.custom_attribute.items():
+            value = values.item(index)
+            custom_attribute[column] = (
+                sys.intern(value) if isinstance(value, str) else value
+            )
+
+        return custom_attribute
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, DefectTable):
+            return NotImplemented
+
+        if self.custom_attribute.keys() != other.custom_attribute.keys():
+            return False
+
+        return all(
+            np.array_equal(getattr(self, column), getattr(other, column))
+            for column in DEFECT_TABLE_COLUMNS
+        ) and all(
+            np.array_equal(values, other.custom_attribute[column])
+            for column, values in self.custom_attribute.items()
+        )
@@ -1,6 +1,19 @@
-from typing import Any, Dict, Generator, List, Tuple, Union
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Generator, List, Tuple, Union
 from dataclasses import dataclass, field
 
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .defect_clusters import DefectClusters
+    from .defect_table import DefectTable
+    from .spatial_index import SpatialIndex
+    from .wafer_stats import DieMap, WaferStats
+
+# compact models have no instance __dict__ (frozen slotted dataclasses can be pickled since 3.11)
+SLOTS = dict(slots=True) if sys.version_info >= (3, 11) else {}
+
 
 @dataclass
 class SetupId:
@@ -26,6 +39,22 @@ class SampleCenterLocation:
     y: float
 
 
+@dataclass(frozen=True, **SLOTS)
+class FrozenDieOrigin:
+    """DieOrigin of the "compact" defects format, shared between equal records"""
+
+    x: float
+    y: float
+
+
+@dataclass(frozen=True, **SLOTS)
+class FrozenSampleCenterLocation:
+    """SampleCenterLocation of the "compact" defects format, shared between equal records"""
+
+    x: float
+    y: float
+
+
 @dataclass
 class SamplePlanTest:
     x: List[int] = field(default_factory=lambda: [])
@@ -53,6 +82,29 @@ class Defect:
     custom_attribute: Dict[str, any] = None
 
 
+@dataclass(**SLOTS)
+class SlottedDefect:
+    """Defect without instance __dict__, the defects of the "compact" format"""
+
+    id: int
+    x_rel: float
+    y_rel: float
+    x_index: int
+    y_index: int
+    x_size: float
+    y_size: float
+    area: float
+    d_size: float
+    class_number: int
+    test_id: int
+    cluster_number: int
+    image_count: int
+    roughbin: int
+    finebin: int
+    point: Tuple[float, float] = field(default_factory=lambda: [])
+    custom_attribute: Dict[str, any] = None
+
+
 @dataclass
 class Summary:
     defect_density: float = None
@@ -82,13 +134,219 @@ class Wafer:
     slot: int
     die_origin: DieOrigin
     sample_center_location: SampleCenterLocation
-    defects: Union[List[Defect], Generator[Defect, Any, None]] = field(
+    defects: Union[List[Defect], Generator[Defect, Any, None], "DefectTable"] = field(
         default_factory=lambda: []
     )
     tests: List[Test] = field(default_factory=lambda: [])
     custom_attribute: Dict[str, any] = None
     summary: Summary = None
 
+    @property
+    def spatial_index(self) -> "SpatialIndex":
+        """grid index of the defect points, built on first use
+
+        It is built again when defects is replaced, not when it is modified in place.
+        """
+
+        from .spatial_index import SpatialIndex
+
+        # the cache is not a field, asdict / astuple / fields do not see it
+        spatial_index = getattr(self, "_spatial_index", None)
+        if spatial_index is None or spatial_index[0] is not self.defects:
+            spatial_index = (
+                self.defects,
+                SpatialIndex.from_defects(defects=self.defects),
+            )
+            object.__setattr__(self, "_spatial_index", spatial_index)
+
+        return spatial_index[1]
+
+    def defects_in_box(
+        self, x_min: float, y_min: float, x_max: float, y_max: float
+    ) -> Union[List[Defect], "DefectTable"]:
+        """get the defects whose point is inside a rectangle, bounds included
+
+        Returns:
+            Union[List[Defect], DefectTable]: the defects in file order, in the format of defects
+        """
+
+        return self._select_defects(
+            positions=self.spatial_index.in_box(x_min, y_min, x_max, y_max)
+        )
+
+    def defects_in_die(
+        self, x_index: int, y_index: int
+    ) -> Union[List[Defect], "DefectTable"]:
+        """get the defects of a die
+
+        Returns:
+            Union[List[Defect], DefectTable]: the defects in file order, in the format of defects
+        """
+
+        return self._select_defects(
+            positions=self.spatial_index.in_die(x_index=x_index, y_index=y_index)
+        )
+
+    def defects_in_radius(
+        self, x: float, y: float, radius: float
+    ) -> Union[List[Defect], "DefectTable"]:
+        """get the defects whose point is at a distance of (x, y) lower or equal to radius
+
+        Returns:
+            Union[List[Defect], DefectTable]: the defects in file order, in the format of defects
+        """
+
+        return self._select_defects(
+            positions=self.spatial_index.in_radius(x=x, y=y, radius=radius)
+        )
+
+    def nearest(
+        self, x: float, y: float, k: int = 1
+    ) -> Union[List[Defect], "DefectTable"]:
+        """get the k defects whose point is the nearest to (x, y)
+
+        Returns:
+            Union[List[Defect], DefectTable]: the defects by increasing distance, in the format of defects
+        """
+
+        return self._select_defects(positions=self.spatial_index.nearest(x=x, y=y, k=k))
+
+    def cluster(self, eps: float, min_pts: int = 5) -> "DefectClusters":
+        """cluster the defects on their point with DBSCAN over a grid hash
+
+        Args:
+            eps (float): the maximum distance between two neighbors
+            min_pts (int, optional): the minimum number of neighbors of a core defect, itself included. Defaults to 5.
+
+        Returns:
+            DefectClusters: the label of each defect (-1 for noise) and the summary of each cluster
+        """
+
+        from .defect_clusters import get_defect_clusters
+
+        return get_defect_clusters(
+            x=self.spatial_index.x, y=self.spatial_index.y, eps=eps, min_pts=min_pts
+        )
+
+    def die_map(self, sample_plan_test: "SamplePlanTest" = None) -> "DieMap":
+        """count the defects of each die
+
+        Args:
+            sample_plan_test (SamplePlanTest, optional): the dies of the sample test plan
+                (KlarfContent.sample_plan_test), marked as sampled in the map
+
+        Returns:
+            DieMap: the counts per die
+        """
+
+        from .wafer_stats import get_die_map
+
+        return get_die_map(defects=self.defects, sample_plan_test=sample_plan_test)
+
+    def stats(self, sample_plan_test: "SamplePlanTest" = None) -> "WaferStats":
+        """compute the die map, the density and the class and bin histograms of the defects
+
+        Args:
+            sample_plan_test (SamplePlanTest, optional): the dies of the sample test plan
+                (KlarfContent.sample_plan_test)
+
+        Returns:
+            WaferStats: the aggregates
+        """
+
+        from .wafer_stats import WaferStats
+
+        return WaferStats.from_wafer(wafer=self, sample_plan_test=sample_plan_test)
+
+    def _select_defects(
+        self, positions: "np.ndarray"
+    ) -> Union[List[Defect], "DefectTable"]:
+        from .spatial_index import select_defects
+
+        return select_defects(defects=self.defects, positions=positions)
+
+
+@dataclass
+class CompactWafer(Wafer):
+    """Wafer of the "compact" defects format
+
+    defects is a list of SlottedDefect, die_origin and sample_center_location
+    are frozen objects shared by the wafers of a file repeating the same values.
+    """
+
+    @classmethod
+    def from_wafer(
+        cls, wafer: Wafer, geometries: Dict[Tuple, Any] = None
+    ) -> "CompactWafer":
+        """convert a wafer of the "objects" or "columnar" formats
+
+        Args:
+            wafer (Wafer): the wafer, its defects are a list of Defect or a DefectTable
+            geometries (Dict[Tuple, Any], optional): the frozen objects of the wafers already
+                converted, filled with the new ones to share them between wafers
+
+        Returns:
+            CompactWafer: the wafer with SlottedDefect and frozen geometry
+        """
+
+        from .defect_table import DefectTable
+
+        if geometries is None:
+            geometries = {}
+
+        if isinstance(wafer.defects, DefectTable):
+            defects = wafer.defects.to_list(defect_class=SlottedDefect)
+        else:
+            defects = [
+                SlottedDefect(
+                    **{
+                        name: getattr(defect, name)
+                        for name in SlottedDefect.__dataclass_fields__
+                    }
+                )
+                for defect in wafer.defects
+            ]
+
+        return cls(
+            id=wafer.id,
+            slot=wafer.slot,
+            die_origin=get_frozen_geometry(
+                cls=FrozenDieOrigin, geometry=wafer.die_origin, geometries=geometries
+            ),
+            sample_center_location=get_frozen_geometry(
+                cls=FrozenSampleCenterLocation,
+                geometry=wafer.sample_center_location,
+                geometries=geometries,
+            ),
+            defects=defects,
+            tests=wafer.tests,
+            custom_attribute=wafer.custom_attribute,
+            summary=wafer.summary,
+        )
+
+
+def get_frozen_geometry(cls: type, geometry: Any, geometries: Dict[Tuple, Any]) -> Any:
+    """get the frozen object of cls with the coordinates of geometry, shared through geometries
+
+    Args:
+        cls (type): FrozenDieOrigin or FrozenSampleCenterLocation
+        geometry (Any): an object with x and y, None for a missing record
+        geometries (Dict[Tuple, Any]): the frozen objects already created
+
+    Returns:
+        Any: the frozen object, None when geometry is None
+    """
+
+    if geometry is None:
+        return None
+
+    key = (cls, geometry.x, geometry.y)
+    frozen_geometry = geometries.get(key)
+    if frozen_geometry is None:
+        frozen_geometry = geometries[key] = cls(x=geometry.x, y=geometry.y)
+
+    return frozen_geometry
+
 
 @dataclass
 class InspectionStationId:
@@ -124,7 +382,40 @@ class KlarfContent(BasicKlarfContent):
     def number_of_wafers(self) -> int:
         return len(self.wafers)
 
+    def get_wafer_stats(self) -> List["WaferStats"]:
+        """compute the aggregates of each wafer with the sample test plan of the klarf
+
+        Returns:
+            List[WaferStats]: the aggregates in the order of wafers
+        """
+
+        sample_plan_test = self.sample_plan_test if self.has_sample_test_plan else None
+
+        return [wafer.stats(sample_plan_test=sample_plan_test) for wafer in self.wafers]
+
+    def save_binary(self, path: Path) -> None:
+        """write the content in a binary file that Klarf.load_binary memory-maps
+
+        Args:
+            path (Path): the path of the binary file
+        """
+
+        from ..readers.klarf_binary_reader import writeKlarfBinary
+
+        writeKlarfBinary(klarf_content=self, path=path)
+
 
 @dataclass
 class SingleKlarfContent(BasicKlarfContent):
     wafer: Wafer = None
+
+
+@dataclass
+class KlarfLoadResult:
+    path: Path
+    klarf_content: KlarfContent = None
+    error: Exception = None
+
+    @property
+    def is_success(self) -> bool:
+        return self.error is None
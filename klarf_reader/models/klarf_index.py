@@ -0,0 +1,108 @@
+# MODULES
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class WaferIndex:
+    """byte offsets of the section of a wafer, ends are exclusive
+
+    The section starts at the WaferID record and ends at the next WaferID,
+    EndOfFile or at the end of the file.
+    """
+
+    id: str
+    start: int
+    end: int = None
+    defect_list_start: Optional[int] = None
+    defect_list_end: Optional[int] = None
+    summary_list_start: Optional[int] = None
+    summary_list_end: Optional[int] = None
+
+
+@dataclass
+class KlarfIndex:
+    """byte offsets of the header and of the wafers of a klarf file
+
+    size and mtime_ns are the ones of the indexed file, an index is only valid
+    while they are unchanged. Offsets are the ones of the decompressed content
+    for a compressed file.
+    """
+
+    size: int
+    mtime_ns: int
+    header_end: int
+    wafers: List[WaferIndex] = field(default_factory=lambda: [])
+
+    @property
+    def wafer_ids(self) -> List[str]:
+        return [wafer.id for wafer in self.wafers]
+
+    def get_wafer(self, wafer_id: str) -> WaferIndex:
+        """get the section of a wafer, the last one when the id is repeated like readKlarf
+
+        Args:
+            wafer_id (str): the id of the wafer
+
+        Returns:
+            WaferIndex: the section of the wafer
+        """
+
+        for wafer in reversed(self.wafers):
+            if wafer.id == wafer_id:
+                return wafer
+
+        raise ValueError(f"{wafer_id=} does not exist in {KlarfIndex.__name__}")
+
+    def get_segments(self, wafer_id: str) -> List[Tuple[int, int]]:
+        """get the byte ranges to parse to read only one wafer
+
+        The header and the records of the previous wafers are kept for their
+        state (DefectRecordSpec, DieOrigin...), the DefectList blocks of the
+        previous wafers are left out: an empty DefectList has to be parsed
+        after each range but the last one.
+
+        Args:
+            wafer_id (str): the id of the wafer
+
+        Returns:
+            List[Tuple[int, int]]: the (start, end) ranges in file order
+        """
+
+        return self.get_wafer_segments(wafer_index=self.get_wafer(wafer_id=wafer_id))
+
+    def get_wafer_segments(self, wafer_index: WaferIndex) -> List[Tuple[int, int]]:
+        """get the byte ranges to parse to read only one wafer section, like get_segments
+
+        Args:
+            wafer_index (WaferIndex): the section, one of wafers
+
+        Returns:
+            List[Tuple[int, int]]: the (start, end) ranges in file order
+        """
+
+        segments = []
+        start = 0
+        for wafer in self.wafers:
+            if wafer is wafer_index:
+                break
+
+            if wafer.defect_list_start is not None:
+                segments.append((start, wafer.defect_list_start))
+                start = wafer.defect_list_end
+
+        segments.append((start, wafer_index.end))
+
+        return segments
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, values: Dict) -> "KlarfIndex":
+        return cls(
+            size=values["size"],
+            mtime_ns=values["mtime_ns"],
+            header_end=values["header_end"],
+            wafers=[WaferIndex(**wafer) for wafer in values["wafers"]],
+        )
@@ -0,0 +1,55 @@
+# MODULES
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+
+@dataclass
+class ParseStats:
+    """measures of the parsing of a klarf file, filled by the parser
+
+    number_of_bytes is the size of the parsed content (decompressed for a
+    compressed file). defects_per_wafer holds the number of defects of each
+    wafer by id, the last section when the id is repeated like readKlarf, None
+    for defects_as_generator. header_seconds covers every record outside of
+    the DefectList, SummaryList and SampleTestPlan blocks, with the reading of
+    the file between them, total_seconds also covers the hooks.
+    """
+
+    number_of_bytes: int = 0
+    number_of_lines: int = 0
+    defects_per_wafer: Dict[str, Optional[int]] = field(default_factory=lambda: {})
+    header_seconds: float = 0.0
+    defect_list_seconds: float = 0.0
+    summary_list_seconds: float = 0.0
+    sample_test_plan_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+    @property
+    def number_of_wafers(self) -> int:
+        return len(self.defects_per_wafer)
+
+    @property
+    def number_of_defects(self) -> Optional[int]:
+        if None in self.defects_per_wafer.values():
+            return None
+
+        return sum(self.defects_per_wafer.values())
+
+    @property
+    def bytes_per_second(self) -> Optional[float]:
+        return self._get_throughput(self.number_of_bytes)
+
+    @property
+    def lines_per_second(self) -> Optional[float]:
+        return self._get_throughput(self.number_of_lines)
+
+    @property
+    def defects_per_second(self) -> Optional[float]:
+        number_of_defects = self.number_of_defects
+        if number_of_defects is None:
+            return None
+
+        return self._get_throughput(number_of_defects)
+
+    def _get_throughput(self, count: int) -> Optional[float]:
+        return count / self.total_seconds if self.total_seconds > 0 else None
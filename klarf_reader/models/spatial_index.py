@@ -0,0 +1,261 @@
+# MODULES
+from typing import List, Union
+
+import numpy as np
+
+# MODELS
+from .defect_table import DefectTable
+from .klarf_content import Defect
+
+# average number of defects per cell of the grid
+DEFECTS_PER_CELL = 4
+
+
+class SpatialIndex:
+    """uniform grid over the converted coordinates (Defect.point) of the defects of a wafer
+
+    The positions of the defects are sorted by cell, row after row, so that the
+    defects of consecutive cells of a row are a single slice: a query only
+    computes distances for the defects of the cells it overlaps. Die queries
+    use the positions sorted by (x_index, y_index). Everything is built with
+    vectorized numpy operations and queries return positions in the defects
+    of the wafer.
+    """
+
+    def __init__(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        x_index: np.ndarray = None,
+        y_index: np.ndarray = None,
+        cell_size: float = None,
+    ) -> None:
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+
+        # defects without finite coordinates are never returned by the queries
+        indexed = np.flatnonzero(np.isfinite(self.x) & np.isfinite(self.y))
+        x, y = self.x[indexed], self.y[indexed]
+
+        size = len(indexed)
+        if size:
+            self.x_min, self.y_min = float(x.min()), float(y.min())
+            width = float(x.max()) - self.x_min
+            height = float(y.max()) - self.y_min
+        else:
+            self.x_min = self.y_min = width = height = 0.0
+
+        if cell_size is None:
+            number_of_cells = max(size / DEFECTS_PER_CELL, 1)
+            if width * height > 0:
+                cell_size = float(np.sqrt(width * height / number_of_cells))
+            else:
+                cell_size = max(width, height) / number_of_cells
+
+        if not cell_size > 0:
+            cell_size = 1.0
+
+        self.cell_size = cell_size
+        self.number_of_columns = int(width // cell_size) + 1
+        self.number_of_rows = int(height // cell_size) + 1
+
+        cells = (
+            (y - self.y_min) // cell_size * self.number_of_columns
+            + (x - self.x_min) // cell_size
+        ).astype(np.int64)
+        self._order = indexed[np.argsort(cells, kind="stable")]
+        self._cell_starts = np.zeros(
+            self.number_of_columns * self.number_of_rows + 1, dtype=np.int64
+        )
+        np.cumsum(
+            np.bincount(cells, minlength=len(self._cell_starts) - 1),
+            out=self._cell_starts[1:],
+        )
+
+        self._die_order = None
+        if x_index is not None and y_index is not None:
+            self._x_index = np.asarray(x_index, dtype=np.int64)
+            self._y_index = np.asarray(y_index, dtype=np.int64)
+            self._die_order = np.lexsort((self._y_index, self._x_index))
+            self._sorted_x_index = self._x_index[self._die_order]
+
+    @classmethod
+    def from_defects(
+        cls, defects: Union[List[Defect], DefectTable], cell_size: float = None
+    ) -> "SpatialIndex":
+        """build the index of the defects of a wafer
+
+        Args:
+            defects (Union[List[Defect], DefectTable]): the defects, with their coordinates
+            cell_size (float, optional): side of the cells of the grid, chosen to have
+                DEFECTS_PER_CELL defects per cell on average when missing
+
+        Returns:
+            SpatialIndex: the index
+        """
+
+        if isinstance(defects, DefectTable):
+            if defects.x is None or defects.y is None:
+                raise ValueError(
+                    "spatial queries need the coordinates of the defects (XREL, YREL, XINDEX and YINDEX)"
+                )
+
+            return cls(
+                x=defects.x,
+                y=defects.y,
+                x_index=defects.x_index,
+                y_index=defects.y_index,
+                cell_size=cell_size,
+            )
+
+        if not isinstance(defects, list):
+            raise ValueError(
+                "spatial queries need defects as a list or a DefectTable (defects_as_generator=False)"
+            )
+
+        if any(defect.point is None for defect in defects):
+            raise ValueError(
+                "spatial queries need the coordinates of the defects (XREL, YREL, XINDEX and YINDEX)"
+            )
+
+        return cls(
+            x=np.fromiter(
+                (defect.point[0] for defect in defects), np.float64, len(defects)
+            ),
+            y=np.fromiter(
+                (defect.point[1] for defect in defects), np.float64, len(defects)
+            ),
+            x_index=np.fromiter(
+                (defect.x_index for defect in defects), np.int64, len(defects)
+            ),
+            y_index=np.fromiter(
+                (defect.y_index for defect in defects), np.int64, len(defects)
+            ),
+            cell_size=cell_size,
+        )
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def in_box(
+        self, x_min: float, y_min: float, x_max: float, y_max: float
+    ) -> np.ndarray:
+        """positions of the defects inside a rectangle, bounds included
+
+        Returns:
+            np.ndarray: the positions in ascending order
+        """
+
+        candidates = self._get_candidates(x_min, y_min, x_max, y_max)
+        x, y = self.x[candidates], self.y[candidates]
+
+        return np.sort(
+            candidates[(x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max)]
+        )
+
+    def in_radius(self, x: float, y: float, radius: float) -> np.ndarray:
+        """positions of the defects at a distance of a point lower or equal to radius
+
+        Returns:
+            np.ndarray: the positions in ascending order
+        """
+
+        candidates = self._get_candidates(
+            x - radius, y - radius, x + radius, y + radius
+        )
+        distances = (self.x[candidates] - x) ** 2 + (self.y[candidates] - y) ** 2
+
+        return np.sort(candidates[distances <= radius**2])
+
+    def in_die(self, x_index: int, y_index: int) -> np.ndarray:
+        """positions of the defects of a die
+
+        Returns:
+            np.ndarray: the positions in ascending order
+        """
+
+        if self._die_order is None:
+            raise ValueError("die queries need the XINDEX and YINDEX of the defects")
+
+        start, end = np.searchsorted(self._sorted_x_index, [x_index, x_index + 1])
+        positions = self._die_order[start:end]
+
+        return positions[self._y_index[positions] == y_index]
+
+    def nearest(self, x: float, y: float, k: int = 1) -> np.ndarray:
+        """positions of the k defects nearest to a point
+
+        Returns:
+            np.ndarray: the positions by increasing distance, then by position
+        """
+
+        if not (np.isfinite(x) and np.isfinite(y)):
+            raise ValueError(f"point not valid ({x=} | {y=})")
+
+        k = min(k, len(self._order))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64)
+
+        radius = self.cell_size
+        while True:
+            candidates = self._get_candidates(
+                x - radius, y - radius, x + radius, y + radius
+            )
+            covers_grid = len(candidates) == len(self._order)
+
+            if len(candidates) >= k:
+                distances = (self.x[candidates] - x) ** 2 + (
+                    self.y[candidates] - y
+                ) ** 2
+                order = np.lexsort((candidates, distances))[:k]
+
+                # every defect closer than the k-th one is inside the searched square
+                if covers_grid or distances[order[-1]] <= radius**2:
+                    return candidates[order]
+
+            radius *= 2
+
+    def _get_candidates(
+        self, x_min: float, y_min: float, x_max: float, y_max: float
+    ) -> np.ndarray:
+        # positions of the defects of the cells overlapping a rectangle
+        if not len(self._order) or not x_min <= x_max or not y_min <= y_max:
+            return np.zeros(0, dtype=np.int64)
+
+        column_start = max(int((x_min - self.x_min) // self.cell_size), 0)
+        column_end = min(
+            int((x_max - self.x_min) // self.cell_size), self.number_of_columns - 1
+        )
+        row_start = max(int((y_min - self.y_min) // self.cell_size), 0)
+        row_end = min(
+            int((y_max - self.y_min) // self.cell_size), self.number_of_rows - 1
+        )
+        if column_start > column_end or row_start > row_end:
+            return np.zeros(0, dtype=np.int64)
+
+        cells = np.arange(row_start, row_end + 1) * self.number_of_columns
+        starts = self._cell_starts[cells + column_start]
+        ends = self._cell_starts[cells + column_end + 1]
+
+        return np.concatenate(
+            [self._order[start:end] for start, end in zip(starts, ends)]
+        )
+
+
+def select_defects(
+    defects: Union[List[Defect], DefectTable], positions: np.ndarray
+) -> Union[List[Defect], DefectTable]:
+    """get the defects at some positions, in the format of the defects
+
+    Args:
+        defects (Union[List[Defect], DefectTable]): the defects of a wafer
+        positions (np.ndarray): the positions
+
+    Returns:
+        Union[List[Defect], DefectTable]: a DefectTable for a DefectTable, a list otherwise
+    """
+
+    if isinstance(defects, DefectTable):
+        return defects[positions]
+
+    return [defects[position] for position in positions]
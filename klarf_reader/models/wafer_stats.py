@@ -0,0 +1,197 @@
+# MODULES
+from dataclasses import dataclass
+from typing import Dict, List, Union
+
+import numpy as np
+
+# MODELS
+from .defect_table import DefectTable
+from .klarf_content import Defect, SamplePlanTest, Wafer
+
+
+@dataclass
+class DieMap:
+    """number of defects of each die of a wafer
+
+    counts[i, j] is the number of defects of the die
+    (x_index_start + i, y_index_start + j), the grid covers the dies with
+    defects and the dies of the sample test plan. sampled marks the dies of
+    the sample test plan, it is None without sample test plan.
+    """
+
+    x_index_start: int
+    y_index_start: int
+    counts: np.ndarray
+    sampled: np.ndarray = None
+
+    @property
+    def defective(self) -> np.ndarray:
+        return self.counts > 0
+
+    @property
+    def number_of_def_dies(self) -> int:
+        return int(np.count_nonzero(self.counts))
+
+    @property
+    def number_of_dies(self) -> int:
+        """number of dies of the sample test plan, None without sample test plan"""
+
+        return int(np.count_nonzero(self.sampled)) if self.sampled is not None else None
+
+    def get_count(self, x_index: int, y_index: int) -> int:
+        i, j = x_index - self.x_index_start, y_index - self.y_index_start
+        if 0 <= i < self.counts.shape[0] and 0 <= j < self.counts.shape[1]:
+            return int(self.counts[i, j])
+
+        return 0
+
+
+@dataclass
+class WaferStats:
+    """aggregates of the defects of a wafer
+
+    defect_density is the number of defects per unit of Test.area (the sum of
+    the AreaPerTest of the wafer), None without area. Histograms are None for
+    the columns left out by a projection.
+    """
+
+    number_of_defects: int
+    die_map: DieMap
+    area: float = None
+    defect_density: float = None
+    class_counts: Dict[int, int] = None
+    roughbin_counts: Dict[int, int] = None
+    finebin_counts: Dict[int, int] = None
+
+    @property
+    def number_of_def_dies(self) -> int:
+        return self.die_map.number_of_def_dies
+
+    @property
+    def number_of_dies(self) -> int:
+        return self.die_map.number_of_dies
+
+    @classmethod
+    def from_wafer(
+        cls, wafer: Wafer, sample_plan_test: SamplePlanTest = None
+    ) -> "WaferStats":
+        """compute the aggregates of a wafer
+
+        Args:
+            wafer (Wafer): the wafer, its defects as a list or a DefectTable
+            sample_plan_test (SamplePlanTest, optional): the dies of the sample test plan
+                (KlarfContent.sample_plan_test)
+
+        Returns:
+            WaferStats: the aggregates
+        """
+
+        defects = wafer.defects
+        die_map = get_die_map(defects=defects, sample_plan_test=sample_plan_test)
+        area = sum(test.area for test in wafer.tests) if wafer.tests else None
+
+        return cls(
+            number_of_defects=len(defects),
+            die_map=die_map,
+            area=area,
+            defect_density=len(defects) / area if area else None,
+            class_counts=get_counts(_get_column(defects, "class_number")),
+            roughbin_counts=get_counts(_get_column(defects, "roughbin")),
+            finebin_counts=get_counts(_get_column(defects, "finebin")),
+        )
+
+
+def get_die_map(
+    defects: Union[List[Defect], DefectTable],
+    sample_plan_test: SamplePlanTest = None,
+) -> DieMap:
+    """count the defects of each die with a single bincount
+
+    Args:
+        defects (Union[List[Defect], DefectTable]): the defects of a wafer
+        sample_plan_test (SamplePlanTest, optional): the dies of the sample test plan
+
+    Returns:
+        DieMap: the counts per die
+    """
+
+    x_index = _get_column(defects, "x_index")
+    y_index = _get_column(defects, "y_index")
+    if x_index is None or y_index is None:
+        raise ValueError("die maps need the XINDEX and YINDEX of the defects")
+
+    has_sample_plan = sample_plan_test is not None and len(sample_plan_test.x) > 0
+    if has_sample_plan:
+        sampled_x = np.asarray(sample_plan_test.x, dtype=np.int64)
+        sampled_y = np.asarray(sample_plan_test.y, dtype=np.int64)
+        all_x = np.concatenate((x_index, sampled_x))
+        all_y = np.concatenate((y_index, sampled_y))
+    else:
+        all_x, all_y = x_index, y_index
+
+    if not len(all_x):
+        return DieMap(
+            x_index_start=0,
+            y_index_start=0,
+            counts=np.zeros((0, 0), dtype=np.int64),
+            sampled=np.zeros((0, 0), dtype=np.bool_) if has_sample_plan else None,
+        )
+
+    x_start, y_start = int(all_x.min()), int(all_y.min())
+    shape = (int(all_x.max()) - x_start + 1, int(all_y.max()) - y_start + 1)
+
+    counts = np.bincount(
+        (x_index - x_start) * shape[1] + (y_index - y_start),
+        minlength=shape[0] * shape[1],
+    ).reshape(shape)
+
+    sampled = None
+    if has_sample_plan:
+        sampled = np.zeros(shape, dtype=np.bool_)
+        sampled[sampled_x - x_start, sampled_y - y_start] = True
+
+    return DieMap(
+        x_index_start=x_start, y_index_start=y_start, counts=counts, sampled=sampled
+    )
+
+
+def get_counts(values: np.ndarray) -> Dict[int, int]:
+    """histogram of integer values with a single bincount
+
+    Args:
+        values (np.ndarray): the values, None for a column left out by a projection
+
+    Returns:
+        Dict[int, int]: the number of occurrences of each value present, by value
+    """
+
+    if values is None:
+        return None
+
+    if not len(values):
+        return {}
+
+    start = int(values.min())
+    counts = np.bincount(values - start)
+    present = np.flatnonzero(counts)
+
+    return dict(zip((present + start).tolist(), counts[present].tolist()))
+
+
+def _get_column(defects: Union[List[Defect], DefectTable], column: str) -> np.ndarray:
+    # integer column of the defects, None when it is left out by a projection
+    if isinstance(defects, DefectTable):
+        values = getattr(defects, column)
+        return values.astype(np.int64, copy=False) if values is not None else None
+
+    if not isinstance(defects, list):
+        raise ValueError(
+            "wafer stats need defects as a list or a DefectTable (defects_as_generator=False)"
+        )
+
+    if defects and getattr(defects[0], column) is None:
+        return None
+
+    return np.fromiter(
+        (getattr(defect, column) for defect in defects), np.int64, len(defects)
+    )
@@ -0,0 +1,136 @@
+# MODULES
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Deque, Dict, Generator, Iterable, List, Union
+
+# MODELS
+from ..models.defect_filter import DefectFilter
+from ..models.klarf_content import KlarfContent, KlarfLoadResult
+
+# READERS
+from .klarf_file_reader import readKlarf
+from .klarf_parser import DEFECTS_FORMATS, convert_columnar_wafers
+
+
+def iterKlarfs(
+    klarfs: Iterable[Path],
+    workers: int = None,
+    ordered: bool = True,
+    max_in_flight: int = None,
+    custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+    custom_columns_defect: Union[List[str], Dict[str, type]] = None,
+    parse_summary: bool = True,
+    defects_as_generator: bool = False,
+    defects_format: str = "objects",
+    engine: str = "python",
+    defect_filter: DefectFilter = None,
+    defect_columns: List[str] = None,
+) -> Generator[KlarfLoadResult, None, None]:
+    """this function parse klarf files in a pool of processes
+
+    Workers always parse defects as a DefectTable: numpy arrays cross the
+    process boundary as a few buffers instead of one pickled Defect per
+    defect, Defect objects are built back in the calling process for the
+    "objects" and "compact" formats. An exception raised while reading a file is returned in
+    its result and does not stop the other files.
+
+    Args:
+        klarfs (Iterable[Path]): the paths of the klarf files, consumed lazily
+        workers (int, optional): number of processes, os.cpu_count() when missing, 1 to parse in the calling process
+        ordered (bool, optional): yield results in the order of klarfs, in completion order otherwise. Defaults to True.
+        max_in_flight (int, optional): maximum number of files submitted and not yielded yet. Defaults to 2 * workers.
+
+    Returns:
+        Generator[KlarfLoadResult, None, None]: the result of each file
+    """
+
+    if defects_format not in DEFECTS_FORMATS:
+        raise ValueError(
+            f"Defects format not valid (current={defects_format} | accepted={DEFECTS_FORMATS})"
+        )
+
+    options = dict(
+        custom_columns_wafer=custom_columns_wafer,
+        custom_columns_defect=custom_columns_defect,
+        parse_summary=parse_summary,
+        engine=engine,
+        defect_filter=defect_filter,
+        defect_columns=defect_columns,
+        defects_format="skip" if defects_format == "skip" else "columnar",
+    )
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max(max_in_flight or 2 * workers, 1)
+
+    if workers == 1:
+        for klarf in klarfs:
+            future = Future()
+            try:
+                future.set_result(_read_klarf_content(klarf, options))
+            except Exception as error:
+                future.set_exception(error)
+
+            yield _get_result(
+                klarf=klarf,
+                future=future,
+                defects_as_generator=defects_as_generator,
+                defects_format=defects_format,
+            )
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures: Dict[Future, Path] = {}
+        submission_order: Deque[Future] = deque()
+        klarfs = iter(klarfs)
+
+        while True:
+            while len(futures) < max_in_flight:
+                klarf = next(klarfs, None)
+                if klarf is None:
+                    break
+
+                future = executor.submit(_read_klarf_content, klarf, options)
+                futures[future] = klarf
+                if ordered:
+                    submission_order.append(future)
+
+            if not futures:
+                return
+
+            if ordered:
+                completed = [submission_order.popleft()]
+            else:
+                completed, _ = wait(futures, return_when=FIRST_COMPLETED)
+
+            for future in completed:
+                yield _get_result(
+                    klarf=futures.pop(future),
+                    future=future,
+                    defects_as_generator=defects_as_generator,
+                    defects_format=defects_format,
+                )
+
+
+def _read_klarf_content(klarf: Path, options: Dict) -> KlarfContent:
+    klarf_content, _ = readKlarf(klarf=klarf, with_raw_content=False, **options)
+
+    return klarf_content
+
+
+def _get_result(
+    klarf: Path, future: Future, defects_as_generator: bool, defects_format: str
+) -> KlarfLoadResult:
+    try:
+        klarf_content = future.result()
+    except Exception as error:
+        return KlarfLoadResult(path=klarf, error=error)
+
+    klarf_content.wafers = convert_columnar_wafers(
+        wafers=klarf_content.wafers,
+        defects_format=defects_format,
+        defects_as_generator=defects_as_generator,
+    )
+
+    return KlarfLoadResult(path=klarf, klarf_content=klarf_content)
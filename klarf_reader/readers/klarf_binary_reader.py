@@ -0,0 +1,269 @@
+# MODULES
+import json
+from dataclasses import asdict, fields, is_dataclass
+from pathlib import Path
+from typing import List, Tuple, Union
+
+import numpy as np
+
+# MODELS
+from ..models.defect_table import DEFECT_TABLE_COLUMNS, DefectTable
+from ..models.klarf_content import (
+    BasicKlarfContent,
+    Defect,
+    DieOrigin,
+    DiePitch,
+    InspectionStationId,
+    KlarfContent,
+    SampleCenterLocation,
+    SamplePlanTest,
+    SetupId,
+    Summary,
+    Test,
+    Wafer,
+)
+
+# READERS
+from .klarf_parser import convert_columnar_wafers
+
+# file layout: MAGIC, size of the json metadata as uint64, json metadata, then
+# the arrays, each one starting on a multiple of ALIGNMENT from the file start
+MAGIC = b"KLARFBIN"
+BINARY_VERSION = 1
+ALIGNMENT = 64
+
+_HEADER_CLASSES = {
+    "inspection_station_id": InspectionStationId,
+    "setup_id": SetupId,
+    "die_pitch": DiePitch,
+    "sample_plan_test": SamplePlanTest,
+}
+
+
+def writeKlarfBinary(klarf_content: KlarfContent, path: Path) -> None:
+    """this function write a klarf content in the binary format read by readKlarfBinary
+
+    Header fields and wafer metadata are stored as json, defect columns are
+    stored as contiguous arrays (all the wafers one after the other).
+    Defects read as a generator are consumed: they are written back to the
+    wafers as lists.
+
+    Args:
+        klarf_content (KlarfContent): the content to write, defects can be in any format
+        path (Path): the path of the binary file
+    """
+
+    for wafer in klarf_content.wafers:
+        if not isinstance(wafer.defects, (list, DefectTable)):
+            wafer.defects = list(wafer.defects)
+
+    tables = [
+        _get_defect_table(defects=wafer.defects) for wafer in klarf_content.wafers
+    ]
+
+    # columns left out by a projection are not written
+    arrays: List[Tuple[str, np.ndarray]] = [
+        (
+            (column, np.concatenate([getattr(table, column) for table in tables]))
+            if tables
+            else (column, np.zeros(0, dtype=dtype))
+        )
+        for column, dtype in DEFECT_TABLE_COLUMNS.items()
+        if all(getattr(table, column) is not None for table in tables)
+    ]
+    for wafer_index, table in enumerate(tables):
+        for column, values in table.custom_attribute.items():
+            # interned strings of a custom column schema are read back as fixed-size strings
+            if values.dtype == object:
+                values = values.astype(str)
+            arrays.append((_get_custom_array_name(wafer_index, column), values))
+
+    wafers = []
+    row = 0
+    for wafer, table in zip(klarf_content.wafers, tables):
+        wafers.append(
+            dict(
+                id=wafer.id,
+                slot=wafer.slot,
+                die_origin=_to_json(wafer.die_origin),
+                sample_center_location=_to_json(wafer.sample_center_location),
+                tests=[asdict(test) for test in wafer.tests],
+                custom_attribute=wafer.custom_attribute,
+                summary=_to_json(wafer.summary),
+                rows=[row, row + len(table)],
+                custom_columns=list(table.custom_attribute),
+            )
+        )
+        row += len(table)
+
+    array_layout = {}
+    data_offset = 0
+    for name, values in arrays:
+        data_offset = _align(data_offset)
+        array_layout[name] = [values.dtype.str, data_offset, len(values)]
+        data_offset += values.nbytes
+
+    metadata = json.dumps(
+        dict(
+            version=BINARY_VERSION,
+            header={
+                field.name: _to_json(getattr(klarf_content, field.name))
+                for field in fields(BasicKlarfContent)
+            },
+            wafers=wafers,
+            arrays=array_layout,
+        )
+    ).encode()
+
+    data_start = _align(len(MAGIC) + 8 + len(metadata))
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(metadata)).tobytes())
+        f.write(metadata)
+
+        for name, values in arrays:
+            f.seek(data_start + array_layout[name][1])
+            f.write(np.ascontiguousarray(values).tobytes())
+
+        f.truncate(data_start + data_offset)
+
+
+def readKlarfBinary(path: Path, defects_format: str = "columnar") -> KlarfContent:
+    """this function open a file written by writeKlarfBinary
+
+    The file is memory-mapped: defect columns are copy-on-write views of the
+    file, pages are only read when the values are accessed.
+
+    Args:
+        path (Path): the path of the binary file
+        defects_format (str, optional): "columnar" to get a DefectTable per wafer,
+            "objects" to get a list of Defect per wafer, "compact" to get CompactWafer
+            with a list of SlottedDefect. Defaults to "columnar".
+
+    Returns:
+        KlarfContent: the content of the klarf as a dataclass
+    """
+
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise Exception(f"{path=} is not a klarf binary file")
+
+        metadata_size = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+        metadata = json.loads(f.read(metadata_size))
+
+    if metadata["version"] != BINARY_VERSION:
+        raise Exception(
+            f"Klarf binary version not valid (current={metadata['version']} | accepted={BINARY_VERSION})"
+        )
+
+    data_start = _align(len(MAGIC) + 8 + metadata_size)
+    memory_map = np.memmap(path, dtype=np.uint8, mode="c")
+
+    def get_array(name: str) -> np.ndarray:
+        dtype, offset, length = metadata["arrays"][name]
+        start = data_start + offset
+        end = start + length * np.dtype(dtype).itemsize
+
+        return np.asarray(memory_map[start:end]).view(dtype)
+
+    columns = {
+        column: get_array(column) if column in metadata["arrays"] else None
+        for column in DEFECT_TABLE_COLUMNS
+    }
+
+    wafers = []
+    for wafer_index, wafer in enumerate(metadata["wafers"]):
+        start, end = wafer["rows"]
+        defects = DefectTable(
+            **{
+                column: values[start:end] if values is not None else None
+                for column, values in columns.items()
+            },
+            custom_attribute={
+                column: get_array(_get_custom_array_name(wafer_index, column))
+                for column in wafer["custom_columns"]
+            },
+        )
+
+        wafers.append(
+            Wafer(
+                id=wafer["id"],
+                slot=wafer["slot"],
+                die_origin=_from_json(DieOrigin, wafer["die_origin"]),
+                sample_center_location=_from_json(
+                    SampleCenterLocation, wafer["sample_center_location"]
+                ),
+                defects=defects,
+                tests=[Test(**test) for test in wafer["tests"]],
+                custom_attribute=wafer["custom_attribute"],
+                summary=_from_json(
+                    Summary,
+                    wafer["summary"],
+                    ["percent_of_def_die"],
+                ),
+            )
+        )
+
+    return KlarfContent(
+        **{
+            name: _from_json(_HEADER_CLASSES.get(name), value)
+            for name, value in metadata["header"].items()
+        },
+        wafers=convert_columnar_wafers(wafers=wafers, defects_format=defects_format),
+    )
+
+
+def _get_defect_table(defects: Union[List[Defect], DefectTable]) -> DefectTable:
+    if isinstance(defects, DefectTable):
+        return defects
+
+    if not defects:
+        return DefectTable.from_columns(columns={})
+
+    # attributes left out by a projection are None
+    columns = {
+        column: [getattr(defect, column) for defect in defects]
+        for column in DEFECT_TABLE_COLUMNS
+        if column not in ("x", "y") and getattr(defects[0], column) is not None
+    }
+    if defects[0].point is not None:
+        columns["x"] = [defect.point[0] for defect in defects]
+        columns["y"] = [defect.point[1] for defect in defects]
+
+    custom_columns = list(defects[0].custom_attribute or {})
+
+    return DefectTable.from_columns(
+        columns=columns,
+        custom_attribute={
+            column: np.array([defect.custom_attribute[column] for defect in defects])
+            for column in custom_columns
+        },
+        projection=columns,
+    )
+
+
+def _get_custom_array_name(wafer_index: int, column: str) -> str:
+    return f"custom/{wafer_index}/{column}"
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _to_json(value):
+    return asdict(value) if is_dataclass(value) else value
+
+
+def _from_json(cls, value, excluded_fields: List[str] = None):
+    # values of dataclasses are stored as dict, other values as they are
+    if cls is None or not isinstance(value, dict):
+        return value
+
+    return cls(
+        **{
+            name: item
+            for name, item in value.items()
+            if name not in (excluded_fields or [])
+        }
+    )
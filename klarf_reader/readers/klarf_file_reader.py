@@ -1,431 +1,404 @@
 # MODULES
-import re
+import bz2
+import gzip
+import lzma
+import mmap
 import os
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Generator, List, Tuple
+from typing import (
+    IO,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 # MODELS
-from ..models.klarf_content import (
-    Defect,
-    DieOrigin,
-    DiePitch,
-    InspectionStationId,
-    KlarfContent,
-    SampleCenterLocation,
-    SamplePlanTest,
-    SetupId,
-    Summary,
-    Test,
-    Wafer,
-)
+from ..models.defect_filter import DefectFilter
+from ..models.klarf_content import KlarfContent, SingleKlarfContent, Wafer
+from ..models.parse_stats import ParseStats
+
+# READERS
+from .klarf_parser import ACCEPTED_KLARF_VERSIONS, KlarfParser, convert_coordinates
+from .klarf_raw_content import KlarfRawContent
+from .klarf_stats_parser import KlarfStatsParser
+
+# ACCEPTED_KLARF_VERSIONS and convert_coordinates moved to klarf_parser, they are still exported from here
+__all__ = [
+    "ACCEPTED_KLARF_VERSIONS",
+    "CHUNK_SIZE",
+    "COMPRESSIONS",
+    "convert_chunks_to_klarf_content",
+    "convert_coordinates",
+    "convert_raw_to_klarf_content",
+    "iter_raw_to_single_klarf_content",
+    "iterKlarf",
+    "readKlarf",
+    "readKlarfBuffer",
+]
+
+CHUNK_SIZE = 1 << 20
+
+# magic bytes of the supported compressions with the function opening them
+COMPRESSIONS = {
+    b"\x1f\x8b": gzip.open,
+    b"BZh": bz2.open,
+    b"\xfd7zXZ\x00": lzma.open,
+}
+
+
+def _get_decompressor(klarf: Path) -> Optional[Callable[..., IO]]:
+    with open(klarf, "rb") as f:
+        magic = f.read(max(len(magic) for magic in COMPRESSIONS))
+
+    for compression_magic, decompressor in COMPRESSIONS.items():
+        if magic.startswith(compression_magic):
+            return decompressor
+
+    return None
+
+
+def _open_klarf(klarf: Path, mode: str) -> IO:
+    decompressor = _get_decompressor(klarf)
+
+    if decompressor is None:
+        return open(klarf, mode)
 
-ACCEPTED_KLARF_VERSIONS = [1.1, 1.2]
+    return decompressor(klarf, mode)
 
 
-def _get_raw_content(klarf: Path):
-    with open(klarf, "r") as f:
-        for line in f.readlines():
-            yield line
+def _map_klarf(klarf: Path) -> Union[mmap.mmap, bytes]:
+    with open(klarf, "rb") as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # an empty file can not be mapped
+            return b""
+
+
+@contextmanager
+def _open_buffer(klarf: Path) -> Generator[Union[mmap.mmap, bytes], None, None]:
+    buffer = _map_klarf(klarf)
+    if not isinstance(buffer, mmap.mmap):
+        yield buffer
+        return
+
+    with buffer:
+        yield buffer
+
+
+def _get_chunks(klarf: Path) -> Generator[bytes, None, None]:
+    with _open_klarf(klarf, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
 
 
 def readKlarf(
     klarf: Path,
-    custom_columns_wafer: List[str] = None,
-    custom_columns_defect: List[str] = None,
+    custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+    custom_columns_defect: Union[List[str], Dict[str, type]] = None,
     parse_summary: bool = True,
     defects_as_generator: bool = False,
-) -> Tuple[KlarfContent, Generator[str, None, None],]:
+    defects_format: str = "objects",
+    engine: str = "python",
+    defect_filter: DefectFilter = None,
+    defect_columns: List[str] = None,
+    stats: ParseStats = None,
+    on_progress: Callable[[int], None] = None,
+    on_wafer: Callable[[Wafer, int], None] = None,
+    with_raw_content: bool = True,
+) -> Tuple[KlarfContent, Optional[KlarfRawContent],]:
     """this function open, read and parse a klarf file
 
+    Files compressed with gzip, bz2 or xz are detected from their magic bytes
+    and decompressed by chunks while they are parsed, other files are
+    memory-mapped. The raw content gives the lines and the wafer sections of
+    the file: an uncompressed file is read once, the raw content being the
+    mapped content that was parsed, a compressed file is decompressed again
+    by chunks when the raw content is read, never as a whole in memory. The
+    offsets of the sections are recorded while parsing, the raw content
+    closes the mapped file once closed itself.
+
     Args:
         klarf (Path): the path of the klarf file
+        defects_format (str, optional): "objects" to get a list of Defect per wafer,
+            "columnar" to get a DefectTable per wafer, "skip" to only read the header,
+            wafers and summaries without parsing DefectList blocks, "compact" to get
+            CompactWafer with a list of SlottedDefect. Defaults to "objects".
+        engine (str, optional): "numba" to parse DefectList blocks with the compiled
+            tokenizer, falls back to "python" when numba is not installed. Defaults to "python".
+        stats (ParseStats, optional): filled with the measures of the parsing
+        on_progress (Callable[[int], None], optional): called with the position in the content
+            after each DefectList block and each decompressed chunk
+        on_wafer (Callable[[Wafer, int], None], optional): called with each wafer and the
+            position in the content once the wafer is completed
+        with_raw_content (bool, optional): False to release the content once parsed,
+            the raw content is then None. Defaults to True.
 
     Returns:
         KlarfContent: the content of the klarf as a dataclass
+        KlarfRawContent: the content of the file, iterated as its lines
     """
 
     if not os.path.exists(klarf):
         raise Exception(f"{klarf=} does not exists")
 
-    raw_content = _get_raw_content(klarf)
+    stat = os.stat(klarf)
 
-    klarf_content = convert_raw_to_klarf_content(
-        raw_content=_get_raw_content(klarf),
+    parser = _get_parser(
         custom_columns_wafer=custom_columns_wafer,
         custom_columns_defect=custom_columns_defect,
         parse_summary=parse_summary,
         defects_as_generator=defects_as_generator,
+        defects_format=defects_format,
+        engine=engine,
+        defect_filter=defect_filter,
+        defect_columns=defect_columns,
+        stats=stats,
+        on_progress=on_progress,
+        on_wafer=on_wafer,
+        record_index=with_raw_content,
     )
 
-    klarf_content.wafers = list(
-        {item.id: item for item in klarf_content.wafers}.values()
+    if _get_decompressor(klarf) is not None:
+        # the raw content decompresses the file again by chunks when it is read
+        buffer = None
+        klarf_content = _parse_chunks(chunks=_get_chunks(klarf), parser=parser)
+    else:
+        buffer = _map_klarf(klarf)
+        klarf_content = _parse_chunks(chunks=[buffer], parser=parser)
+
+    if not with_raw_content:
+        if isinstance(buffer, mmap.mmap):
+            buffer.close()
+
+        return klarf_content, None
+
+    raw_content = KlarfRawContent(
+        buffer=buffer,
+        index=parser.get_index(size=stat.st_size, mtime_ns=stat.st_mtime_ns),
+        klarf=klarf,
     )
 
     return klarf_content, raw_content
 
 
-def convert_raw_to_klarf_content(
-    raw_content: Generator[str, None, None],
-    custom_columns_wafer: List[str] = None,
-    custom_columns_defect: List[str] = None,
+def readKlarfBuffer(
+    buffer: Union[bytes, bytearray, mmap.mmap, memoryview],
+    custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+    custom_columns_defect: Union[List[str], Dict[str, type]] = None,
     parse_summary: bool = True,
     defects_as_generator: bool = False,
+    defects_format: str = "objects",
+    engine: str = "python",
+    defect_filter: DefectFilter = None,
+    defect_columns: List[str] = None,
+    stats: ParseStats = None,
+    on_progress: Callable[[int], None] = None,
+    on_wafer: Callable[[Wafer, int], None] = None,
 ) -> KlarfContent:
+    """this function parse the content of a klarf file already in memory
 
-    RAW_DEFECT_COLUMNS = [
-        "DEFECTID",
-        "XREL",
-        "YREL",
-        "XINDEX",
-        "YINDEX",
-        "XSIZE",
-        "YSIZE",
-        "DEFECTAREA",
-        "DSIZE",
-        "CLASSNUMBER",
-        "TEST",
-        "CLUSTERNUMBER",
-        "ROUGHBINNUMBER",
-        "FINEBINNUMBER",
-        "IMAGECOUNT",
-    ]
-
-    device_id = None
-    setup_id = "no_setup"
-    sample_type = None
-    next_line_has_coords, next_line_has_numb = (False, False)
-    has_sample_test_plan, next_line_has_sample_test_plan, skip_next_sample_test_plan = (
-        False,
-        False,
-        False,
-    )
-    sample_plan_test_x, sample_plan_test_y = [], []
-    wafers: List[Wafer] = []
-    tests: List[Test] = []
-
-    if custom_columns_wafer is None:
-        custom_columns_wafer = []
+    The content is parsed as bytes: only the lines of the header are decoded
+    and DefectList blocks are read in place, without copy for bytes,
+    bytearray, mmap or a contiguous memoryview of them.
 
-    if custom_columns_defect is None:
-        custom_columns_defect = []
+    Args:
+        buffer (Union[bytes, bytearray, mmap.mmap, memoryview]): the content of the klarf file
 
-    index = 0
-    custom_columns_found = False
-    custom_columns_wafer_dict = {}
-    for line in raw_content:
-        index += 1
-        line = line.rstrip("\n")
-
-        if index == 1 and not line.lstrip().lower().startswith("fileversion"):
-            raise Exception(f"Unable to read this format from klarf")
-
-        for item in custom_columns_wafer:
-            if line.lstrip().lower().startswith(item.lower()):
-                attribute_values = line.rstrip(";").split()
-                custom_columns_wafer_dict[item] = attribute_values[1]
-                custom_columns_found = True
-
-                break
-
-        if custom_columns_found:
-            custom_columns_found = False
-            continue
-
-        if line.lstrip().lower().startswith("fileversion"):
-            file_version_values = line.rstrip(";").split(" ")
-            file_version = float(f"{file_version_values[1]}.{file_version_values[2]}")
-            if file_version not in ACCEPTED_KLARF_VERSIONS:
-                raise ValueError(
-                    f"Klarf file version not valid (current={file_version} | accepted={ACCEPTED_KLARF_VERSIONS})"
-                )
-            continue
-
-        if line.lstrip().lower().startswith("filetimestamp"):
-            file_timestamp = line[14:33].rstrip(";")
-            continue
-
-        if line.lstrip().lower().startswith("inspectionstationid"):
-            inspection_station_id = line.split(";")[0].split(" ")
-            inspection_station_id = [id.strip('"') for id in inspection_station_id]
-            inspection_station_id = inspection_station_id[1:4]
-
-            inspection_station_id = InspectionStationId(*inspection_station_id)
-            continue
-
-        if line.lstrip().lower().startswith("sampletype"):
-            sample_type = line.rstrip(";").split()[1]
-            continue
-
-        if line.lstrip().lower().startswith("resulttimestamp"):
-            result_timestamp = line[16:35].rstrip(";")
-            continue
-
-        if line.lstrip().lower().startswith("lotid"):
-            lot_id = line.split('"')[1]
-            continue
-
-        if line.lstrip().lower().startswith("samplesize"):
-            sample_size = line.rstrip(";").split(" ")[2]
-            sample_size = int(sample_size)
-            continue
-
-        if line.lstrip().lower().startswith("deviceid"):
-            device_id = line.split('"')[1]
-            continue
-
-        if line.lstrip().lower().startswith("setupid"):
-            setup_id_value = line.rstrip(";").split('"')
-            setup_id = SetupId(
-                name=setup_id_value[1].strip(), date=setup_id_value[2].strip()
-            )
-            continue
-
-        if line.lstrip().lower().startswith("stepid"):
-            step_id = line.split('"')[1]
-            continue
-
-        if line.lstrip().lower().startswith("sampleorientationmarktype"):
-            sample_orientation_mark_type = line.rstrip(";").split()[1]
-            continue
-
-        if line.lstrip().lower().startswith("orientationmarklocation"):
-            orientation_mark_location = line.rstrip(";").split()[1]
-            continue
-
-        if line.lstrip().lower().startswith("diepitch"):
-            die_pitch_value = line.rstrip(";").split()
-            die_pitch = DiePitch(
-                x=float(die_pitch_value[1]), y=float(die_pitch_value[2])
-            )
-            continue
-
-        if line.lstrip().lower().startswith("dieorigin"):
-            die_origin_value = line.rstrip(";").split()
-            die_origin = DieOrigin(
-                x=float(die_origin_value[1]), y=float(die_origin_value[2])
-            )
-            continue
-
-        if line.lstrip().lower().startswith("samplecenterlocation"):
-            sample_center_location_value = line.rstrip(";").split()
-            sample_center_location = SampleCenterLocation(
-                x=float(sample_center_location_value[1]),
-                y=float(sample_center_location_value[2]),
-            )
-            continue
-
-        if line.lstrip().lower().startswith("waferid"):
-            wafer_id = line.split('"')[1]
-            continue
-
-        if line.lstrip().lower().startswith("slot"):
-            slot_values = line.rstrip(";").split()
-            slot = int(slot_values[1])
-            continue
-
-        if line.lstrip().lower().startswith("inspectiontest"):
-            inspection_test = line.rstrip(";").split()
-            inspection_test = int(inspection_test[1])
-            continue
-
-        if line.lstrip().lower().startswith("areapertest"):
-            area_per_test = line.rstrip(";").split()
-            area_per_test = float(area_per_test[1])
-
-            tests.append(
-                Test(id=inspection_test, area=area_per_test),
-            )
-            continue
-
-        if line.lstrip().lower().startswith("defectrecordspec"):
-            defects = []
-
-            line_without_space = re.sub("\s+", " ", line).strip()
-            parameters = line_without_space.strip().split(" ")
-
-            defect_columns = {
-                column: parameters.index(column) - 1
-                for column in RAW_DEFECT_COLUMNS
-                if column in parameters
-            }
-            defect_columns_custom = {
-                column: parameters.index(column) - 1
-                for column in custom_columns_defect
-                if column in parameters
-            }
-
-            continue
-
-        if line.lstrip().lower().startswith("defectlist"):
-            next_line_has_coords = True
-
-            if not line.rstrip().endswith(";"):
-                continue
-
-        if next_line_has_coords:
-            if line.startswith(" "):
-
-                defect_parameters = line.strip().split(";")[0].split()
-
-                defect_paramters_values = {
-                    k.lower(): defect_parameters[v - 1]
-                    for k, v in defect_columns.items()
-                }
-
-                defect_paramters_custom_values = {
-                    k.lower(): defect_parameters[v - 1]
-                    for k, v in defect_columns_custom.items()
-                }
-
-                x, y = convert_coordinates(
-                    die_pitch=die_pitch,
-                    sample_center_location=sample_center_location,
-                    xrel=float(defect_paramters_values.get("xrel")),
-                    yrel=float(defect_paramters_values.get("yrel")),
-                    xindex=int(defect_paramters_values.get("xindex")),
-                    yindex=int(defect_paramters_values.get("yindex")),
-                )
-
-                roughbin = defect_paramters_values.get("roughbinnumber")
-                roughbin = int(roughbin) if roughbin is not None else 0
-
-                finebin = defect_paramters_values.get("finebinnumber")
-                finebin = int(finebin) if finebin is not None else 0
-
-                image_count = defect_paramters_values.get("imagecount")
-                image_count = int(image_count) if image_count is not None else 0
-
-                cluster_number = defect_paramters_values.get("clusternumber")
-                cluster_number = (
-                    int(cluster_number) if cluster_number is not None else 0
-                )
-
-                defects.append(
-                    Defect(
-                        id=int(defect_paramters_values.get("defectid")),
-                        x_rel=float(defect_paramters_values.get("xrel")),
-                        y_rel=float(defect_paramters_values.get("yrel")),
-                        x_index=int(defect_paramters_values.get("xindex")),
-                        y_index=int(defect_paramters_values.get("yindex")),
-                        x_size=float(defect_paramters_values.get("xsize")),
-                        y_size=float(defect_paramters_values.get("ysize")),
-                        area=float(defect_paramters_values.get("defectarea")),
-                        d_size=float(defect_paramters_values.get("dsize")),
-                        class_number=int(defect_paramters_values.get("classnumber")),
-                        test_id=int(defect_paramters_values.get("test")),
-                        cluster_number=cluster_number,
-                        image_count=image_count,
-                        roughbin=roughbin,
-                        finebin=finebin,
-                        point=(x, y),
-                        custom_attribute=defect_paramters_custom_values,
-                    )
-                )
-
-            if line.rstrip().endswith(";"):
-                next_line_has_coords = False
-
-                wafers.append(
-                    Wafer(
-                        id=wafer_id,
-                        slot=slot,
-                        die_origin=die_origin,
-                        sample_center_location=sample_center_location,
-                        defects=(defect for defect in defects)
-                        if defects_as_generator
-                        else defects,
-                        tests=tests.copy(),
-                        custom_attribute=custom_columns_wafer_dict,
-                    )
-                )
-
-                tests.clear()
-
-        if (
-            parse_summary
-            and line.lstrip().lower().startswith("summarylist")
-            and not (line.rstrip().endswith(";"))
-        ):
-            next_line_has_numb = True
-            continue
-
-        if next_line_has_numb and line.startswith(" "):
-            next_line_has_numb = False
-            linewithoutSpace = re.sub("[\s;]+", " ", line).strip()
-
-            split = linewithoutSpace.split()
-
-            wafers[-1].summary = Summary(
-                number_of_defects=int(split[1]),
-                defect_density=float(split[2]),
-                number_of_dies=int(split[3]),
-                number_of_def_dies=int(split[4]),
-            )
-            continue
-
-        if not skip_next_sample_test_plan and line.lstrip().lower().startswith(
-            "sampletestplan"
-        ):
-            next_line_has_sample_test_plan = True
-            has_sample_test_plan = True
-        if next_line_has_sample_test_plan:
-            if line.startswith(" "):
-                sample_test_plan_value = line.strip().rstrip(";").split()
-
-                x = int(sample_test_plan_value[0])
-                sample_plan_test_x.append(x)
-
-                y = int(sample_test_plan_value[1])
-                sample_plan_test_y.append(y)
-            if line.rstrip().endswith(";"):
-                next_line_has_sample_test_plan = False
-                skip_next_sample_test_plan = True
-            continue
+    Returns:
+        KlarfContent: the content of the klarf as a dataclass
+    """
 
-    return KlarfContent(
-        file_version=file_version,
-        file_timestamp=file_timestamp,
-        inspection_station_id=inspection_station_id,
-        sample_type=sample_type,
-        result_timestamp=result_timestamp,
-        lot_id=lot_id,
-        device_id=device_id,
-        sample_size=sample_size,
-        step_id=step_id,
-        sample_orientation_mark_type=sample_orientation_mark_type,
-        orientation_mark_location=orientation_mark_location,
-        die_pitch=die_pitch,
-        setup_id=setup_id,
-        has_sample_test_plan=has_sample_test_plan,
-        sample_plan_test=SamplePlanTest(x=sample_plan_test_x, y=sample_plan_test_y),
-        wafers=wafers,
+    return convert_chunks_to_klarf_content(
+        chunks=[buffer],
+        custom_columns_wafer=custom_columns_wafer,
+        custom_columns_defect=custom_columns_defect,
+        parse_summary=parse_summary,
+        defects_as_generator=defects_as_generator,
+        defects_format=defects_format,
+        engine=engine,
+        defect_filter=defect_filter,
+        defect_columns=defect_columns,
+        stats=stats,
+        on_progress=on_progress,
+        on_wafer=on_wafer,
     )
 
 
-def convert_coordinates(
-    die_pitch: DiePitch,
-    sample_center_location: SampleCenterLocation,
-    xrel: float,
-    yrel: float,
-    xindex: int,
-    yindex: int,
-) -> Tuple[float, float]:
-    """convert defect attributes to real x,y coordianates
+def iterKlarf(
+    klarf: Path,
+    custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+    custom_columns_defect: Union[List[str], Dict[str, type]] = None,
+    parse_summary: bool = True,
+    defects_format: str = "objects",
+    engine: str = "python",
+    defect_filter: DefectFilter = None,
+    defect_columns: List[str] = None,
+) -> Generator[SingleKlarfContent, None, None]:
+    """this function open a klarf file and parse it one wafer at a time
+
+    The file is read by chunks and a wafer is yielded as soon as its section
+    is complete, so memory is bounded by the largest wafer instead of the file.
+    Wafers are yielded in file order, without deduplication on Wafer.id.
 
     Args:
-        die_pitch (DiePitch): _description_
-        sample_center_location_x (float): _description_
-        sample_center_location_y (float): _description_
-        xrel (float): _description_
-        yrel (float): _description_
-        xindex (int): _description_
-        yindex (int): _description_
+        klarf (Path): the path of the klarf file
 
     Returns:
-        Tuple[float, float]: the x and y coordinates
+        Generator[SingleKlarfContent, None, None]: the header of the klarf with each wafer
     """
 
-    x = xindex * die_pitch.x + xrel - sample_center_location.x
-    y = yindex * die_pitch.y + yrel - sample_center_location.y
+    if not os.path.exists(klarf):
+        raise Exception(f"{klarf=} does not exists")
+
+    parser = KlarfParser(
+        custom_columns_wafer=custom_columns_wafer,
+        custom_columns_defect=custom_columns_defect,
+        parse_summary=parse_summary,
+        defects_format=defects_format,
+        engine=engine,
+        defect_filter=defect_filter,
+        defect_columns=defect_columns,
+    )
+    for wafer in _iter_chunks_to_wafers(chunks=_get_chunks(klarf), parser=parser):
+        yield SingleKlarfContent(**parser.header, wafer=wafer)
+
+
+def convert_chunks_to_klarf_content(
+    chunks: Iterable[Union[bytes, bytearray, mmap.mmap, memoryview]],
+    custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+    custom_columns_defect: Union[List[str], Dict[str, type]] = None,
+    parse_summary: bool = True,
+    defects_as_generator: bool = False,
+    defects_format: str = "objects",
+    engine: str = "python",
+    defect_filter: DefectFilter = None,
+    defect_columns: List[str] = None,
+    stats: ParseStats = None,
+    on_progress: Callable[[int], None] = None,
+    on_wafer: Callable[[Wafer, int], None] = None,
+) -> KlarfContent:
+    parser = _get_parser(
+        custom_columns_wafer=custom_columns_wafer,
+        custom_columns_defect=custom_columns_defect,
+        parse_summary=parse_summary,
+        defects_as_generator=defects_as_generator,
+        defects_format=defects_format,
+        engine=engine,
+        defect_filter=defect_filter,
+        defect_columns=defect_columns,
+        stats=stats,
+        on_progress=on_progress,
+        on_wafer=on_wafer,
+    )
+
+    return _parse_chunks(chunks=chunks, parser=parser)
+
+
+def _get_parser(
+    stats: Optional[ParseStats],
+    on_progress: Optional[Callable[[int], None]],
+    on_wafer: Optional[Callable[[Wafer, int], None]],
+    **parser_arguments,
+) -> KlarfParser:
+    if stats is None and on_progress is None and on_wafer is None:
+        return KlarfParser(**parser_arguments)
+
+    return KlarfStatsParser(
+        stats=stats, on_progress=on_progress, on_wafer=on_wafer, **parser_arguments
+    )
+
+
+def _parse_chunks(
+    chunks: Iterable[Union[bytes, bytearray, mmap.mmap, memoryview]],
+    parser: KlarfParser,
+) -> KlarfContent:
+    for chunk in chunks:
+        parser.feed(data=chunk)
+    parser.close()
+
+    wafers = parser.pop_wafers()
+
+    return KlarfContent(
+        **parser.header, wafers=list({item.id: item for item in wafers}.values())
+    )
+
+
+def convert_raw_to_klarf_content(
+    raw_content: Generator[str, None, None],
+    custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+    custom_columns_defect: Union[List[str], Dict[str, type]] = None,
+    parse_summary: bool = True,
+    defects_as_generator: bool = False,
+    defects_format: str = "objects",
+    engine: str = "python",
+    defect_filter: DefectFilter = None,
+    defect_columns: List[str] = None,
+) -> KlarfContent:
+    parser = KlarfParser(
+        custom_columns_wafer=custom_columns_wafer,
+        custom_columns_defect=custom_columns_defect,
+        parse_summary=parse_summary,
+        defects_as_generator=defects_as_generator,
+        defects_format=defects_format,
+        engine=engine,
+        defect_filter=defect_filter,
+        defect_columns=defect_columns,
+    )
+    wafers = list(_iter_raw_to_wafers(raw_content=raw_content, parser=parser))
+
+    return KlarfContent(**parser.header, wafers=wafers)
+
+
+def iter_raw_to_single_klarf_content(
+    raw_content: Generator[str, None, None],
+    custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+    custom_columns_defect: Union[List[str], Dict[str, type]] = None,
+    parse_summary: bool = True,
+    defects_format: str = "objects",
+    engine: str = "python",
+    defect_filter: DefectFilter = None,
+    defect_columns: List[str] = None,
+) -> Generator[SingleKlarfContent, None, None]:
+    parser = KlarfParser(
+        custom_columns_wafer=custom_columns_wafer,
+        custom_columns_defect=custom_columns_defect,
+        parse_summary=parse_summary,
+        defects_format=defects_format,
+        engine=engine,
+        defect_filter=defect_filter,
+        defect_columns=defect_columns,
+    )
+    for wafer in _iter_raw_to_wafers(raw_content=raw_content, parser=parser):
+        yield SingleKlarfContent(**parser.header, wafer=wafer)
+
+
+def _iter_chunks_to_wafers(
+    chunks: Iterable[bytes], parser: KlarfParser
+) -> Generator[Wafer, None, None]:
+    for chunk in chunks:
+        yield from parser.iter_parse(data=chunk)
+
+    parser.close()
+
+    yield from parser.pop_wafers()
+
+
+def _iter_raw_to_wafers(
+    raw_content: Generator[str, None, None], parser: KlarfParser
+) -> Generator[Wafer, None, None]:
+    for line in raw_content:
+        parser.parse_line(line)
+
+        if parser.completed_wafers:
+            yield from parser.pop_wafers()
+
+    parser.close()
 
-    return x, y
+    yield from parser.pop_wafers()
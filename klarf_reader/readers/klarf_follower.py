@@ -0,0 +1,183 @@
+# MODULES
+import os
+import time
+from pathlib import Path
+from typing import IO, Dict, Generator, List, Union
+
+# MODELS
+from ..models.defect_filter import DefectFilter
+from ..models.klarf_content import SingleKlarfContent, Wafer
+
+# READERS
+from .klarf_file_reader import CHUNK_SIZE, COMPRESSIONS
+from .klarf_parser import KlarfParser
+
+MAGIC_SIZE = max(len(compression_magic) for compression_magic in COMPRESSIONS)
+
+
+class KlarfFollower:
+    """resumable parser of a klarf file still being written
+
+    Each poll reads the bytes appended to the file since the previous one and
+    feeds them to a KlarfParser kept between calls: the header, the
+    DefectRecordSpec, the tests and the wafer being read are never parsed
+    again, an incomplete last line waits for the next poll. A wafer is
+    emitted once its section is complete: after its SummaryList (or its
+    DefectList when summaries are not parsed), at the next WaferID or at
+    EndOfFile. A file replaced or truncated under the follower is followed
+    again from its start. Compressed files can not be followed.
+    """
+
+    def __init__(
+        self,
+        klarf: Path,
+        custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+        custom_columns_defect: Union[List[str], Dict[str, type]] = None,
+        parse_summary: bool = True,
+        defects_format: str = "objects",
+        engine: str = "python",
+        defect_filter: DefectFilter = None,
+        defect_columns: List[str] = None,
+    ) -> None:
+        self.klarf = klarf
+        self.position = 0
+
+        self._parser_arguments = dict(
+            custom_columns_wafer=custom_columns_wafer,
+            custom_columns_defect=custom_columns_defect,
+            parse_summary=parse_summary,
+            defects_format=defects_format,
+            engine=engine,
+            defect_filter=defect_filter,
+            defect_columns=defect_columns,
+        )
+        self._parser = KlarfParser(**self._parser_arguments)
+        self._file: IO = None
+
+    def __enter__(self) -> "KlarfFollower":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @property
+    def header(self) -> Dict:
+        """the header parsed so far, as KlarfContent keyword arguments"""
+
+        return self._parser.header
+
+    @property
+    def is_complete(self) -> bool:
+        """the EndOfFile record has been parsed"""
+
+        return self._parser.end_of_file
+
+    def poll(self) -> List[SingleKlarfContent]:
+        """parse the bytes appended since the last call
+
+        Returns:
+            List[SingleKlarfContent]: the header of the klarf with each wafer completed by these bytes
+        """
+
+        if not os.path.exists(self.klarf):
+            # not created yet
+            return []
+
+        self._open()
+
+        if self.position == 0 and not self._check_magic():
+            # too few bytes yet to tell a compressed file from a klarf
+            return []
+
+        wafers: List[Wafer] = []
+        while chunk := self._file.read(CHUNK_SIZE):
+            self.position += len(chunk)
+            wafers.extend(self._parser.iter_parse(data=chunk))
+
+        return self._get_contents(wafers=wafers)
+
+    def finish(self) -> List[SingleKlarfContent]:
+        """parse the last line and complete the last wafer, for a writer that stopped without EndOfFile
+
+        Returns:
+            List[SingleKlarfContent]: the header of the klarf with each wafer completed
+        """
+
+        wafers = self.poll()
+
+        self._parser.close()
+
+        return wafers + self._get_contents(wafers=self._parser.pop_wafers())
+
+    def follow(
+        self, interval: float = 1.0, timeout: float = None
+    ) -> Generator[SingleKlarfContent, None, None]:
+        """poll the file until its EndOfFile record and yield each wafer once completed
+
+        Args:
+            interval (float, optional): seconds between two polls. Defaults to 1.0.
+            timeout (float, optional): seconds without new bytes after which the file is
+                finished as it is, waits for EndOfFile forever when missing
+
+        Returns:
+            Generator[SingleKlarfContent, None, None]: the header of the klarf with each wafer
+        """
+
+        last_change = time.monotonic()
+        while True:
+            position = self.position
+
+            yield from self.poll()
+
+            if self.is_complete:
+                return
+
+            if self.position != position:
+                last_change = time.monotonic()
+            elif timeout is not None and time.monotonic() - last_change >= timeout:
+                yield from self.finish()
+                return
+
+            time.sleep(interval)
+
+    def close(self) -> None:
+        """release the file, the follower can still be polled"""
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self) -> None:
+        stat = os.stat(self.klarf)
+
+        if self._file is not None and (
+            os.fstat(self._file.fileno()).st_ino != stat.st_ino
+            or stat.st_size < self.position
+        ):
+            # a new file is followed from its start
+            self.close()
+            self.position = 0
+            self._parser = KlarfParser(**self._parser_arguments)
+
+        if self._file is None:
+            self._file = open(self.klarf, "rb")
+            self._file.seek(self.position)
+
+    def _check_magic(self) -> bool:
+        # False while the first bytes can still be the start of a compression magic
+        magic = self._file.read(MAGIC_SIZE)
+        self._file.seek(0)
+
+        if magic.startswith(tuple(COMPRESSIONS)):
+            raise ValueError(
+                f"Compressed klarf can not be followed (current={self.klarf})"
+            )
+
+        return len(magic) == MAGIC_SIZE or not any(
+            compression_magic.startswith(magic) for compression_magic in COMPRESSIONS
+        )
+
+    def _get_contents(self, wafers: List[Wafer]) -> List[SingleKlarfContent]:
+        return [
+            SingleKlarfContent(**self._parser.header, wafer=wafer) for wafer in wafers
+        ]
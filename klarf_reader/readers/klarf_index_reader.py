@@ -0,0 +1,236 @@
+# MODULES
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple, Union
+
+# MODELS
+from ..models.defect_filter import DefectFilter
+from ..models.klarf_content import SingleKlarfContent, Wafer
+from ..models.klarf_index import KlarfIndex
+
+# READERS
+from .klarf_file_reader import (
+    _get_chunks,
+    _get_decompressor,
+    _open_buffer,
+    _open_klarf,
+)
+from .klarf_parser import KlarfParser
+
+INDEX_SUFFIX = ".kidx"
+INDEX_VERSION = 1
+
+
+class _KlarfIndexParser(KlarfParser):
+    # parse the records like a header-only read and record the offsets of the wafers
+
+    def __init__(
+        self, custom_columns_wafer: Union[List[str], Dict[str, type]] = None
+    ) -> None:
+        super().__init__(
+            custom_columns_wafer=custom_columns_wafer,
+            defects_format="skip",
+            record_index=True,
+        )
+
+
+def get_index_path(klarf: Path) -> Path:
+    return Path(f"{klarf}{INDEX_SUFFIX}")
+
+
+def is_index_valid(klarf: Path, index: KlarfIndex) -> bool:
+    stat = os.stat(klarf)
+
+    return index.size == stat.st_size and index.mtime_ns == stat.st_mtime_ns
+
+
+def buildKlarfIndex(klarf: Path) -> KlarfIndex:
+    """this function scan a klarf file once to index the byte offsets of its wafers
+
+    DefectList blocks are skipped at byte level like with the "skip" defects format.
+
+    Args:
+        klarf (Path): the path of the klarf file
+
+    Returns:
+        KlarfIndex: the offsets of the header and of each wafer section
+    """
+
+    if not os.path.exists(klarf):
+        raise Exception(f"{klarf=} does not exists")
+
+    stat = os.stat(klarf)
+
+    if _get_decompressor(klarf) is None:
+        with _open_buffer(klarf) as buffer:
+            return _build_index(
+                chunks=[buffer], size=stat.st_size, mtime_ns=stat.st_mtime_ns
+            )
+
+    return _build_index(
+        chunks=_get_chunks(klarf), size=stat.st_size, mtime_ns=stat.st_mtime_ns
+    )
+
+
+def _build_index(
+    chunks: Iterable[Union[bytes, mmap.mmap, memoryview]],
+    size: int,
+    mtime_ns: int,
+    parser: _KlarfIndexParser = None,
+) -> KlarfIndex:
+    # index the content fed by chunks, size and mtime_ns are the ones of the file
+    if parser is None:
+        parser = _KlarfIndexParser()
+
+    for chunk in chunks:
+        parser.feed(data=chunk)
+
+    parser.close()
+
+    return parser.get_index(size=size, mtime_ns=mtime_ns)
+
+
+def readKlarfIndex(klarf: Path, persist: bool = False) -> KlarfIndex:
+    """this function get the index of a klarf file, from its sidecar file when it is still valid
+
+    The sidecar file is the path of the klarf file followed by INDEX_SUFFIX, it
+    is invalidated when the size or the modification time of the klarf file change.
+
+    Args:
+        klarf (Path): the path of the klarf file
+        persist (bool, optional): write the sidecar file when it is missing or outdated. Defaults to False.
+
+    Returns:
+        KlarfIndex: the offsets of the header and of each wafer section
+    """
+
+    index_path = get_index_path(klarf)
+
+    if os.path.exists(index_path):
+        try:
+            with open(index_path, "r") as f:
+                values = json.load(f)
+
+            if values.get("version") == INDEX_VERSION:
+                index = KlarfIndex.from_dict(values["index"])
+
+                if is_index_valid(klarf=klarf, index=index):
+                    return index
+        except (ValueError, KeyError, TypeError):
+            # an unreadable sidecar file is built again
+            pass
+
+    index = buildKlarfIndex(klarf)
+
+    if persist:
+        temporary_path = Path(f"{index_path}.{os.getpid()}.tmp")
+        with open(temporary_path, "w") as f:
+            json.dump({"version": INDEX_VERSION, "index": index.to_dict()}, f)
+        os.replace(temporary_path, index_path)
+
+    return index
+
+
+def readKlarfWafer(
+    klarf: Path,
+    wafer_id: str,
+    index: KlarfIndex = None,
+    persist_index: bool = False,
+    custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+    custom_columns_defect: Union[List[str], Dict[str, type]] = None,
+    parse_summary: bool = True,
+    defects_format: str = "objects",
+    engine: str = "python",
+    defect_filter: DefectFilter = None,
+    defect_columns: List[str] = None,
+) -> SingleKlarfContent:
+    """this function parse only one wafer of a klarf file using its index
+
+    Only the header and the records of the previous wafers are parsed with
+    the section of the wafer, the DefectList blocks of the other wafers are
+    never read.
+
+    Args:
+        klarf (Path): the path of the klarf file
+        wafer_id (str): the id of the wafer, the last one is read when the id is repeated
+        index (KlarfIndex, optional): the index of the file, read with readKlarfIndex when missing
+        persist_index (bool, optional): write the sidecar file of the index when it is read. Defaults to False.
+
+    Returns:
+        SingleKlarfContent: the header of the klarf with the wafer
+    """
+
+    if not os.path.exists(klarf):
+        raise Exception(f"{klarf=} does not exists")
+
+    if index is None:
+        index = readKlarfIndex(klarf=klarf, persist=persist_index)
+    elif not is_index_valid(klarf=klarf, index=index):
+        raise ValueError(f"index of {klarf=} is outdated")
+
+    segments = index.get_segments(wafer_id=wafer_id)
+
+    parser = KlarfParser(
+        custom_columns_wafer=custom_columns_wafer,
+        custom_columns_defect=custom_columns_defect,
+        parse_summary=parse_summary,
+        defects_format=defects_format,
+        engine=engine,
+        defect_filter=defect_filter,
+        defect_columns=defect_columns,
+    )
+
+    _parse_segments(klarf=klarf, segments=segments, parser=parser)
+
+    return SingleKlarfContent(
+        **parser.header,
+        wafer=_get_parsed_wafer(
+            wafers=parser.pop_wafers(), wafer_id=wafer_id, klarf=klarf
+        ),
+    )
+
+
+def _get_parsed_wafer(wafers: List[Wafer], wafer_id: str, klarf: Path) -> Wafer:
+    # the last wafer parsed with the id, the segments can also give the wafers of other ids
+    for wafer in reversed(wafers):
+        if wafer.id == wafer_id:
+            return wafer
+
+    raise ValueError(f"{wafer_id=} was not parsed from {klarf=}")
+
+
+def _parse_segments(
+    klarf: Path, segments: List[Tuple[int, int]], parser: KlarfParser
+) -> None:
+    # feed the byte ranges of a wafer to parser and close it
+    if _get_decompressor(klarf) is None:
+        with _open_buffer(klarf) as buffer, memoryview(buffer) as view:
+            for segment_index, (start, end) in enumerate(segments):
+                _feed_segment(
+                    parser=parser, data=view[start:end], is_first=segment_index == 0
+                )
+    else:
+        with _open_klarf(klarf, "rb") as f:
+            for segment_index, (start, end) in enumerate(segments):
+                f.seek(start)
+                _feed_segment(
+                    parser=parser, data=f.read(end - start), is_first=segment_index == 0
+                )
+
+    parser.close()
+
+
+def _feed_segment(
+    parser: KlarfParser, data: Union[bytes, memoryview], is_first: bool
+) -> None:
+    if not is_first:
+        # stands for the DefectList left out of the previous wafer
+        parser.feed(data=b"DefectList;\n")
+
+    if isinstance(data, memoryview):
+        with data:
+            parser.feed(data=data)
+    else:
+        parser.feed(data=data)
@@ -0,0 +1,169 @@
+# MODULES
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+# MODELS
+from ..models.defect_filter import DefectFilter
+from ..models.klarf_content import KlarfContent, Wafer
+from ..models.klarf_index import WaferIndex
+
+# READERS
+from .klarf_file_reader import _get_decompressor, _open_buffer, readKlarf
+from .klarf_index_reader import (
+    _build_index,
+    _get_parsed_wafer,
+    _KlarfIndexParser,
+    _parse_segments,
+)
+from .klarf_parser import (
+    DEFECTS_FORMATS,
+    OBJECT_DEFECTS_FORMATS,
+    KlarfParser,
+    convert_columnar_wafers,
+)
+
+
+def readKlarfParallel(
+    klarf: Path,
+    workers: int = None,
+    custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+    custom_columns_defect: Union[List[str], Dict[str, type]] = None,
+    parse_summary: bool = True,
+    defects_as_generator: bool = False,
+    defects_format: str = "objects",
+    engine: str = "python",
+    defect_filter: DefectFilter = None,
+    defect_columns: List[str] = None,
+) -> KlarfContent:
+    """this function parse the wafers of one klarf file in a pool of processes
+
+    A header-only scan locates the wafer sections and gives the header, then
+    each wafer is parsed by a worker from the header, the records of the
+    previous wafers and its own section, read from the mapped file. Only the
+    last section of a repeated Wafer.id is parsed. Like iterKlarfs, workers
+    parse defects as a DefectTable: the "columnar" and "skip" formats get the
+    speed-up, the defect objects of the "objects" and "compact" formats are
+    built back one by one in the calling process, which leaves little to gain from workers.
+    The content is the one of readKlarf. Compressed files, which can not be read from an offset, are
+    parsed in the calling process.
+
+    Args:
+        klarf (Path): the path of the klarf file
+        workers (int, optional): number of processes, os.cpu_count() when missing, 1 to parse in the calling process
+
+    Returns:
+        KlarfContent: the content of the klarf as a dataclass
+    """
+
+    if not os.path.exists(klarf):
+        raise Exception(f"{klarf=} does not exists")
+
+    if defects_format not in DEFECTS_FORMATS:
+        raise ValueError(
+            f"Defects format not valid (current={defects_format} | accepted={DEFECTS_FORMATS})"
+        )
+
+    options = dict(
+        custom_columns_wafer=custom_columns_wafer,
+        custom_columns_defect=custom_columns_defect,
+        parse_summary=parse_summary,
+        defects_format=defects_format,
+        engine=engine,
+        defect_filter=defect_filter,
+        defect_columns=defect_columns,
+    )
+
+    workers = workers or os.cpu_count() or 1
+
+    sections = None
+    if workers > 1 and _get_decompressor(klarf) is None:
+        header, custom_attribute_wafer, sections = _scan_sections(
+            klarf=klarf, custom_columns_wafer=custom_columns_wafer
+        )
+
+    if not sections or len(sections) == 1:
+        klarf_content, _ = readKlarf(
+            klarf=klarf,
+            defects_as_generator=defects_as_generator,
+            with_raw_content=False,
+            **options,
+        )
+
+        return klarf_content
+
+    if defects_format in OBJECT_DEFECTS_FORMATS:
+        options["defects_format"] = "columnar"
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(sections))) as executor:
+        wafers = list(
+            executor.map(
+                _read_wafer,
+                repeat(klarf),
+                sections.keys(),
+                sections.values(),
+                repeat(options),
+            )
+        )
+
+    for wafer in wafers:
+        # like readKlarf, the wafers share the custom attributes of the last records
+        wafer.custom_attribute = custom_attribute_wafer
+
+    return KlarfContent(
+        **header,
+        wafers=convert_columnar_wafers(
+            wafers=wafers,
+            defects_format=defects_format,
+            defects_as_generator=defects_as_generator,
+        ),
+    )
+
+
+def _scan_sections(
+    klarf: Path, custom_columns_wafer: Union[List[str], Dict[str, type]]
+) -> Tuple[Dict, Dict, Dict[str, List[Tuple[int, int]]]]:
+    # header, custom wafer attributes and byte ranges of each wafer id kept by readKlarf, None to parse serially
+    stat = os.stat(klarf)
+    parser = _KlarfIndexParser(custom_columns_wafer=custom_columns_wafer)
+
+    with _open_buffer(klarf) as buffer:
+        index = _build_index(
+            chunks=[buffer], size=stat.st_size, mtime_ns=stat.st_mtime_ns, parser=parser
+        )
+
+    # a wafer is created by each DefectList, the last one of a repeated id is kept in the place of the first one
+    kept_sections: Dict[str, WaferIndex] = {}
+    for wafer_index in index.wafers:
+        if wafer_index.defect_list_start is not None:
+            kept_sections[wafer_index.id] = wafer_index
+
+    # DefectList blocks outside of a WaferID section or in the same section are not located by the index
+    number_of_wafers = len(parser.pop_wafers())
+    if number_of_wafers != sum(
+        wafer_index.defect_list_start is not None for wafer_index in index.wafers
+    ):
+        return parser.header, parser.custom_attribute_wafer, None
+
+    return (
+        parser.header,
+        parser.custom_attribute_wafer,
+        {
+            wafer_id: index.get_wafer_segments(wafer_index=wafer_index)
+            for wafer_id, wafer_index in kept_sections.items()
+        },
+    )
+
+
+def _read_wafer(
+    klarf: Path, wafer_id: str, segments: List[Tuple[int, int]], options: Dict
+) -> Wafer:
+    parser = KlarfParser(**options)
+
+    _parse_segments(klarf=klarf, segments=segments, parser=parser)
+
+    return _get_parsed_wafer(
+        wafers=parser.pop_wafers(), wafer_id=wafer_id, klarf=klarf
+    )
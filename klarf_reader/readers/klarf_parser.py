@@ -0,0 +1,1066 @@
+# MODULES
+import mmap
+import re
+import sys
+from dataclasses import replace
+from types import ModuleType
+from typing import Callable, Dict, Generator, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+# MODELS
+from ..models.klarf_content import (
+    CompactWafer,
+    Defect,
+    DieOrigin,
+    DiePitch,
+    FrozenDieOrigin,
+    FrozenSampleCenterLocation,
+    InspectionStationId,
+    SampleCenterLocation,
+    SamplePlanTest,
+    SetupId,
+    SlottedDefect,
+    Summary,
+    Test,
+    Wafer,
+    get_frozen_geometry,
+)
+from ..models.defect_filter import DefectFilter
+from ..models.klarf_index import KlarfIndex, WaferIndex
+from ..models.defect_table import (
+    COORDINATE_COLUMNS,
+    CUSTOM_COLUMN_DTYPES,
+    RAW_DEFECT_COLUMNS,
+    DefectTable,
+)
+
+ACCEPTED_KLARF_VERSIONS = [1.1, 1.2]
+DEFECTS_FORMATS = ["objects", "columnar", "skip", "compact"]
+# formats giving a list of defect objects per wafer
+OBJECT_DEFECTS_FORMATS = ["objects", "compact"]
+ENGINES = ["python", "numba"]
+CUSTOM_COLUMN_TYPES = list(CUSTOM_COLUMN_DTYPES)
+
+
+class KlarfParser:
+    """state machine parsing the records of a klarf file
+
+    The content is fed as bytes, in one or several chunks. The first token of a
+    record is read once and dispatched through a keyword table. While a
+    SummaryList or SampleTestPlan is open, the lines go straight to its
+    handler. DefectList blocks are never decoded: their end is searched in the
+    bytes and the whole block is handed to the engine, without copy when the
+    content is fed at once (bytes, bytearray, mmap or a memoryview of them).
+    With the "skip" defects format, the blocks are only searched for their end
+    and the wafers have no defects. The "compact" format gives CompactWafer
+    with SlottedDefect objects, equal DieOrigin / SampleCenterLocation records
+    sharing a single frozen object.
+    Custom columns are either a list of names, whose values are kept as
+    strings, or a schema {name: int | float | str} converting the values once
+    while parsing. Custom strings and wafer ids are interned.
+    Defects have no custom_attribute dict when no custom column is read.
+    Header values are stored in header as
+    KlarfContent keyword arguments and wafers are appended to completed_wafers
+    once their section is complete: after their SummaryList (or their
+    DefectList when summaries are not parsed), at the next WaferID or at the
+    end of the file. position is the offset in the content of the first byte
+    not parsed yet, record_start and record_end delimit the line (or the
+    DefectList block) being parsed. end_of_file is set by the EndOfFile record.
+    With record_index, the byte offsets of the header and of the wafer
+    sections, DefectList and SummaryList blocks are recorded in header_end and
+    wafer_indexes while parsing, SummaryList blocks only when summaries are
+    parsed, and get_index gives them once the parser is closed.
+    """
+
+    def __init__(
+        self,
+        custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+        custom_columns_defect: Union[List[str], Dict[str, type]] = None,
+        parse_summary: bool = True,
+        defects_as_generator: bool = False,
+        defects_format: str = "objects",
+        engine: str = "python",
+        defect_filter: DefectFilter = None,
+        defect_columns: List[str] = None,
+        record_index: bool = False,
+    ) -> None:
+        if defects_format not in DEFECTS_FORMATS:
+            raise ValueError(
+                f"Defects format not valid (current={defects_format} | accepted={DEFECTS_FORMATS})"
+            )
+
+        if engine not in ENGINES:
+            raise ValueError(
+                f"Engine not valid (current={engine} | accepted={ENGINES})"
+            )
+
+        if defect_columns is not None:
+            unknown_columns = [
+                column
+                for column in defect_columns
+                if column.upper() not in RAW_DEFECT_COLUMNS
+            ]
+            if unknown_columns:
+                raise ValueError(
+                    f"Defect columns not valid (current={unknown_columns} | accepted={list(RAW_DEFECT_COLUMNS)})"
+                )
+
+        for custom_columns in (custom_columns_wafer, custom_columns_defect):
+            if isinstance(custom_columns, dict) and not all(
+                custom_type in CUSTOM_COLUMN_TYPES
+                for custom_type in custom_columns.values()
+            ):
+                raise ValueError(
+                    f"Custom column types not valid (current={list(custom_columns.values())} | accepted={CUSTOM_COLUMN_TYPES})"
+                )
+
+        self.parse_summary = parse_summary
+        self.defects_as_generator = defects_as_generator
+        self.defects_format = defects_format
+        self.engine = engine
+        self.defect_filter = defect_filter
+        self.defect_columns = defect_columns
+
+        self.header: Dict = dict(
+            device_id=None,
+            setup_id="no_setup",
+            sample_type=None,
+            has_sample_test_plan=False,
+            sample_plan_test=SamplePlanTest(),
+        )
+        self.completed_wafers: List[Wafer] = []
+        self.number_of_lines = 0
+        self.position = 0
+        self.record_start = 0
+        self.record_end = 0
+        self.end_of_file = False
+        self.header_end: Optional[int] = None
+        self.wafer_indexes: Optional[List[WaferIndex]] = [] if record_index else None
+
+        # None types keep the raw strings
+        self._custom_columns_wafer = {
+            column.lower(): (column, _get_custom_type(custom_columns_wafer, column))
+            for column in custom_columns_wafer or []
+        }
+        self._custom_columns_defect = list(custom_columns_defect or [])
+        self._custom_columns_defect_types: Dict[str, type] = (
+            {
+                column.lower(): custom_type
+                for column, custom_type in custom_columns_defect.items()
+            }
+            if isinstance(custom_columns_defect, dict)
+            else None
+        )
+        self._custom_attribute_wafer = {}
+
+        self._defect_class = SlottedDefect if defects_format == "compact" else Defect
+        self._wafer_class = CompactWafer if defects_format == "compact" else Wafer
+        self._geometries: Dict[
+            Tuple, Union[FrozenDieOrigin, FrozenSampleCenterLocation]
+        ] = {}
+
+        self._die_pitch: DiePitch = None
+        self._die_origin: DieOrigin = None
+        self._sample_center_location: SampleCenterLocation = None
+        self._wafer_id: str = None
+        self._slot: int = None
+        self._inspection_test: int = None
+        self._tests: List[Test] = []
+        self._has_read_sample_test_plan = False
+
+        self._defect_columns: Dict[str, int] = {}
+        self._defect_columns_custom: Dict[str, int] = {}
+        self._defect_fields: List[Tuple[str, int, Callable]] = []
+        self._defect_fields_custom: List[Tuple[str, int, Callable]] = []
+        self._defect_defaults: Dict[str, int] = {}
+        self._defect_filter_fields: List[Tuple[str, int, Callable]] = []
+        self._max_defect_position = -1
+        self._projection = _get_projection(defect_columns=defect_columns)
+        self._parsed_fields: Set[str] = None
+        self._use_numba_engine = False
+        self._is_defect_list_open = False
+        self._defect_list_scanned = 0
+
+        self._remainder = bytearray()
+
+        self._pending_wafer: Wafer = None
+        self._last_wafer: Wafer = None
+        self._list_handler: Callable[[str], None] = None
+
+        self._keyword_handlers: Dict[str, Callable[[str], None]] = {
+            "fileversion": self._parse_file_version,
+            "filetimestamp": self._parse_file_timestamp,
+            "inspectionstationid": self._parse_inspection_station_id,
+            "sampletype": self._parse_sample_type,
+            "resulttimestamp": self._parse_result_timestamp,
+            "lotid": self._parse_lot_id,
+            "samplesize": self._parse_sample_size,
+            "deviceid": self._parse_device_id,
+            "setupid": self._parse_setup_id,
+            "stepid": self._parse_step_id,
+            "sampleorientationmarktype": self._parse_sample_orientation_mark_type,
+            "orientationmarklocation": self._parse_orientation_mark_location,
+            "diepitch": self._parse_die_pitch,
+            "dieorigin": self._parse_die_origin,
+            "samplecenterlocation": self._parse_sample_center_location,
+            "waferid": self._parse_wafer_id,
+            "slot": self._parse_slot,
+            "inspectiontest": self._parse_inspection_test,
+            "areapertest": self._parse_area_per_test,
+            "sampletestplan": self._open_sample_test_plan,
+            "defectrecordspec": self._parse_defect_record_spec,
+            "defectlist": self._open_defect_list,
+            "endoffile": self._parse_end_of_file,
+        }
+        if parse_summary:
+            self._keyword_handlers["summarylist"] = self._open_summary_list
+
+    def feed(self, data: Union[bytes, bytearray, mmap.mmap, memoryview]) -> None:
+        """parse a chunk of a klarf file, an incomplete last line is kept for the next chunk
+
+        Args:
+            data (Union[bytes, bytearray, mmap.mmap, memoryview]): the chunk
+        """
+
+        for _ in self._parse_data(data=data):
+            pass
+
+    def iter_parse(
+        self, data: Union[bytes, bytearray, mmap.mmap, memoryview]
+    ) -> Generator[Wafer, None, None]:
+        """parse a chunk of a klarf file, yield each wafer as soon as it is completed
+
+        Args:
+            data (Union[bytes, bytearray, mmap.mmap, memoryview]): the chunk
+
+        Returns:
+            Generator[Wafer, None, None]: the completed wafers in file order
+        """
+
+        for _ in self._parse_data(data=data):
+            yield from self.pop_wafers()
+
+    def parse_line(self, line: str) -> None:
+        """parse one decoded line of a klarf file
+
+        Args:
+            line (str): the line, with or without its line break
+        """
+
+        self.feed(data=line.rstrip("\n").encode() + b"\n")
+
+    def close(self) -> None:
+        """parse the last line and complete the last wafer at the end of the content"""
+
+        content_end = self.position + len(self._remainder)
+
+        if self._remainder:
+            self.feed(data=b"\n")
+
+        self._complete_pending_wafer()
+
+        if self.wafer_indexes is not None:
+            self._end_wafer_index(end=content_end)
+
+            if self.header_end is None:
+                self.header_end = content_end
+
+    def get_index(self, size: int, mtime_ns: int) -> KlarfIndex:
+        """get the offsets recorded with record_index, once the parser is closed
+
+        Args:
+            size (int): the size of the parsed file
+            mtime_ns (int): the modification time of the parsed file
+
+        Returns:
+            KlarfIndex: the offsets of the header and of each wafer section
+        """
+
+        if self.wafer_indexes is None:
+            raise ValueError(
+                f"offsets are only recorded with {self.__class__.__name__}(record_index=True)"
+            )
+
+        return KlarfIndex(
+            size=size,
+            mtime_ns=mtime_ns,
+            header_end=self.header_end,
+            wafers=self.wafer_indexes,
+        )
+
+    @property
+    def custom_attribute_wafer(self) -> Dict[str, any]:
+        """the custom wafer attributes of the records parsed so far, given to the next wafer"""
+
+        return self._custom_attribute_wafer
+
+    def pop_wafers(self) -> List[Wafer]:
+        """get and forget the wafers completed since the last call
+
+        Returns:
+            List[Wafer]: the completed wafers in file order
+        """
+
+        wafers, self.completed_wafers = self.completed_wafers, []
+
+        return wafers
+
+    def _parse_data(
+        self, data: Union[bytes, bytearray, mmap.mmap, memoryview]
+    ) -> Generator[None, None, None]:
+        if self._remainder:
+            self._remainder += data
+            buffer, position, end = self._remainder, 0, len(self._remainder)
+        else:
+            buffer, position, end = _get_buffer_region(data=data)
+
+        # offset in the content of the first byte of buffer
+        offset = self.position - position
+
+        while position < end:
+            if self._is_defect_list_open:
+                defect_list_end = self._find_defect_list_end(
+                    buffer=buffer, start=position, end=end
+                )
+                if defect_list_end == -1:
+                    if self.defects_format == "skip":
+                        # the complete lines already scanned are not needed anymore
+                        position += self._defect_list_scanned
+                        self._defect_list_scanned = 0
+                    break
+
+                self.record_start = offset + position
+                self.record_end = offset + defect_list_end
+                self._parse_defect_list(
+                    buffer=buffer, start=position, end=defect_list_end
+                )
+                position = defect_list_end
+            else:
+                line_end = buffer.find(b"\n", position, end)
+                if line_end == -1:
+                    break
+
+                self.record_start = offset + position
+                self.record_end = offset + line_end + 1
+                self._parse_line(line=buffer[position:line_end])
+                position = line_end + 1
+
+            if self.completed_wafers:
+                yield
+
+        self.position = offset + position
+
+        if buffer is self._remainder:
+            del self._remainder[:position]
+        else:
+            self._remainder = bytearray(buffer[position:end])
+
+    def _parse_line(self, line: bytes) -> None:
+        self.number_of_lines += 1
+        line = line.rstrip(b"\r").decode()
+
+        if self.number_of_lines == 1 and not line.lstrip().lower().startswith(
+            "fileversion"
+        ):
+            raise Exception(f"Unable to read this format from klarf")
+
+        if self._list_handler is not None:
+            self._list_handler(line)
+        else:
+            self._parse_record(line)
+
+    def _parse_record(self, line: str) -> None:
+        tokens = line.split(None, 1)
+        if not tokens:
+            return
+
+        keyword = tokens[0].rstrip(";").lower()
+
+        custom_column = self._custom_columns_wafer.get(keyword)
+        if custom_column is not None:
+            column, custom_type = custom_column
+            self._custom_attribute_wafer[column] = _convert_custom_wafer_value(
+                line=line, custom_type=custom_type
+            )
+            return
+
+        handler = self._keyword_handlers.get(keyword)
+        if handler is not None:
+            handler(line)
+
+    def _parse_file_version(self, line: str) -> None:
+        file_version_values = line.rstrip(";").split(" ")
+        file_version = float(f"{file_version_values[1]}.{file_version_values[2]}")
+        if file_version not in ACCEPTED_KLARF_VERSIONS:
+            raise ValueError(
+                f"Klarf file version not valid (current={file_version} | accepted={ACCEPTED_KLARF_VERSIONS})"
+            )
+
+        self.header["file_version"] = file_version
+
+    def _parse_file_timestamp(self, line: str) -> None:
+        self.header["file_timestamp"] = line[14:33].rstrip(";")
+
+    def _parse_inspection_station_id(self, line: str) -> None:
+        inspection_station_id = line.split(";")[0].split(" ")
+        inspection_station_id = [id.strip('"') for id in inspection_station_id]
+
+        self.header["inspection_station_id"] = InspectionStationId(
+            *inspection_station_id[1:4]
+        )
+
+    def _parse_sample_type(self, line: str) -> None:
+        self.header["sample_type"] = line.rstrip(";").split()[1]
+
+    def _parse_result_timestamp(self, line: str) -> None:
+        self.header["result_timestamp"] = line[16:35].rstrip(";")
+
+    def _parse_lot_id(self, line: str) -> None:
+        self.header["lot_id"] = line.split('"')[1]
+
+    def _parse_sample_size(self, line: str) -> None:
+        self.header["sample_size"] = int(line.rstrip(";").split(" ")[2])
+
+    def _parse_device_id(self, line: str) -> None:
+        self.header["device_id"] = line.split('"')[1]
+
+    def _parse_setup_id(self, line: str) -> None:
+        setup_id_value = line.rstrip(";").split('"')
+
+        self.header["setup_id"] = SetupId(
+            name=setup_id_value[1].strip(), date=setup_id_value[2].strip()
+        )
+
+    def _parse_step_id(self, line: str) -> None:
+        self.header["step_id"] = line.split('"')[1]
+
+    def _parse_sample_orientation_mark_type(self, line: str) -> None:
+        self.header["sample_orientation_mark_type"] = line.rstrip(";").split()[1]
+
+    def _parse_orientation_mark_location(self, line: str) -> None:
+        self.header["orientation_mark_location"] = line.rstrip(";").split()[1]
+
+    def _parse_die_pitch(self, line: str) -> None:
+        die_pitch_value = line.rstrip(";").split()
+
+        self._die_pitch = self.header["die_pitch"] = DiePitch(
+            x=float(die_pitch_value[1]), y=float(die_pitch_value[2])
+        )
+
+    def _parse_die_origin(self, line: str) -> None:
+        die_origin_value = line.rstrip(";").split()
+
+        self._die_origin = self._get_geometry(
+            geometry=DieOrigin(
+                x=float(die_origin_value[1]), y=float(die_origin_value[2])
+            ),
+            frozen_class=FrozenDieOrigin,
+        )
+
+    def _parse_sample_center_location(self, line: str) -> None:
+        sample_center_location_value = line.rstrip(";").split()
+
+        self._sample_center_location = self._get_geometry(
+            geometry=SampleCenterLocation(
+                x=float(sample_center_location_value[1]),
+                y=float(sample_center_location_value[2]),
+            ),
+            frozen_class=FrozenSampleCenterLocation,
+        )
+
+    def _get_geometry(
+        self,
+        geometry: Union[DieOrigin, SampleCenterLocation],
+        frozen_class: type,
+    ) -> Union[
+        DieOrigin, SampleCenterLocation, FrozenDieOrigin, FrozenSampleCenterLocation
+    ]:
+        if self.defects_format != "compact":
+            return geometry
+
+        # wafers of a file usually repeat the same values
+        return get_frozen_geometry(
+            cls=frozen_class, geometry=geometry, geometries=self._geometries
+        )
+
+    def _parse_wafer_id(self, line: str) -> None:
+        self._wafer_id = sys.intern(line.split('"')[1])
+        self._complete_pending_wafer()
+
+        if self.wafer_indexes is not None:
+            self._end_wafer_index(end=self.record_start)
+
+            if self.header_end is None:
+                self.header_end = self.record_start
+
+            self.wafer_indexes.append(
+                WaferIndex(id=self._wafer_id, start=self.record_start)
+            )
+
+    def _parse_slot(self, line: str) -> None:
+        self._slot = int(line.rstrip(";").split()[1])
+
+    def _parse_inspection_test(self, line: str) -> None:
+        self._inspection_test = int(line.rstrip(";").split()[1])
+
+    def _parse_area_per_test(self, line: str) -> None:
+        area_per_test = float(line.rstrip(";").split()[1])
+
+        self._tests.append(Test(id=self._inspection_test, area=area_per_test))
+
+    def _parse_end_of_file(self, line: str) -> None:
+        self.end_of_file = True
+
+        self._complete_pending_wafer()
+
+        if self.wafer_indexes is not None:
+            self._end_wafer_index(end=self.record_start)
+
+    def _open_sample_test_plan(self, line: str) -> None:
+        if self._has_read_sample_test_plan:
+            return
+
+        self.header["has_sample_test_plan"] = True
+
+        if line.rstrip().endswith(";"):
+            self._has_read_sample_test_plan = True
+        else:
+            self._list_handler = self._parse_sample_test_plan_line
+
+    def _parse_sample_test_plan_line(self, line: str) -> None:
+        if line.startswith(" "):
+            sample_test_plan_value = line.strip().rstrip(";").split()
+
+            sample_plan_test = self.header["sample_plan_test"]
+            sample_plan_test.x.append(int(sample_test_plan_value[0]))
+            sample_plan_test.y.append(int(sample_test_plan_value[1]))
+        else:
+            self._parse_record(line)
+
+        if line.rstrip().endswith(";"):
+            self._list_handler = None
+            self._has_read_sample_test_plan = True
+
+    def _open_summary_list(self, line: str) -> None:
+        if self.wafer_indexes:
+            self.wafer_indexes[-1].summary_list_start = self.record_start
+            self.wafer_indexes[-1].summary_list_end = self.record_end
+
+        if not line.rstrip().endswith(";"):
+            self._list_handler = self._parse_summary_list_line
+
+    def _parse_summary_list_line(self, line: str) -> None:
+        if not line.startswith(" "):
+            self._parse_record(line)
+            return
+
+        self._list_handler = None
+
+        if self.wafer_indexes:
+            self.wafer_indexes[-1].summary_list_end = self.record_end
+
+        split = re.sub(r"[\s;]+", " ", line).strip().split()
+
+        self._last_wafer.summary = Summary(
+            number_of_defects=int(split[1]),
+            defect_density=float(split[2]),
+            number_of_dies=int(split[3]),
+            number_of_def_dies=int(split[4]),
+        )
+
+        if self._pending_wafer is self._last_wafer:
+            self._complete_pending_wafer()
+
+    def _parse_defect_record_spec(self, line: str) -> None:
+        # the ";" closing the record is not part of the last column name
+        line_without_space = re.sub(r"\s+", " ", line).strip().rstrip(";").strip()
+        parameters = line_without_space.split(" ")
+
+        self._defect_columns = {
+            column: parameters.index(column) - 1
+            for column in RAW_DEFECT_COLUMNS
+            if column in parameters
+        }
+        self._defect_columns_custom = {
+            column: parameters.index(column) - 1
+            for column in self._custom_columns_defect
+            if column in parameters
+        }
+
+        self._use_numba_engine = (
+            self.engine == "numba"
+            and _get_numba_reader().is_supported(defect_columns=self._defect_columns)
+        )
+
+        # position of a column in a DefectList row is its DefectRecordSpec position - 1
+        defect_fields = [
+            (field, self._defect_columns[column] - 1, int if is_int else float)
+            for column, (field, is_int, _) in RAW_DEFECT_COLUMNS.items()
+            if column in self._defect_columns
+        ]
+        if self.defect_filter is not None:
+            self._defect_filter_fields = [
+                (field, position, convert)
+                for field, position, convert in defect_fields
+                if field in self.defect_filter.fields
+            ]
+
+        # filters evaluated on whole blocks need their columns even if they are not projected
+        self._parsed_fields = self._projection
+        if (
+            self._projection is not None
+            and self.defect_filter is not None
+            and (self.defect_filter.vectorized or self._use_numba_engine)
+        ):
+            self._parsed_fields = _get_projection(
+                defect_columns=self.defect_columns,
+                fields=self.defect_filter.fields,
+            )
+
+        self._defect_fields = [
+            (field, position, convert)
+            for field, position, convert in defect_fields
+            if self._parsed_fields is None or field in self._parsed_fields
+        ]
+        self._defect_fields_custom = [
+            (
+                column.lower(),
+                position - 1,
+                _get_custom_converter(
+                    _get_custom_type(self._custom_columns_defect_types, column.lower())
+                ),
+            )
+            for column, position in self._defect_columns_custom.items()
+        ]
+        self._defect_defaults = {
+            field: (
+                None
+                if self._projection is not None and field not in self._projection
+                else 0
+            )
+            for column, (field, _, is_required) in RAW_DEFECT_COLUMNS.items()
+            if (not is_required and column not in self._defect_columns)
+            or (self._projection is not None and field not in self._projection)
+        }
+        self._max_defect_position = max(
+            [
+                position
+                for _, position, _ in self._defect_fields + self._defect_filter_fields
+            ]
+            + [position for _, position, _ in self._defect_fields_custom],
+            default=-1,
+        )
+
+    def _open_defect_list(self, line: str) -> None:
+        if self.wafer_indexes:
+            self.wafer_indexes[-1].defect_list_start = self.record_start
+
+        if line.rstrip().endswith(";"):
+            self._parse_defect_list(buffer=b"", start=0, end=0)
+        else:
+            self._is_defect_list_open = True
+            self._defect_list_scanned = 0
+
+    def _find_defect_list_end(
+        self, buffer: Union[bytes, bytearray, mmap.mmap], start: int, end: int
+    ) -> int:
+        # the DefectList ends with the first line whose last character is ";"
+        position = start + self._defect_list_scanned
+        while True:
+            semicolon = buffer.find(b";", position, end)
+            line_end = buffer.find(b"\n", semicolon, end) if semicolon != -1 else -1
+            if line_end == -1:
+                # nothing before the last incomplete line has to be scanned again
+                last_line_end = buffer.rfind(b"\n", start, end)
+                if last_line_end != -1:
+                    self._defect_list_scanned = last_line_end + 1 - start
+                return -1
+
+            if not buffer[semicolon + 1 : line_end].strip():
+                return line_end + 1
+
+            position = semicolon + 1
+
+    def _parse_defect_list(
+        self, buffer: Union[bytes, bytearray, mmap.mmap], start: int, end: int
+    ) -> None:
+        self._is_defect_list_open = False
+
+        if self.wafer_indexes:
+            self.wafer_indexes[-1].defect_list_end = self.record_end
+
+        if self.defects_format == "skip":
+            self._add_wafer(defects=[])
+            return
+
+        use_columns = (
+            self._use_numba_engine
+            or self.defects_format == "columnar"
+            or (self.defect_filter is not None and self.defect_filter.vectorized)
+        )
+
+        if self._use_numba_engine:
+            with memoryview(buffer) as view:
+                columns, custom_attribute = _get_numba_reader().read_defect_list(
+                    defect_list=view[start:end],
+                    defect_columns={
+                        column: position
+                        for column, position in self._defect_columns.items()
+                        if self._parsed_fields is None
+                        or RAW_DEFECT_COLUMNS[column][0] in self._parsed_fields
+                    },
+                    defect_columns_custom=self._defect_columns_custom,
+                    custom_columns_types=self._custom_columns_defect_types,
+                )
+        else:
+            columns = {field: [] for field, _, _ in self._defect_fields}
+            custom_attribute = {
+                column: [] for column, _, _ in self._defect_fields_custom
+            }
+            defects: List[Defect] = []
+            filter_rows = (
+                self.defect_filter is not None and not self.defect_filter.vectorized
+            )
+
+            for line in buffer[start:end].split(b"\n"):
+                if not line.startswith(b" "):
+                    continue
+
+                # the tokens after the last needed one are left in a single token
+                defect_parameters = line.split(b";", 1)[0].split(
+                    None, self._max_defect_position + 1
+                )
+
+                if filter_rows and not self._is_defect_kept(
+                    defect_parameters=defect_parameters
+                ):
+                    continue
+
+                if use_columns:
+                    self._parse_defect_to_columns(
+                        defect_parameters=defect_parameters,
+                        columns=columns,
+                        custom_attribute=custom_attribute,
+                    )
+                else:
+                    defects.append(
+                        self._parse_defect(defect_parameters=defect_parameters)
+                    )
+
+        if use_columns:
+            if self._custom_columns_defect_types is not None:
+                custom_attribute = {
+                    column: np.asarray(
+                        values,
+                        dtype=CUSTOM_COLUMN_DTYPES[
+                            self._custom_columns_defect_types[column]
+                        ],
+                    )
+                    for column, values in custom_attribute.items()
+                }
+
+            defects = build_defect_table(
+                columns=columns,
+                custom_attribute=custom_attribute,
+                die_pitch=self._die_pitch,
+                sample_center_location=self._sample_center_location,
+                projection=self._parsed_fields,
+            )
+
+            if self.defect_filter is not None and (
+                self._use_numba_engine or self.defect_filter.vectorized
+            ):
+                defects = defects[self.defect_filter.get_mask(columns=vars(defects))]
+
+            if self._parsed_fields is not self._projection:
+                defects = replace(
+                    defects,
+                    **{field: None for field in self._parsed_fields - self._projection},
+                )
+
+            if self.defects_format in OBJECT_DEFECTS_FORMATS:
+                defects = defects.to_list(defect_class=self._defect_class)
+
+        if self.defects_format in OBJECT_DEFECTS_FORMATS and self.defects_as_generator:
+            defects = (defect for defect in defects)
+
+        self._add_wafer(defects=defects)
+
+    def _is_defect_kept(self, defect_parameters: List[bytes]) -> bool:
+        values = {
+            field: convert(defect_parameters[position])
+            for field, position, convert in self._defect_filter_fields
+        }
+
+        if self.defect_filter.bounding_box is not None:
+            values["x"], values["y"] = convert_coordinates(
+                die_pitch=self._die_pitch,
+                sample_center_location=self._sample_center_location,
+                xrel=values["x_rel"],
+                yrel=values["y_rel"],
+                xindex=values["x_index"],
+                yindex=values["y_index"],
+            )
+
+        return self.defect_filter.matches(values=values)
+
+    def _parse_defect(self, defect_parameters: List[bytes]) -> Defect:
+        values = {
+            field: convert(defect_parameters[position])
+            for field, position, convert in self._defect_fields
+        }
+        custom_attribute = (
+            {
+                column: convert(defect_parameters[position])
+                for column, position, convert in self._defect_fields_custom
+            }
+            if self._defect_fields_custom
+            else None
+        )
+
+        if self._projection is not None and "x" not in self._projection:
+            point = None
+        else:
+            point = convert_coordinates(
+                die_pitch=self._die_pitch,
+                sample_center_location=self._sample_center_location,
+                xrel=values["x_rel"],
+                yrel=values["y_rel"],
+                xindex=values["x_index"],
+                yindex=values["y_index"],
+            )
+
+        return self._defect_class(
+            **values,
+            **self._defect_defaults,
+            point=point,
+            custom_attribute=custom_attribute,
+        )
+
+    def _parse_defect_to_columns(
+        self,
+        defect_parameters: List[bytes],
+        columns: Dict[str, List],
+        custom_attribute: Dict[str, List],
+    ) -> None:
+        for field, position, convert in self._defect_fields:
+            columns[field].append(convert(defect_parameters[position]))
+
+        for column, position, convert in self._defect_fields_custom:
+            custom_attribute[column].append(convert(defect_parameters[position]))
+
+    def _add_wafer(
+        self, defects: Union[List[Defect], Generator[Defect, None, None], DefectTable]
+    ) -> None:
+        self._complete_pending_wafer()
+
+        self._pending_wafer = self._last_wafer = self._wafer_class(
+            id=self._wafer_id,
+            slot=self._slot,
+            die_origin=self._die_origin,
+            sample_center_location=self._sample_center_location,
+            defects=defects,
+            tests=self._tests.copy(),
+            custom_attribute=self._custom_attribute_wafer,
+        )
+
+        self._tests.clear()
+
+        if not self.parse_summary:
+            self._complete_pending_wafer()
+
+    def _complete_pending_wafer(self) -> None:
+        if self._pending_wafer is not None:
+            self.completed_wafers.append(self._pending_wafer)
+            self._pending_wafer = None
+
+    def _end_wafer_index(self, end: int) -> None:
+        if self.wafer_indexes and self.wafer_indexes[-1].end is None:
+            self.wafer_indexes[-1].end = end
+
+
+def _get_buffer_region(
+    data: Union[bytes, bytearray, mmap.mmap, memoryview],
+) -> Tuple[Union[bytes, bytearray, mmap.mmap], int, int]:
+    # a searchable buffer (with find) and the region of data inside of it
+    if isinstance(data, (bytes, bytearray, mmap.mmap)):
+        return data, 0, len(data)
+
+    view = memoryview(data)
+    if view.nbytes == 0:
+        return b"", 0, 0
+
+    if isinstance(view.obj, (bytes, bytearray, mmap.mmap)) and view.c_contiguous:
+        start = (
+            np.frombuffer(view, dtype=np.uint8).ctypes.data
+            - np.frombuffer(view.obj, dtype=np.uint8).ctypes.data
+        )
+        return view.obj, start, start + view.nbytes
+
+    return view.tobytes(), 0, view.nbytes
+
+
+def convert_columnar_wafers(
+    wafers: List[Wafer], defects_format: str, defects_as_generator: bool = False
+) -> List[Wafer]:
+    """convert the DefectTable of wafers parsed as "columnar" to the defects of defects_format
+
+    Args:
+        wafers (List[Wafer]): the wafers, their defects are a DefectTable or already a list
+        defects_format (str): the requested format, wafers are left as they are unless it
+            is one of OBJECT_DEFECTS_FORMATS
+        defects_as_generator (bool, optional): give the defects as a generator. Defaults to False.
+
+    Returns:
+        List[Wafer]: the wafers, CompactWafer sharing their frozen geometry for "compact"
+    """
+
+    if defects_format not in OBJECT_DEFECTS_FORMATS:
+        return wafers
+
+    geometries = {}
+    converted_wafers = []
+    for wafer in wafers:
+        if defects_format == "compact":
+            if not isinstance(wafer, CompactWafer):
+                wafer = CompactWafer.from_wafer(wafer=wafer, geometries=geometries)
+        elif isinstance(wafer.defects, DefectTable):
+            wafer.defects = wafer.defects.to_list()
+
+        if defects_as_generator:
+            wafer.defects = (defect for defect in wafer.defects)
+
+        converted_wafers.append(wafer)
+
+    return converted_wafers
+
+
+def build_defect_table(
+    columns: Dict[str, List],
+    custom_attribute: Dict[str, List],
+    die_pitch: DiePitch,
+    sample_center_location: SampleCenterLocation,
+    projection: Set[str] = None,
+) -> DefectTable:
+    """build a DefectTable and compute its coordinates
+
+    Args:
+        columns (Dict[str, List]): values per column of the table
+        custom_attribute (Dict[str, List]): raw values per custom column
+        die_pitch (DiePitch): the die pitch of the klarf
+        sample_center_location (SampleCenterLocation): the sample center of the wafer
+        projection (Set[str], optional): the columns of the table, the other ones are None
+
+    Returns:
+        DefectTable: the table
+    """
+
+    defect_table = DefectTable.from_columns(
+        columns=columns, custom_attribute=custom_attribute, projection=projection
+    )
+
+    if defect_table.x is None:
+        return defect_table
+
+    defect_table.x, defect_table.y = convert_coordinates(
+        die_pitch=die_pitch,
+        sample_center_location=sample_center_location,
+        xrel=defect_table.x_rel,
+        yrel=defect_table.y_rel,
+        xindex=defect_table.x_index,
+        yindex=defect_table.y_index,
+    )
+
+    return defect_table
+
+
+def _get_custom_type(
+    custom_columns: Union[List[str], Dict[str, type]], column: str
+) -> type:
+    # the type of a custom column, None when the values are kept as strings
+    return custom_columns.get(column) if isinstance(custom_columns, dict) else None
+
+
+def _get_custom_converter(
+    custom_type: type,
+) -> Callable[[bytes], Union[int, float, str]]:
+    if custom_type is None or custom_type is str:
+        return _decode_interned
+
+    return custom_type
+
+
+def _decode_interned(value: bytes) -> str:
+    # categorical values repeated on many defects share a single string
+    return sys.intern(value.decode())
+
+
+def _convert_custom_wafer_value(
+    line: str, custom_type: type
+) -> Union[Optional[str], List[Union[int, float]]]:
+    # raw values keep the first token (None for a record without value), typed strings keep
+    # the whole record ("" without value), typed numbers are always the list of the values
+    attribute_values = line.strip().rstrip(";").split()
+    if custom_type is None:
+        return attribute_values[1] if len(attribute_values) > 1 else None
+
+    if custom_type is str:
+        value = line.split(None, 1)[1] if len(attribute_values) > 1 else ""
+        return sys.intern(value.strip().rstrip(";").strip().strip('"'))
+
+    return [custom_type(value) for value in attribute_values[1:]]
+
+
+def _get_numba_reader() -> ModuleType:
+    # numba is only imported once its engine is used, not with the package
+    from . import numba_defect_list_reader
+
+    return numba_defect_list_reader
+
+
+def _get_projection(
+    defect_columns: List[str], fields: Tuple[str, ...] = ()
+) -> Set[str]:
+    # the DefectTable columns of a defect_columns projection, None without projection
+    if defect_columns is None:
+        return None
+
+    projection = {"id", *fields}
+    projection.update(
+        RAW_DEFECT_COLUMNS[column.upper()][0] for column in defect_columns
+    )
+
+    if all(column in projection for column in COORDINATE_COLUMNS):
+        projection.update(("x", "y"))
+
+    return projection
+
+
+def convert_coordinates(
+    die_pitch: DiePitch,
+    sample_center_location: SampleCenterLocation,
+    xrel: float,
+    yrel: float,
+    xindex: int,
+    yindex: int,
+) -> Tuple[float, float]:
+    """convert defect attributes to real x,y coordianates
+
+    Args:
+        die_pitch (DiePitch): _description_
+        sample_center_location_x (float): _description_
+        sample_center_location_y (float): _description_
+        xrel (float): _description_
+        yrel (float): _description_
+        xindex (int): _description_
+        yindex (int): _description_
+
+    Returns:
+        Tuple[float, float]: the x and y coordinates
+    """
+
+    x = xindex * die_pitch.x + xrel - sample_center_location.x
+    y = yindex * die_pitch.y + yrel - sample_center_location.y
+
+    return x, y
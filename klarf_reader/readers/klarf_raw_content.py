@@ -0,0 +1,160 @@
+# MODULES
+import io
+import mmap
+from pathlib import Path
+from typing import Generator, Iterable, Iterator, Optional, Tuple, Union
+
+# MODELS
+from ..models.klarf_index import KlarfIndex
+
+# size of the blocks of lines decoded at once
+LINES_BLOCK_SIZE = 1 << 20
+
+
+class KlarfRawContent:
+    """content of a klarf file parsed by readKlarf, iterated as its decoded lines
+
+    Iterating gives the lines like a file opened in text mode, once. For an
+    uncompressed file, buffer is the mapped file that was parsed and the
+    sections of the wafers are memoryviews of buffer, without copy. A
+    compressed file is never held in memory as a whole: buffer is None and
+    klarf is decompressed again by chunks to iterate the lines and to read
+    each requested section. Sections are located by index, the offsets
+    recorded by the parser while the content was parsed.
+    close() (or a with statement) closes the mapped file, the sections got
+    from it have to be released before.
+    """
+
+    def __init__(
+        self,
+        buffer: Optional[Union[bytes, mmap.mmap]],
+        index: KlarfIndex,
+        klarf: Path = None,
+    ) -> None:
+        self.buffer = buffer
+        self.index = index
+        self.klarf = klarf
+
+        self._view = memoryview(buffer) if buffer is not None else None
+        self._lines: Iterator[str] = None
+
+    def __iter__(self) -> "KlarfRawContent":
+        return self
+
+    def __next__(self) -> str:
+        if self._lines is None:
+            self._lines = (
+                self._iter_lines()
+                if self.buffer is not None
+                else self._iter_decompressed_lines()
+            )
+
+        return next(self._lines)
+
+    def __enter__(self) -> "KlarfRawContent":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """release the content, the mapped file of an uncompressed klarf is closed"""
+
+        if self._lines is not None:
+            self._lines.close()
+
+        if self._view is not None:
+            self._view.release()
+
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+    def get_header(self) -> memoryview:
+        """the records before the first WaferID"""
+
+        return next(self._iter_sections(spans=[(0, self.index.header_end)]))
+
+    def get_wafer(self, wafer_id: str) -> memoryview:
+        """the section of a wafer, from its WaferID to the next WaferID or EndOfFile
+
+        Args:
+            wafer_id (str): the id of the wafer, the last one is read when the id is repeated
+
+        Returns:
+            memoryview: the bytes of the section
+        """
+
+        wafer_index = self.index.get_wafer(wafer_id=wafer_id)
+
+        return next(self._iter_sections(spans=[(wafer_index.start, wafer_index.end)]))
+
+    def get_defect_list(self, wafer_id: str) -> Optional[memoryview]:
+        """the DefectList of a wafer, from its DefectList record to its last line
+
+        Args:
+            wafer_id (str): the id of the wafer, the last one is read when the id is repeated
+
+        Returns:
+            Optional[memoryview]: the bytes of the DefectList, None when the wafer has none
+        """
+
+        wafer_index = self.index.get_wafer(wafer_id=wafer_id)
+        if wafer_index.defect_list_start is None:
+            return None
+
+        return next(
+            self._iter_sections(
+                spans=[(wafer_index.defect_list_start, wafer_index.defect_list_end)]
+            )
+        )
+
+    def iter_wafers(self) -> Generator[Tuple[str, memoryview], None, None]:
+        """the sections of all the wafers in file order, repeated ids included
+
+        Returns:
+            Generator[Tuple[str, memoryview], None, None]: the id and the bytes of each section
+        """
+
+        wafer_indexes = self.index.wafers
+        sections = self._iter_sections(
+            spans=[
+                (wafer_index.start, wafer_index.end) for wafer_index in wafer_indexes
+            ]
+        )
+
+        for wafer_index, section in zip(wafer_indexes, sections):
+            yield wafer_index.id, section
+
+    def _iter_sections(
+        self, spans: Iterable[Tuple[int, int]]
+    ) -> Generator[memoryview, None, None]:
+        if self.buffer is not None:
+            for start, end in spans:
+                yield self._view[start:end]
+            return
+
+        from .klarf_file_reader import _open_klarf
+
+        # sections are in file order, the decompressed stream is only read forward
+        with _open_klarf(klarf=self.klarf, mode="rb") as f:
+            for start, end in spans:
+                f.seek(start)
+                yield memoryview(f.read(end - start))
+
+    def _iter_lines(self) -> Generator[str, None, None]:
+        # blocks end after a line break so that "\r\n" is never split between two blocks
+        position, size = 0, len(self.buffer)
+        while position < size:
+            end = self.buffer.find(b"\n", min(position + LINES_BLOCK_SIZE, size))
+            end = size if end == -1 else end + 1
+
+            yield from io.StringIO(
+                str(self._view[position:end], encoding="utf-8"), newline=None
+            )
+            position = end
+
+    def _iter_decompressed_lines(self) -> Generator[str, None, None]:
+        from .klarf_file_reader import _open_klarf
+
+        with _open_klarf(klarf=self.klarf, mode="rb") as f:
+            yield from io.TextIOWrapper(f, encoding="utf-8", newline=None)
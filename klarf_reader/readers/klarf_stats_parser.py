@@ -0,0 +1,174 @@
+# MODULES
+import mmap
+import time
+from typing import Callable, Dict, List, Union
+
+import numpy as np
+
+# MODELS
+from ..models.defect_filter import DefectFilter
+from ..models.klarf_content import Wafer
+from ..models.parse_stats import ParseStats
+
+# READERS
+from .klarf_parser import KlarfParser
+
+# phases of ParseStats, hooks are only counted in total_seconds
+PHASES = ["header", "defect_list", "summary_list", "sample_test_plan", "hooks"]
+
+
+class KlarfStatsParser(KlarfParser):
+    """KlarfParser filling a ParseStats and calling progress hooks
+
+    The handlers of the blocks are wrapped to time them, KlarfParser itself is
+    left untouched so that a parse without stats nor hooks costs nothing more.
+    on_progress(position) is called after each DefectList block and each fed
+    chunk, on_wafer(wafer, position) once a wafer is completed, position being
+    the offset in the content of the first byte not parsed yet.
+    """
+
+    def __init__(
+        self,
+        stats: ParseStats = None,
+        on_progress: Callable[[int], None] = None,
+        on_wafer: Callable[[Wafer, int], None] = None,
+        custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+        custom_columns_defect: Union[List[str], Dict[str, type]] = None,
+        parse_summary: bool = True,
+        defects_as_generator: bool = False,
+        defects_format: str = "objects",
+        engine: str = "python",
+        defect_filter: DefectFilter = None,
+        defect_columns: List[str] = None,
+        record_index: bool = False,
+    ) -> None:
+        super().__init__(
+            custom_columns_wafer=custom_columns_wafer,
+            custom_columns_defect=custom_columns_defect,
+            parse_summary=parse_summary,
+            defects_as_generator=defects_as_generator,
+            defects_format=defects_format,
+            engine=engine,
+            defect_filter=defect_filter,
+            defect_columns=defect_columns,
+            record_index=record_index,
+        )
+
+        self.stats = stats if stats is not None else ParseStats()
+        self.on_progress = on_progress
+        self.on_wafer = on_wafer
+
+        self._seconds = dict.fromkeys(PHASES, 0.0)
+        self._defect_list_lines = 0
+        self._start = self._phase_start = time.perf_counter()
+        self._phase = "header"
+
+    def feed(self, data: Union[bytes, bytearray, mmap.mmap, memoryview]) -> None:
+        super().feed(data=data)
+
+        self._call_progress(position=self.position)
+
+    def close(self) -> None:
+        super().close()
+
+        self._enter(phase="header")
+
+        stats = self.stats
+        stats.number_of_bytes = self.position
+        stats.number_of_lines = self.number_of_lines + self._defect_list_lines
+        stats.header_seconds = self._seconds["header"]
+        stats.defect_list_seconds = self._seconds["defect_list"]
+        stats.summary_list_seconds = self._seconds["summary_list"]
+        stats.sample_test_plan_seconds = self._seconds["sample_test_plan"]
+        stats.total_seconds = time.perf_counter() - self._start
+
+    def _find_defect_list_end(
+        self, buffer: Union[bytes, bytearray, mmap.mmap], start: int, end: int
+    ) -> int:
+        defect_list_end = super()._find_defect_list_end(
+            buffer=buffer, start=start, end=end
+        )
+
+        # the scanned lines of a skipped DefectList are dropped before its end is found
+        if defect_list_end == -1 and self.defects_format == "skip":
+            self._defect_list_lines += _count_lines(
+                buffer=buffer, start=start, end=start + self._defect_list_scanned
+            )
+
+        return defect_list_end
+
+    def _parse_defect_list(
+        self, buffer: Union[bytes, bytearray, mmap.mmap], start: int, end: int
+    ) -> None:
+        phase = self._enter(phase="defect_list")
+        self._defect_list_lines += _count_lines(buffer=buffer, start=start, end=end)
+        super()._parse_defect_list(buffer=buffer, start=start, end=end)
+        self._enter(phase=phase)
+
+        self._call_progress(position=self.record_end)
+
+    def _open_summary_list(self, line: str) -> None:
+        phase = self._enter(phase="summary_list")
+        super()._open_summary_list(line)
+        self._enter(phase=phase)
+
+    def _parse_summary_list_line(self, line: str) -> None:
+        phase = self._enter(phase="summary_list")
+        super()._parse_summary_list_line(line)
+        self._enter(phase=phase)
+
+    def _open_sample_test_plan(self, line: str) -> None:
+        phase = self._enter(phase="sample_test_plan")
+        super()._open_sample_test_plan(line)
+        self._enter(phase=phase)
+
+    def _parse_sample_test_plan_line(self, line: str) -> None:
+        phase = self._enter(phase="sample_test_plan")
+        super()._parse_sample_test_plan_line(line)
+        self._enter(phase=phase)
+
+    def _complete_pending_wafer(self) -> None:
+        wafer = self._pending_wafer
+
+        super()._complete_pending_wafer()
+
+        if wafer is None:
+            return
+
+        defects = wafer.defects
+        self.stats.defects_per_wafer[wafer.id] = (
+            len(defects) if hasattr(defects, "__len__") else None
+        )
+
+        if self.on_wafer is not None:
+            phase = self._enter(phase="hooks")
+            self.on_wafer(wafer, self.record_end)
+            self._enter(phase=phase)
+
+    def _call_progress(self, position: int) -> None:
+        if self.on_progress is not None:
+            phase = self._enter(phase="hooks")
+            self.on_progress(position)
+            self._enter(phase=phase)
+
+    def _enter(self, phase: str) -> str:
+        # add the time since the last switch to the current phase, return the current phase
+        now = time.perf_counter()
+        self._seconds[self._phase] += now - self._phase_start
+
+        previous_phase, self._phase, self._phase_start = self._phase, phase, now
+
+        return previous_phase
+
+
+def _count_lines(
+    buffer: Union[bytes, bytearray, mmap.mmap], start: int, end: int
+) -> int:
+    if isinstance(buffer, (bytes, bytearray)):
+        return buffer.count(b"\n", start, end)
+
+    # mmap has no count, the region is counted in place
+    with memoryview(buffer) as view:
+        return int(
+            np.count_nonzero(np.frombuffer(view[start:end], dtype=np.uint8) == 10)
+        )
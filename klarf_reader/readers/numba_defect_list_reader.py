@@ -0,0 +1,375 @@
+# MODULES
+import sys
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+# MODELS
+from ..models.defect_table import RAW_DEFECT_COLUMNS
+
+# UTILS
+from ..utils.numba_utils import NUMBA_AVAILABLE, jit
+
+# largest integer below which every integer is exactly representable as a float64
+_MAX_EXACT_MANTISSA = 2**53
+_POWERS_OF_TEN = np.array([10.0**exponent for exponent in range(23)])
+
+
+@jit
+def _is_space(byte: int) -> bool:
+    # same characters as bytes.split() without arguments
+    return byte == 32 or 9 <= byte <= 13
+
+
+@jit
+def _parse_int(buffer: np.ndarray, start: int, end: int) -> Tuple[bool, int]:
+    position = start
+    negative = False
+    if buffer[position] == 43 or buffer[position] == 45:  # + or -
+        negative = buffer[position] == 45
+        position += 1
+
+    if position == end or end - position > 18:
+        return False, 0
+
+    value = 0
+    while position < end:
+        digit = np.int64(buffer[position]) - 48
+        if digit < 0 or digit > 9:
+            return False, 0
+        value = value * 10 + digit
+        position += 1
+
+    return True, -value if negative else value
+
+
+@jit
+def _parse_float(
+    buffer: np.ndarray, start: int, end: int, powers_of_ten: np.ndarray
+) -> Tuple[bool, float]:
+    position = start
+    negative = False
+    if buffer[position] == 43 or buffer[position] == 45:  # + or -
+        negative = buffer[position] == 45
+        position += 1
+
+    mantissa = 0
+    exponent = 0
+    significant_digits = 0
+    has_digits = False
+    in_fraction = False
+    while position < end:
+        byte = buffer[position]
+        if byte == 46 and not in_fraction:  # .
+            in_fraction = True
+            position += 1
+            continue
+
+        digit = np.int64(byte) - 48
+        if digit < 0 or digit > 9:
+            break
+
+        has_digits = True
+        if mantissa != 0 or digit != 0:
+            significant_digits += 1
+            if significant_digits > 18:
+                return False, 0.0
+            mantissa = mantissa * 10 + digit
+        if in_fraction:
+            exponent -= 1
+        position += 1
+
+    if not has_digits:
+        return False, 0.0
+
+    if position < end and (buffer[position] == 101 or buffer[position] == 69):  # e E
+        position += 1
+        exponent_negative = False
+        if position < end and (buffer[position] == 43 or buffer[position] == 45):
+            exponent_negative = buffer[position] == 45
+            position += 1
+
+        if position == end or end - position > 4:
+            return False, 0.0
+
+        exponent_value = 0
+        while position < end:
+            digit = np.int64(buffer[position]) - 48
+            if digit < 0 or digit > 9:
+                return False, 0.0
+            exponent_value = exponent_value * 10 + digit
+            position += 1
+
+        exponent += -exponent_value if exponent_negative else exponent_value
+
+    if position != end:
+        return False, 0.0
+
+    # exact mantissa and exact power of ten: a single correctly rounded IEEE
+    # operation gives the same result as float() (Clinger's fast path)
+    if mantissa == 0:
+        value = 0.0
+    elif mantissa > _MAX_EXACT_MANTISSA or exponent < -22 or exponent > 22:
+        return False, 0.0
+    elif exponent >= 0:
+        value = float(mantissa) * powers_of_ten[exponent]
+    else:
+        value = float(mantissa) / powers_of_ten[-exponent]
+
+    return True, -value if negative else value
+
+
+@jit
+def _parse_defect_list_block(
+    buffer: np.ndarray,
+    token_indexes: np.ndarray,
+    is_int: np.ndarray,
+    slots: np.ndarray,
+    number_of_floats: int,
+    number_of_ints: int,
+    custom_token_indexes: np.ndarray,
+    powers_of_ten: np.ndarray,
+):
+    size = buffer.shape[0]
+    number_of_lines = 1
+    for position in range(size):
+        if buffer[position] == 10:
+            number_of_lines += 1
+
+    max_token_index = -1
+    for token_index in token_indexes:
+        max_token_index = max(max_token_index, token_index)
+    for token_index in custom_token_indexes:
+        max_token_index = max(max_token_index, token_index)
+
+    float_values = np.zeros((number_of_floats, number_of_lines), np.float64)
+    int_values = np.zeros((number_of_ints, number_of_lines), np.int64)
+    custom_spans = np.zeros(
+        (custom_token_indexes.shape[0], number_of_lines, 2), np.int64
+    )
+    line_spans = np.zeros((number_of_lines, 2), np.int64)
+    fallback = np.zeros(number_of_lines, np.bool_)
+    token_starts = np.zeros(max_token_index + 1, np.int64)
+    token_ends = np.zeros(max_token_index + 1, np.int64)
+
+    row = 0
+    line_start = 0
+    while line_start < size:
+        line_end = line_start
+        while line_end < size and buffer[line_end] != 10:
+            line_end += 1
+
+        # like the python reader, only lines starting with a space hold a defect
+        if line_end > line_start and buffer[line_start] == 32:
+            line_spans[row, 0] = line_start
+            line_spans[row, 1] = line_end
+
+            number_of_tokens = 0
+            position = line_start
+            while position < line_end:
+                byte = buffer[position]
+                if byte == 59:  # ;
+                    break
+                if byte >= 128:
+                    fallback[row] = True
+                    break
+                if _is_space(byte):
+                    position += 1
+                    continue
+
+                token_start = position
+                while position < line_end:
+                    byte = buffer[position]
+                    if byte == 59 or _is_space(byte):
+                        break
+                    if byte >= 128:
+                        fallback[row] = True
+                    position += 1
+
+                if number_of_tokens <= max_token_index:
+                    token_starts[number_of_tokens] = token_start
+                    token_ends[number_of_tokens] = position
+                number_of_tokens += 1
+
+                # the tokens after the last needed one are never read
+                if number_of_tokens > max_token_index:
+                    break
+
+            if number_of_tokens <= max_token_index:
+                fallback[row] = True
+
+            if not fallback[row]:
+                for column in range(token_indexes.shape[0]):
+                    token_index = token_indexes[column]
+                    if token_index < 0:
+                        continue
+
+                    start = token_starts[token_index]
+                    end = token_ends[token_index]
+                    if is_int[column]:
+                        parsed, int_value = _parse_int(buffer, start, end)
+                        int_values[slots[column], row] = int_value
+                    else:
+                        parsed, float_value = _parse_float(
+                            buffer, start, end, powers_of_ten
+                        )
+                        float_values[slots[column], row] = float_value
+
+                    if not parsed:
+                        fallback[row] = True
+                        break
+
+                for column in range(custom_token_indexes.shape[0]):
+                    token_index = custom_token_indexes[column]
+                    custom_spans[column, row, 0] = token_starts[token_index]
+                    custom_spans[column, row, 1] = token_ends[token_index]
+
+            row += 1
+
+        line_start = line_end + 1
+
+    return (
+        float_values[:, :row],
+        int_values[:, :row],
+        custom_spans[:, :row],
+        line_spans[:row],
+        fallback[:row],
+    )
+
+
+def is_supported(defect_columns: Dict[str, int]) -> bool:
+    """check if the numba engine can read a DefectList
+
+    Args:
+        defect_columns (Dict[str, int]): DefectRecordSpec position of each raw defect column
+
+    Returns:
+        bool: True if numba is installed and every required column is defined
+    """
+
+    return NUMBA_AVAILABLE and all(
+        column in defect_columns
+        for column, (_, _, is_required) in RAW_DEFECT_COLUMNS.items()
+        if is_required
+    )
+
+
+def read_defect_list(
+    defect_list: Union[bytes, memoryview],
+    defect_columns: Dict[str, int],
+    defect_columns_custom: Dict[str, int],
+    custom_columns_types: Dict[str, type] = None,
+) -> Tuple[Dict[str, np.ndarray], Dict[str, Union[List[str], np.ndarray]]]:
+    """parse the rows of a DefectList block in a single compiled pass
+
+    The values are identical to the ones of the python reader: numbers that
+    can not be converted exactly by the compiled parser (too many digits,
+    non ascii characters, malformed rows...) are converted again with
+    int() / float() on the row.
+
+    Args:
+        defect_list (Union[bytes, memoryview]): the lines following the DefectList keyword,
+            terminator included, it is read without copy
+        defect_columns (Dict[str, int]): DefectRecordSpec position of each raw defect column to read,
+            the other columns are filled with 0
+        defect_columns_custom (Dict[str, int]): DefectRecordSpec position of each custom column
+        custom_columns_types (Dict[str, type], optional): type of each custom column by lowercase name,
+            int and float columns are parsed with the raw columns, the other ones are
+            interned strings.
+
+    Returns:
+        Tuple[Dict[str, np.ndarray], Dict[str, Union[List[str], np.ndarray]]]: the values per table column
+            and the values per custom column
+    """
+
+    if not NUMBA_AVAILABLE:
+        raise RuntimeError("numba engine requires numba")
+
+    custom_columns_types = custom_columns_types or {}
+
+    # (column, token index, is integer) of each value parsed by the compiled pass,
+    # numeric custom columns come after the raw columns
+    layout = [
+        (table_column, defect_columns.get(column, 0) - 1, column_is_int)
+        for column, (table_column, column_is_int, _) in RAW_DEFECT_COLUMNS.items()
+    ]
+    custom_columns = []
+    for column, position in defect_columns_custom.items():
+        custom_type = custom_columns_types.get(column.lower())
+        if custom_type in (int, float):
+            layout.append((column.lower(), position - 1, custom_type is int))
+        else:
+            custom_columns.append((column, position))
+    number_of_raw_columns = len(RAW_DEFECT_COLUMNS)
+
+    token_indexes = np.array(
+        [token_index for _, token_index, _ in layout], dtype=np.int64
+    )
+    is_int = np.array([is_int for _, _, is_int in layout], dtype=np.bool_)
+    slots = np.zeros(len(layout), dtype=np.int64)
+    number_of_ints = int(is_int.sum())
+    slots[is_int] = np.arange(number_of_ints)
+    slots[~is_int] = np.arange(len(layout) - number_of_ints)
+
+    custom_token_indexes = np.array(
+        [position - 1 for _, position in custom_columns], dtype=np.int64
+    )
+
+    buffer = np.frombuffer(defect_list, dtype=np.uint8)
+    float_values, int_values, custom_spans, line_spans, fallback = (
+        _parse_defect_list_block(
+            buffer,
+            token_indexes,
+            is_int,
+            slots,
+            len(layout) - number_of_ints,
+            number_of_ints,
+            custom_token_indexes,
+            _POWERS_OF_TEN,
+        )
+    )
+
+    values = [
+        (int_values if column_is_int else float_values)[slot]
+        for (_, _, column_is_int), slot in zip(layout, slots)
+    ]
+    custom_values = {
+        column.lower(): [
+            _decode_interned(bytes(defect_list[start:end]))
+            for start, end in custom_spans[index]
+        ]
+        for index, (column, _) in enumerate(custom_columns)
+    }
+
+    for row in np.flatnonzero(fallback):
+        start, end = line_spans[row]
+        defect_parameters = bytes(defect_list[start:end]).split(b";", 1)[0].split()
+
+        for index, (_, token_index, column_is_int) in enumerate(layout):
+            if token_index < 0:
+                continue
+
+            value = defect_parameters[token_index]
+            values[index][row] = int(value) if column_is_int else float(value)
+
+        for column, position in custom_columns:
+            custom_values[column.lower()][row] = _decode_interned(
+                defect_parameters[position - 1]
+            )
+
+    columns = {
+        table_column: column_values
+        for (table_column, _, _), column_values in zip(
+            layout[:number_of_raw_columns], values
+        )
+    }
+    for (column, _, _), column_values in zip(
+        layout[number_of_raw_columns:], values[number_of_raw_columns:]
+    ):
+        custom_values[column] = column_values
+
+    return columns, custom_values
+
+
+def _decode_interned(value: bytes) -> str:
+    return sys.intern(value.decode())
@@ -0,0 +1,267 @@
+# MODULES
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+# MODELS
+from ..models.defect_filter import DefectFilter
+from ..models.defect_table import DefectTable
+from ..models.klarf_content import KlarfContent
+
+# READERS
+from ..readers import klarf_file_reader
+from ..readers.klarf_parser import OBJECT_DEFECTS_FORMATS, convert_columnar_wafers
+
+# approximate memory of a Defect dataclass with its attributes
+APPROXIMATE_DEFECT_SIZE = 600
+APPROXIMATE_WAFER_SIZE = 2048
+
+# files of the directory: MAGIC, a json line with CACHE_VERSION and the key, then the pickle
+MAGIC = b"KLARFCACHE"
+CACHE_VERSION = 1
+# maximum size of the json line, a longer one is not a cache entry
+MAX_HEADER_SIZE = 1 << 16
+
+
+@dataclass
+class KlarfCacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    number_of_entries: int = 0
+    size: int = 0
+
+
+class KlarfCache:
+    """cache of parsed klarf files, opt-in through Klarf.load_from_file(cache=...)
+
+    Entries are keyed by the path, size and modification time of the file and
+    by the parse options. The memory tier is a LRU bounded by the approximate
+    size of the cached contents. With a directory, contents are also written
+    there as pickled DefectTable (a few numpy buffers per wafer) and loaded
+    back on a memory miss, stale files of the directory are never read again
+    but are not deleted.
+
+    Cached contents are shared between calls and must not be modified.
+
+    The directory is a trust boundary: its files are unpickled, and unpickling
+    a file crafted by someone else can run arbitrary code. It must only be
+    writable by the users running the cache. Each file starts with the cache
+    version and the key of its entry, checked before anything is unpickled,
+    which only keeps stale, foreign or colliding files from being loaded and
+    does not make an untrusted directory safe.
+    """
+
+    def __init__(self, max_size: int = 512 * 1024**2, directory: Path = None) -> None:
+        self.max_size = max_size
+        self.directory = directory
+
+        self._entries: "OrderedDict[Tuple, Tuple[KlarfContent, int]]" = OrderedDict()
+        self._stats = KlarfCacheStats()
+        self._lock = threading.Lock()
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def stats(self) -> KlarfCacheStats:
+        with self._lock:
+            return KlarfCacheStats(**vars(self._stats))
+
+    def clear(self) -> None:
+        """forget the contents of the memory tier, counters are kept"""
+
+        with self._lock:
+            self._entries.clear()
+            self._stats.number_of_entries = 0
+            self._stats.size = 0
+
+    def load(
+        self,
+        filepath: Path,
+        custom_columns_wafer: Union[List[str], Dict[str, type]] = None,
+        custom_columns_defect: Union[List[str], Dict[str, type]] = None,
+        parse_summary: bool = True,
+        defects_format: str = "objects",
+        engine: str = "python",
+        defect_filter: DefectFilter = None,
+        defect_columns: List[str] = None,
+    ) -> KlarfContent:
+        """get the content of a klarf file from the cache, parse it on a miss
+
+        Args:
+            filepath (Path): the path of the klarf file
+            engine (str, optional): engine used on a miss, it is not part of the key
+                since both engines give the same content. Defaults to "python".
+
+        Returns:
+            KlarfContent: the content of the klarf as a dataclass
+        """
+
+        if not os.path.exists(filepath):
+            raise Exception(f"{filepath=} does not exists")
+
+        stat = os.stat(filepath)
+        key = (
+            os.path.abspath(filepath),
+            stat.st_size,
+            stat.st_mtime_ns,
+            _get_custom_columns_key(custom_columns_wafer),
+            _get_custom_columns_key(custom_columns_defect),
+            parse_summary,
+            defects_format,
+            defect_filter,
+            tuple(defect_columns) if defect_columns is not None else None,
+        )
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return entry[0]
+
+        klarf_content = self._load_from_directory(key=key)
+        if klarf_content is not None:
+            with self._lock:
+                self._stats.disk_hits += 1
+        else:
+            with self._lock:
+                self._stats.misses += 1
+
+            klarf_content, _ = klarf_file_reader.readKlarf(
+                klarf=filepath,
+                custom_columns_wafer=custom_columns_wafer,
+                custom_columns_defect=custom_columns_defect,
+                parse_summary=parse_summary,
+                defects_format=(
+                    "columnar"
+                    if self.directory is not None
+                    and defects_format in OBJECT_DEFECTS_FORMATS
+                    else defects_format
+                ),
+                engine=engine,
+                defect_filter=defect_filter,
+                defect_columns=defect_columns,
+                with_raw_content=False,
+            )
+            self._save_to_directory(key=key, klarf_content=klarf_content)
+
+        klarf_content.wafers = convert_columnar_wafers(
+            wafers=klarf_content.wafers, defects_format=defects_format
+        )
+
+        self._add_entry(key=key, klarf_content=klarf_content)
+
+        return klarf_content
+
+    def _add_entry(self, key: Tuple, klarf_content: KlarfContent) -> None:
+        size = get_approximate_size(klarf_content=klarf_content)
+        if size > self.max_size:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                return
+
+            self._entries[key] = (klarf_content, size)
+            self._stats.size += size
+
+            while self._stats.size > self.max_size:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._stats.size -= evicted_size
+                self._stats.evictions += 1
+
+            self._stats.number_of_entries = len(self._entries)
+
+    def _get_cache_path(self, key: Tuple) -> Path:
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+
+        return Path(self.directory) / f"{digest}.pickle"
+
+    def _load_from_directory(self, key: Tuple) -> KlarfContent:
+        if self.directory is None:
+            return None
+
+        cache_path = self._get_cache_path(key=key)
+        if not os.path.exists(cache_path):
+            return None
+
+        try:
+            with open(cache_path, "rb") as f:
+                # the header is checked before unpickling anything
+                if f.read(len(MAGIC)) != MAGIC:
+                    return None
+
+                header = json.loads(f.readline(MAX_HEADER_SIZE))
+                if header != _get_header(key=key):
+                    return None
+
+                return pickle.load(f)
+        except Exception:
+            # a truncated or incompatible file is parsed again
+            return None
+
+    def _save_to_directory(self, key: Tuple, klarf_content: KlarfContent) -> None:
+        if self.directory is None:
+            return
+
+        cache_path = self._get_cache_path(key=key)
+        temporary_path = Path(f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+        with open(temporary_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(json.dumps(_get_header(key=key)).encode() + b"\n")
+            pickle.dump(klarf_content, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, cache_path)
+
+
+def _get_header(key: Tuple) -> Dict:
+    return {"version": CACHE_VERSION, "key": repr(key)}
+
+
+def _get_custom_columns_key(custom_columns: Union[List[str], Dict[str, type]]) -> Tuple:
+    # a schema is keyed with its types, the same columns are parsed differently
+    if isinstance(custom_columns, dict):
+        return tuple(
+            (column, custom_type.__name__)
+            for column, custom_type in custom_columns.items()
+        )
+
+    return tuple(custom_columns or [])
+
+
+def get_approximate_size(klarf_content: KlarfContent) -> int:
+    """estimate the memory used by the wafers of a klarf content
+
+    Args:
+        klarf_content (KlarfContent): the content of the klarf
+
+    Returns:
+        int: the approximate size in bytes
+    """
+
+    size = 0
+    for wafer in klarf_content.wafers:
+        size += APPROXIMATE_WAFER_SIZE
+
+        if isinstance(wafer.defects, DefectTable):
+            size += sum(
+                values.nbytes
+                for values in vars(wafer.defects).values()
+                if hasattr(values, "nbytes")
+            )
+            size += sum(
+                values.nbytes for values in wafer.defects.custom_attribute.values()
+            )
+        elif isinstance(wafer.defects, list):
+            size += len(wafer.defects) * APPROXIMATE_DEFECT_SIZE
+
+    return size
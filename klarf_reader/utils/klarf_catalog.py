@@ -0,0 +1,331 @@
+# MODULES
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple, Union
+
+# MODELS
+from ..models.klarf_content import KlarfContent, SetupId
+
+# READERS
+from ..readers.klarf_batch_reader import iterKlarfs
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    error TEXT,
+    file_version REAL,
+    file_timestamp TEXT,
+    result_timestamp TEXT,
+    inspection_station_id TEXT,
+    sample_type TEXT,
+    sample_size INTEGER,
+    lot_id TEXT,
+    device_id TEXT,
+    setup_id TEXT,
+    setup_date TEXT,
+    step_id TEXT,
+    number_of_wafers INTEGER
+);
+CREATE TABLE IF NOT EXISTS wafers (
+    path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    wafer_id TEXT,
+    slot INTEGER,
+    number_of_defects INTEGER,
+    defect_density REAL,
+    number_of_dies INTEGER,
+    number_of_def_dies INTEGER,
+    PRIMARY KEY (path, position)
+);
+CREATE INDEX IF NOT EXISTS files_lot_id ON files(lot_id);
+CREATE INDEX IF NOT EXISTS files_step_id ON files(step_id);
+CREATE INDEX IF NOT EXISTS files_device_id ON files(device_id);
+CREATE INDEX IF NOT EXISTS files_setup_id ON files(setup_id);
+CREATE INDEX IF NOT EXISTS wafers_wafer_id ON wafers(wafer_id);
+"""
+
+
+@dataclass
+class KlarfCatalogUpdate:
+    number_of_scanned: int = 0
+    number_of_unchanged: int = 0
+    errors: Dict[Path, Exception] = field(default_factory=lambda: {})
+
+
+class KlarfCatalog:
+    """sqlite catalog of the header and wafers of klarf files
+
+    update only scans the files whose size or modification time changed
+    since they were cataloged, with a header-only read (DefectList blocks are
+    skipped) in a pool of processes. The header values, the id, slot and
+    SummaryList of each wafer are stored in indexed tables, so that finding
+    the files or wafers of a lot, step, device or setup does not open any
+    klarf file. Wafers are the ones of Klarf.load_from_file, deduplicated on
+    Wafer.id. Files that can not be read are cataloged with their error and
+    scanned again once changed.
+    """
+
+    def __init__(self, database: Union[Path, str] = ":memory:") -> None:
+        self.database = database
+
+        self._connection = sqlite3.connect(database)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.executescript(SCHEMA)
+
+    def __enter__(self) -> "KlarfCatalog":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def update(
+        self, filepaths: Iterable[Path], workers: int = None
+    ) -> KlarfCatalogUpdate:
+        """catalog new files and scan again the changed ones
+
+        Args:
+            filepaths (Iterable[Path]): the paths of the klarf files
+            workers (int, optional): number of processes, os.cpu_count() when missing, 1 to scan in the calling process
+
+        Returns:
+            KlarfCatalogUpdate: the number of scanned and unchanged files, the errors by path
+        """
+
+        update = KlarfCatalogUpdate()
+        cataloged = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in self._connection.execute(
+                "SELECT path, size, mtime_ns FROM files"
+            )
+        }
+
+        stats: Dict[str, os.stat_result] = {}
+        for filepath in filepaths:
+            path = os.path.abspath(filepath)
+            try:
+                stat = os.stat(path)
+            except OSError as error:
+                update.errors[Path(path)] = error
+                continue
+
+            if cataloged.get(path) == (stat.st_size, stat.st_mtime_ns):
+                update.number_of_unchanged += 1
+            else:
+                stats[path] = stat
+
+        with self._connection:
+            for result in iterKlarfs(
+                klarfs=list(stats),
+                workers=workers,
+                ordered=False,
+                defects_format="skip",
+            ):
+                path = result.path
+                self._connection.execute("DELETE FROM files WHERE path = ?", (path,))
+
+                update.number_of_scanned += 1
+                if result.is_success:
+                    self._insert_file(
+                        path=path, stat=stats[path], klarf_content=result.klarf_content
+                    )
+                else:
+                    update.errors[Path(path)] = result.error
+                    self._connection.execute(
+                        "INSERT INTO files (path, size, mtime_ns, error) VALUES (?, ?, ?, ?)",
+                        (
+                            path,
+                            stats[path].st_size,
+                            stats[path].st_mtime_ns,
+                            repr(result.error),
+                        ),
+                    )
+
+        return update
+
+    def prune(self) -> int:
+        """forget the files that do not exist anymore
+
+        Returns:
+            int: the number of forgotten files
+        """
+
+        missing = [
+            (path,)
+            for (path,) in self._connection.execute("SELECT path FROM files")
+            if not os.path.exists(path)
+        ]
+
+        with self._connection:
+            self._connection.executemany("DELETE FROM files WHERE path = ?", missing)
+
+        return len(missing)
+
+    def find_files(
+        self,
+        lot_id: Union[str, List[str]] = None,
+        step_id: Union[str, List[str]] = None,
+        device_id: Union[str, List[str]] = None,
+        setup_id: Union[str, List[str]] = None,
+        wafer_id: Union[str, List[str]] = None,
+    ) -> List[Path]:
+        """paths of the cataloged files matching every given value, a list matches any of its values
+
+        Returns:
+            List[Path]: the paths in alphabetical order
+        """
+
+        conditions, parameters = _get_conditions(
+            lot_id=lot_id, step_id=step_id, device_id=device_id, setup_id=setup_id
+        )
+        if wafer_id is not None:
+            wafer_conditions, wafer_parameters = _get_conditions(
+                column_prefix="wafers.", wafer_id=wafer_id
+            )
+            conditions.append(
+                f"files.path IN (SELECT path FROM wafers WHERE {' AND '.join(wafer_conditions)})"
+            )
+            parameters.extend(wafer_parameters)
+
+        rows = self._connection.execute(
+            f"SELECT files.path FROM files WHERE {' AND '.join(conditions)} ORDER BY files.path",
+            parameters,
+        )
+
+        return [Path(path) for (path,) in rows]
+
+    def find_wafers(
+        self,
+        lot_id: Union[str, List[str]] = None,
+        step_id: Union[str, List[str]] = None,
+        device_id: Union[str, List[str]] = None,
+        setup_id: Union[str, List[str]] = None,
+        wafer_id: Union[str, List[str]] = None,
+    ) -> List[Tuple[Path, str]]:
+        """wafers of the cataloged files matching every given value, a list matches any of its values
+
+        Returns:
+            List[Tuple[Path, str]]: the path of the file and the id of each wafer, in file then wafer order
+        """
+
+        conditions, parameters = _get_conditions(
+            lot_id=lot_id, step_id=step_id, device_id=device_id, setup_id=setup_id
+        )
+        if wafer_id is not None:
+            wafer_conditions, wafer_parameters = _get_conditions(
+                column_prefix="wafers.", wafer_id=wafer_id
+            )
+            conditions.extend(wafer_conditions)
+            parameters.extend(wafer_parameters)
+
+        rows = self._connection.execute(
+            f"""SELECT files.path, wafers.wafer_id FROM wafers
+            JOIN files ON files.path = wafers.path
+            WHERE {' AND '.join(conditions)}
+            ORDER BY files.path, wafers.position""",
+            parameters,
+        )
+
+        return [(Path(path), wafer_id) for path, wafer_id in rows]
+
+    def get_wafer_rows(self, path: Path) -> List[Dict]:
+        """cataloged values of the wafers of a file
+
+        Args:
+            path (Path): the path of the file
+
+        Returns:
+            List[Dict]: the columns of each wafer, in wafer order
+        """
+
+        cursor = self._connection.execute(
+            "SELECT * FROM wafers WHERE path = ? ORDER BY position",
+            (os.path.abspath(path),),
+        )
+        columns = [description[0] for description in cursor.description]
+
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def _insert_file(
+        self, path: str, stat: os.stat_result, klarf_content: KlarfContent
+    ) -> None:
+        setup_id = klarf_content.setup_id
+        inspection_station_id = klarf_content.inspection_station_id
+        self._connection.execute(
+            "INSERT INTO files VALUES (?, ?, ?, NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                path,
+                stat.st_size,
+                stat.st_mtime_ns,
+                klarf_content.file_version,
+                klarf_content.file_timestamp,
+                klarf_content.result_timestamp,
+                (
+                    " ".join(
+                        (
+                            inspection_station_id.mfg,
+                            inspection_station_id.model,
+                            inspection_station_id.id,
+                        )
+                    )
+                    if inspection_station_id is not None
+                    else None
+                ),
+                klarf_content.sample_type,
+                klarf_content.sample_size,
+                klarf_content.lot_id,
+                klarf_content.device_id,
+                setup_id.name if isinstance(setup_id, SetupId) else setup_id,
+                setup_id.date if isinstance(setup_id, SetupId) else None,
+                klarf_content.step_id,
+                klarf_content.number_of_wafers,
+            ),
+        )
+
+        self._connection.executemany(
+            "INSERT INTO wafers VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    path,
+                    position,
+                    wafer.id,
+                    wafer.slot,
+                    wafer.summary.number_of_defects if wafer.summary else None,
+                    wafer.summary.defect_density if wafer.summary else None,
+                    wafer.summary.number_of_dies if wafer.summary else None,
+                    wafer.summary.number_of_def_dies if wafer.summary else None,
+                )
+                for position, wafer in enumerate(klarf_content.wafers)
+            ],
+        )
+
+
+def _get_conditions(
+    column_prefix: str = "files.", **values: Union[str, List[str]]
+) -> Tuple[List[str], List]:
+    # sql conditions and their parameters, a list of values matches any of them
+    conditions, parameters = ["1"], []
+    for column, value in values.items():
+        if value is None:
+            continue
+
+        if isinstance(value, (list, tuple, set)):
+            value = list(value)
+            conditions.append(
+                f"{column_prefix}{column} IN ({', '.join('?' * len(value))})"
+            )
+            parameters.extend(value)
+        else:
+            conditions.append(f"{column_prefix}{column} = ?")
+            parameters.append(value)
+
+    return conditions, parameters
@@ -0,0 +1,258 @@
+# MODULES
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Tuple, Union
+
+import numpy as np
+
+# MODELS
+from ..models.defect_filter import DefectFilter
+from ..models.defect_table import DefectTable
+from ..models.klarf_content import (
+    Defect,
+    DiePitch,
+    KlarfContent,
+    SingleKlarfContent,
+    Wafer,
+)
+
+# READERS
+from ..readers.klarf_file_reader import iterKlarf
+
+# (x_min, y_min, x_max, y_max) in the unit of the coordinates, a 300 mm wafer in micrometers
+DEFAULT_WAFER_EXTENT = (-150_000.0, -150_000.0, 150_000.0, 150_000.0)
+
+# columns needed to fold a wafer
+STACK_DEFECT_COLUMNS = ["DEFECTID", "XREL", "YREL", "XINDEX", "YINDEX"]
+
+
+class KlarfStack:
+    """accumulator of the defects of many wafers in fixed-size 2D histograms
+
+    wafer_histogram[i, j] counts the defects whose point falls in the cell
+    (i, j) of wafer_extent, die_histogram[i, j] the defects whose position in
+    their die (x_rel / DiePitch.x, y_rel / DiePitch.y) falls in the cell
+    (i, j) of the unit square. The defects of a wafer are discarded once
+    folded, the memory used only depends on the number of bins. Stacks with
+    the same extent and bins can be merged, for instance the partial stacks
+    of parallel workers.
+    """
+
+    def __init__(
+        self,
+        wafer_extent: Tuple[float, float, float, float] = DEFAULT_WAFER_EXTENT,
+        wafer_bins: Tuple[int, int] = (300, 300),
+        die_bins: Tuple[int, int] = (100, 100),
+    ) -> None:
+        self.wafer_extent = tuple(float(value) for value in wafer_extent)
+        self.wafer_histogram = np.zeros(tuple(wafer_bins), dtype=np.int64)
+        self.die_histogram = np.zeros(tuple(die_bins), dtype=np.int64)
+
+        self.number_of_wafers = 0
+        self.number_of_defects = 0
+        self.number_of_defects_out_of_extent = 0
+
+    def add_wafer(self, wafer: Wafer, die_pitch: DiePitch) -> None:
+        """fold the defects of a wafer
+
+        Args:
+            wafer (Wafer): the wafer, its defects as a list or a DefectTable with their coordinates
+            die_pitch (DiePitch): the die pitch of the klarf of the wafer
+        """
+
+        if die_pitch is None:
+            raise ValueError("die-relative stacking needs the DiePitch of the klarf")
+
+        x, y, x_rel, y_rel = _get_coordinates(defects=wafer.defects)
+
+        self.number_of_defects_out_of_extent += _fold(
+            histogram=self.wafer_histogram, x=x, y=y, extent=self.wafer_extent
+        )
+        _fold(
+            histogram=self.die_histogram,
+            x=x_rel / die_pitch.x,
+            y=y_rel / die_pitch.y,
+            extent=(0.0, 0.0, 1.0, 1.0),
+        )
+
+        self.number_of_wafers += 1
+        self.number_of_defects += len(x)
+
+    def add_klarf_content(
+        self, klarf_content: Union[KlarfContent, SingleKlarfContent]
+    ) -> None:
+        """fold the wafers of a klarf content, or the wafer of a streamed one
+
+        Args:
+            klarf_content (Union[KlarfContent, SingleKlarfContent]): the content
+        """
+
+        wafers = (
+            [klarf_content.wafer]
+            if isinstance(klarf_content, SingleKlarfContent)
+            else klarf_content.wafers
+        )
+
+        for wafer in wafers:
+            self.add_wafer(wafer=wafer, die_pitch=klarf_content.die_pitch)
+
+    def add_file(
+        self,
+        filepath: Path,
+        engine: str = "python",
+        defect_filter: DefectFilter = None,
+    ) -> None:
+        """stream a klarf file one wafer at a time and fold each wafer
+
+        Only the columns needed by the stack are converted, every wafer section
+        is folded (without deduplication on Wafer.id).
+
+        Args:
+            filepath (Path): the path of the klarf file
+            engine (str, optional): "python" or "numba". Defaults to "python".
+            defect_filter (DefectFilter, optional): condition on the defects to stack
+        """
+
+        for single_klarf_content in iterKlarf(
+            klarf=filepath,
+            parse_summary=False,
+            defects_format="columnar",
+            engine=engine,
+            defect_filter=defect_filter,
+            defect_columns=STACK_DEFECT_COLUMNS,
+        ):
+            self.add_klarf_content(klarf_content=single_klarf_content)
+
+    def add_files(
+        self,
+        filepaths: Iterable[Path],
+        workers: int = 1,
+        engine: str = "python",
+        defect_filter: DefectFilter = None,
+    ) -> None:
+        """fold klarf files, in a pool of processes merging their partial stacks
+
+        Args:
+            filepaths (Iterable[Path]): the paths of the klarf files
+            workers (int, optional): number of processes, 1 to fold in the calling process. Defaults to 1.
+            engine (str, optional): "python" or "numba". Defaults to "python".
+            defect_filter (DefectFilter, optional): condition on the defects to stack
+        """
+
+        filepaths = list(filepaths)
+
+        if workers == 1:
+            for filepath in filepaths:
+                self.add_file(
+                    filepath=filepath, engine=engine, defect_filter=defect_filter
+                )
+            return
+
+        # one partial stack per worker, each one folds a share of the files
+        shares = [filepaths[index::workers] for index in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for stack in executor.map(
+                _stack_files,
+                [self.get_empty_copy() for _ in shares],
+                shares,
+                [engine] * workers,
+                [defect_filter] * workers,
+            ):
+                self.merge(stack)
+
+    def get_empty_copy(self) -> "KlarfStack":
+        """a stack with the same extent and bins, without defects"""
+
+        return KlarfStack(
+            wafer_extent=self.wafer_extent,
+            wafer_bins=self.wafer_histogram.shape,
+            die_bins=self.die_histogram.shape,
+        )
+
+    def merge(self, other: "KlarfStack") -> None:
+        """add the counts of another stack
+
+        Args:
+            other (KlarfStack): a stack with the same extent and bins
+        """
+
+        if (
+            other.wafer_extent != self.wafer_extent
+            or other.wafer_histogram.shape != self.wafer_histogram.shape
+            or other.die_histogram.shape != self.die_histogram.shape
+        ):
+            raise ValueError(
+                f"Stacks not compatible (current={self.wafer_extent, self.wafer_histogram.shape, self.die_histogram.shape} | other={other.wafer_extent, other.wafer_histogram.shape, other.die_histogram.shape})"
+            )
+
+        self.wafer_histogram += other.wafer_histogram
+        self.die_histogram += other.die_histogram
+        self.number_of_wafers += other.number_of_wafers
+        self.number_of_defects += other.number_of_defects
+        self.number_of_defects_out_of_extent += other.number_of_defects_out_of_extent
+
+
+def _stack_files(
+    stack: KlarfStack,
+    filepaths: List[Path],
+    engine: str,
+    defect_filter: DefectFilter,
+) -> KlarfStack:
+    for filepath in filepaths:
+        stack.add_file(filepath=filepath, engine=engine, defect_filter=defect_filter)
+
+    return stack
+
+
+def _get_coordinates(
+    defects: Union[List[Defect], DefectTable],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # x, y, x_rel and y_rel of the defects
+    if isinstance(defects, DefectTable):
+        if defects.x is None:
+            raise ValueError(
+                "stacking needs the coordinates of the defects (XREL, YREL, XINDEX and YINDEX)"
+            )
+
+        return defects.x, defects.y, defects.x_rel, defects.y_rel
+
+    defects = list(defects)
+    if any(defect.point is None for defect in defects):
+        raise ValueError(
+            "stacking needs the coordinates of the defects (XREL, YREL, XINDEX and YINDEX)"
+        )
+
+    return tuple(
+        np.fromiter(values, np.float64, len(defects))
+        for values in (
+            (defect.point[0] for defect in defects),
+            (defect.point[1] for defect in defects),
+            (defect.x_rel for defect in defects),
+            (defect.y_rel for defect in defects),
+        )
+    )
+
+
+def _fold(
+    histogram: np.ndarray,
+    x: np.ndarray,
+    y: np.ndarray,
+    extent: Tuple[float, float, float, float],
+) -> int:
+    # add the points to the histogram with a single bincount, return the number of points outside of extent
+    x_min, y_min, x_max, y_max = extent
+    x_bins, y_bins = histogram.shape
+
+    with np.errstate(invalid="ignore"):
+        i = np.floor((x - x_min) / (x_max - x_min) * x_bins)
+        j = np.floor((y - y_min) / (y_max - y_min) * y_bins)
+
+    # the upper bounds belong to the last cells
+    i[x == x_max] = x_bins - 1
+    j[y == y_max] = y_bins - 1
+
+    inside = (i >= 0) & (i < x_bins) & (j >= 0) & (j < y_bins)
+    cells = i[inside].astype(np.int64) * y_bins + j[inside].astype(np.int64)
+    histogram += np.bincount(cells, minlength=histogram.size).reshape(histogram.shape)
+
+    return len(x) - int(np.count_nonzero(inside))
@@ -0,0 +1,22 @@
+from importlib.util import find_spec
+
+# numba itself is imported by the first compiled function, it costs ~0.4s and ~85MB
+NUMBA_AVAILABLE = find_spec("numba") is not None
+
+
+def jit(function):
+    """compile function with numba when available, return it untouched otherwise
+
+    Args:
+        function (Callable): a function written in the numba nopython subset
+
+    Returns:
+        Callable: the compiled function or the python function
+    """
+
+    if not NUMBA_AVAILABLE:
+        return function
+
+    from numba import njit
+
+    return njit(cache=True, nogil=True)(function)
@@ -11,7 +11,7 @@ setup(
         "klarf_reader.readers",
         "klarf_reader.utils",
     ],
-    install_requires=["numba"],
+    install_requires=["numba", "numpy"],
     license="MIT",
     author="Maxime MARTIN",
     author_email="maxime.martin02@hotmail.fr",
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# the package and the synthetic klarf generator of the benchmarks
+sys.path[:0] = [str(ROOT), str(ROOT / "benchmarks")]
@@ -0,0 +1,168 @@
+# MODULES
+from dataclasses import fields
+
+import numpy as np
+import pytest
+
+# MODELS
+from klarf_reader.models.defect_table import DefectTable
+from klarf_reader.models.klarf_content import BasicKlarfContent, KlarfContent
+
+# READERS
+from klarf_reader.readers.klarf_binary_reader import readKlarfBinary, writeKlarfBinary
+from klarf_reader.readers.klarf_file_reader import readKlarf
+
+from synthetic import generate_klarf
+
+CUSTOM_COLUMNS = ["ADC", "REVIEWS", "CATEGORY"]
+
+WAFER_FIELDS = [
+    "id",
+    "slot",
+    "die_origin",
+    "sample_center_location",
+    "tests",
+    "custom_attribute",
+    "summary",
+]
+
+
+@pytest.fixture(scope="module")
+def klarf(tmp_path_factory):
+    return generate_klarf(
+        path=tmp_path_factory.mktemp("klarf") / "synthetic.klarf",
+        number_of_wafers=3,
+        number_of_defects=200,
+        custom_columns=CUSTOM_COLUMNS,
+        sample_test_plan_size=12,
+    )
+
+
+def round_trip(klarf_content: KlarfContent, path, defects_format: str) -> KlarfContent:
+    writeKlarfBinary(klarf_content=klarf_content, path=path)
+
+    return readKlarfBinary(path=path, defects_format=defects_format)
+
+
+def assert_same_content(expected: KlarfContent, actual: KlarfContent) -> None:
+    for field in fields(BasicKlarfContent):
+        assert getattr(actual, field.name) == getattr(expected, field.name), field.name
+
+    assert [wafer.id for wafer in actual.wafers] == [
+        wafer.id for wafer in expected.wafers
+    ]
+    for expected_wafer, actual_wafer in zip(expected.wafers, actual.wafers):
+        for name in WAFER_FIELDS:
+            assert getattr(actual_wafer, name) == getattr(expected_wafer, name), name
+
+        if isinstance(expected_wafer.defects, DefectTable):
+            assert_same_table(expected_wafer.defects, actual_wafer.defects)
+        else:
+            assert actual_wafer.defects == expected_wafer.defects
+
+
+def assert_same_table(expected: DefectTable, actual: DefectTable) -> None:
+    assert isinstance(actual, DefectTable)
+    assert len(actual) == len(expected)
+
+    for field in fields(DefectTable):
+        if field.name == "custom_attribute":
+            continue
+
+        expected_values = getattr(expected, field.name)
+        actual_values = getattr(actual, field.name)
+        if expected_values is None:
+            assert actual_values is None, field.name
+        else:
+            assert actual_values.dtype == expected_values.dtype, field.name
+            np.testing.assert_array_equal(actual_values, expected_values, field.name)
+
+    assert list(actual.custom_attribute) == list(expected.custom_attribute)
+    for column, values in expected.custom_attribute.items():
+        np.testing.assert_array_equal(actual.custom_attribute[column], values, column)
+
+
+@pytest.mark.parametrize("defects_format", ["objects", "columnar", "compact"])
+@pytest.mark.parametrize(
+    "custom_columns_defect",
+    [None, ["ADC", "CATEGORY"], {"ADC": float, "REVIEWS": int, "CATEGORY": str}],
+    ids=["no_custom_columns", "custom_columns_list", "custom_columns_schema"],
+)
+def test_round_trip(klarf, tmp_path, defects_format, custom_columns_defect):
+    expected, _ = readKlarf(
+        klarf=klarf,
+        custom_columns_defect=custom_columns_defect,
+        defects_format=defects_format,
+        with_raw_content=False,
+    )
+
+    actual = round_trip(
+        klarf_content=expected,
+        path=tmp_path / "synthetic.kbin",
+        defects_format=defects_format,
+    )
+
+    assert_same_content(expected=expected, actual=actual)
+
+
+def test_round_trip_custom_columns_types(klarf, tmp_path):
+    schema = {"ADC": float, "REVIEWS": int, "CATEGORY": str}
+    expected, _ = readKlarf(
+        klarf=klarf,
+        custom_columns_defect=schema,
+        defects_format="columnar",
+        with_raw_content=False,
+    )
+
+    actual = round_trip(
+        klarf_content=expected,
+        path=tmp_path / "synthetic.kbin",
+        defects_format="columnar",
+    )
+
+    for wafer in actual.wafers:
+        custom_attribute = wafer.defects.custom_attribute
+        assert custom_attribute["adc"].dtype == np.float64
+        assert custom_attribute["reviews"].dtype == np.int64
+        assert all(value.startswith("P") for value in custom_attribute["category"])
+
+
+@pytest.mark.parametrize("defects_format", ["objects", "columnar", "compact"])
+def test_round_trip_projection(klarf, tmp_path, defects_format):
+    expected, _ = readKlarf(
+        klarf=klarf,
+        defects_format=defects_format,
+        defect_columns=["XREL", "YREL", "XINDEX", "YINDEX", "CLASSNUMBER"],
+        with_raw_content=False,
+    )
+
+    actual = round_trip(
+        klarf_content=expected,
+        path=tmp_path / "synthetic.kbin",
+        defects_format=defects_format,
+    )
+
+    assert_same_content(expected=expected, actual=actual)
+
+    defects = actual.wafers[0].defects
+    if defects_format == "columnar":
+        assert defects.d_size is None and defects.x is not None
+    else:
+        assert defects[0].d_size is None and defects[0].point is not None
+
+
+def test_round_trip_defects_as_generator(klarf, tmp_path):
+    expected, _ = readKlarf(klarf=klarf, with_raw_content=False)
+    klarf_content, _ = readKlarf(
+        klarf=klarf, defects_as_generator=True, with_raw_content=False
+    )
+
+    actual = round_trip(
+        klarf_content=klarf_content,
+        path=tmp_path / "synthetic.kbin",
+        defects_format="objects",
+    )
+
+    # the consumed generators are replaced by the defects that were written
+    assert_same_content(expected=expected, actual=klarf_content)
+    assert_same_content(expected=expected, actual=actual)
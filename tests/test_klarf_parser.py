@@ -0,0 +1,370 @@
+# MODULES
+import gzip
+from dataclasses import astuple
+from typing import List
+
+import pytest
+
+# MODELS
+from klarf_reader.models.klarf_content import (
+    CompactWafer,
+    Defect,
+    DieOrigin,
+    DiePitch,
+    InspectionStationId,
+    KlarfContent,
+    SampleCenterLocation,
+    SamplePlanTest,
+    SetupId,
+    SlottedDefect,
+    Summary,
+    Test as KlarfTest,
+    Wafer,
+)
+
+# READERS
+from klarf_reader.readers.klarf_file_reader import readKlarf
+from klarf_reader.readers.klarf_index_reader import buildKlarfIndex
+from klarf_reader.readers.klarf_parser import KlarfParser
+
+KLARF = """FileVersion 1 1;
+FileTimestamp 01-02-23 12:34:56;
+InspectionStationID "KLA" "2835" "TOOL1";
+SampleType WAFER;
+ResultTimestamp 01-02-23 12:35:00;
+LotID "LOT1";
+SampleSize 1 300;
+DeviceID "DEV1";
+SetupID "SETUP1" 01-02-23 10:00:00;
+StepID "STEP1";
+SampleOrientationMarkType NOTCH;
+OrientationMarkLocation DOWN;
+DiePitch 1.0e+04 1.2e+04;
+DieOrigin 0.0 0.0;
+SampleTestPlan 3
+ 0 0
+ 1 1
+ 2 0;
+RegionCount 7 8;
+WaferID "W01";
+Slot 1;
+SampleCenterLocation 1.5e+05 1.45e+05;
+InspectionTest 1;
+AreaPerTest 7.0e+10;
+DefectRecordSpec 18 DEFECTID XREL YREL XINDEX YINDEX XSIZE YSIZE DEFECTAREA DSIZE CLASSNUMBER TEST CLUSTERNUMBER ROUGHBINNUMBER FINEBINNUMBER REVIEWSAMPLE IMAGECOUNT ADC_CONF PATCHID;
+DefectList
+ 1 10.5 20.25 1 2 0.5 0.75 0.375 1.5 3 1 0 4 5 0 1 0.25 P1
+ 2 2000.125 300.5 3 4 1.25 2.5 3.125 2.0 7 1 2 6 8 1 2 0.5 P2
+ 3 9999.75 11999.5 0 0 4.0 4.5 18.0 4.25 12 1 0 9 99 0 1 1.0 P3;
+SummarySpec 5 TESTNO NDEFECT DEFDENSITY NDIE NDEFDIE;
+SummaryList
+ 1 3 0.5 600 2;
+WaferID "W02";
+Slot 2;
+SampleCenterLocation 1.4e+05 1.5e+05;
+InspectionTest 1;
+AreaPerTest 6.5e+10;
+DefectRecordSpec 18 DEFECTID XREL YREL XINDEX YINDEX XSIZE YSIZE DEFECTAREA DSIZE CLASSNUMBER TEST CLUSTERNUMBER ROUGHBINNUMBER FINEBINNUMBER REVIEWSAMPLE IMAGECOUNT ADC_CONF PATCHID;
+DefectList
+ 1 500.5 600.25 10 11 0.25 0.5 0.125 0.75 1 1 0 1 2 0 1 0.75 P4;
+SummarySpec 5 TESTNO NDEFECT DEFDENSITY NDIE NDEFDIE;
+SummaryList
+ 1 1 0.25 600 1;
+EndOfFile;
+"""
+
+DIE_PITCH = DiePitch(x=1.0e04, y=1.2e04)
+
+# DEFECTID XREL YREL XINDEX YINDEX XSIZE YSIZE DEFECTAREA DSIZE CLASSNUMBER TEST
+# CLUSTERNUMBER ROUGHBINNUMBER FINEBINNUMBER IMAGECOUNT ADC_CONF PATCHID of each wafer
+# fmt: off
+DEFECT_ROWS = {
+    "W01": [
+        (1, 10.5, 20.25, 1, 2, 0.5, 0.75, 0.375, 1.5, 3, 1, 0, 4, 5, 1, "0.25", "P1"),
+        (2, 2000.125, 300.5, 3, 4, 1.25, 2.5, 3.125, 2.0, 7, 1, 2, 6, 8, 2, "0.5", "P2"),
+        (3, 9999.75, 11999.5, 0, 0, 4.0, 4.5, 18.0, 4.25, 12, 1, 0, 9, 99, 1, "1.0", "P3"),
+    ],
+    "W02": [
+        (1, 500.5, 600.25, 10, 11, 0.25, 0.5, 0.125, 0.75, 1, 1, 0, 1, 2, 1, "0.75", "P4"),
+    ],
+}
+# fmt: on
+
+
+def get_expected_defects(
+    wafer_id: str, sample_center_location: SampleCenterLocation, custom_types: dict
+) -> List[Defect]:
+    return [
+        Defect(
+            id=row[0],
+            x_rel=row[1],
+            y_rel=row[2],
+            x_index=row[3],
+            y_index=row[4],
+            x_size=row[5],
+            y_size=row[6],
+            area=row[7],
+            d_size=row[8],
+            class_number=row[9],
+            test_id=row[10],
+            cluster_number=row[11],
+            roughbin=row[12],
+            finebin=row[13],
+            image_count=row[14],
+            point=(
+                row[3] * DIE_PITCH.x + row[1] - sample_center_location.x,
+                row[4] * DIE_PITCH.y + row[2] - sample_center_location.y,
+            ),
+            custom_attribute={
+                column: custom_type(value)
+                for (column, custom_type), value in zip(custom_types.items(), row[15:])
+            },
+        )
+        for row in DEFECT_ROWS[wafer_id]
+    ]
+
+
+def get_expected_content(custom_types: dict, region_count) -> KlarfContent:
+    wafers = []
+    for wafer_id, slot, sample_center_location, area, summary in [
+        (
+            "W01",
+            1,
+            SampleCenterLocation(x=1.5e05, y=1.45e05),
+            7.0e10,
+            Summary(
+                defect_density=0.5,
+                number_of_defects=3,
+                number_of_dies=600,
+                number_of_def_dies=2,
+            ),
+        ),
+        (
+            "W02",
+            2,
+            SampleCenterLocation(x=1.4e05, y=1.5e05),
+            6.5e10,
+            Summary(
+                defect_density=0.25,
+                number_of_defects=1,
+                number_of_dies=600,
+                number_of_def_dies=1,
+            ),
+        ),
+    ]:
+        wafers.append(
+            Wafer(
+                id=wafer_id,
+                slot=slot,
+                die_origin=DieOrigin(x=0.0, y=0.0),
+                sample_center_location=sample_center_location,
+                defects=get_expected_defects(
+                    wafer_id=wafer_id,
+                    sample_center_location=sample_center_location,
+                    custom_types=custom_types,
+                ),
+                tests=[KlarfTest(id=1, area=area)],
+                custom_attribute={"RegionCount": region_count},
+                summary=summary,
+            )
+        )
+
+    return KlarfContent(
+        file_version=1.1,
+        file_timestamp="01-02-23 12:34:56",
+        sample_type="WAFER",
+        inspection_station_id=InspectionStationId(mfg="KLA", model="2835", id="TOOL1"),
+        result_timestamp="01-02-23 12:35:00",
+        lot_id="LOT1",
+        device_id="DEV1",
+        sample_size=300,
+        setup_id=SetupId(name="SETUP1", date="01-02-23 10:00:00"),
+        step_id="STEP1",
+        sample_orientation_mark_type="NOTCH",
+        orientation_mark_location="DOWN",
+        die_pitch=DIE_PITCH,
+        has_sample_test_plan=True,
+        sample_plan_test=SamplePlanTest(x=[0, 1, 2], y=[0, 1, 0]),
+        wafers=wafers,
+    )
+
+
+# custom columns given as names keep raw strings, a schema converts them
+CUSTOM_COLUMNS = [
+    (
+        ["RegionCount"],
+        ["ADC_CONF", "PATCHID"],
+        {"adc_conf": str, "patchid": str},
+        "7",
+    ),
+    (
+        {"RegionCount": int},
+        {"ADC_CONF": float, "PATCHID": str},
+        {"adc_conf": float, "patchid": str},
+        [7, 8],
+    ),
+]
+
+
+def parse(data: bytes, chunks: List[int], **options) -> KlarfContent:
+    # feed data to a parser cut at each position of chunks
+    parser = KlarfParser(**options)
+
+    start = 0
+    for end in [*chunks, len(data)]:
+        parser.feed(data=data[start:end])
+        start = end
+
+    parser.close()
+
+    return KlarfContent(**parser.header, wafers=parser.pop_wafers())
+
+
+def get_data(line_break: str) -> bytes:
+    return KLARF.replace("\n", line_break).encode()
+
+
+@pytest.mark.parametrize("line_break", ["\n", "\r\n"], ids=["lf", "crlf"])
+@pytest.mark.parametrize(
+    "custom_columns_wafer, custom_columns_defect, custom_types, region_count",
+    CUSTOM_COLUMNS,
+    ids=["custom_columns_list", "custom_columns_schema"],
+)
+def test_parse_split_at_every_position(
+    line_break, custom_columns_wafer, custom_columns_defect, custom_types, region_count
+):
+    data = get_data(line_break=line_break)
+    expected = get_expected_content(
+        custom_types=custom_types, region_count=region_count
+    )
+
+    for position in range(len(data) + 1):
+        content = parse(
+            data=data,
+            chunks=[position],
+            custom_columns_wafer=custom_columns_wafer,
+            custom_columns_defect=custom_columns_defect,
+        )
+
+        assert content == expected, f"split at {position}"
+
+
+@pytest.mark.parametrize("line_break", ["\n", "\r\n"], ids=["lf", "crlf"])
+@pytest.mark.parametrize("engine", ["python", "numba"])
+def test_parse_columnar_byte_by_byte(line_break, engine):
+    data = get_data(line_break=line_break)
+    custom_columns_wafer, custom_columns_defect, custom_types, region_count = (
+        CUSTOM_COLUMNS[1]
+    )
+    expected = get_expected_content(
+        custom_types=custom_types, region_count=region_count
+    )
+
+    content = parse(
+        data=data,
+        chunks=list(range(1, len(data))),
+        custom_columns_wafer=custom_columns_wafer,
+        custom_columns_defect=custom_columns_defect,
+        defects_format="columnar",
+        engine=engine,
+    )
+
+    for wafer in content.wafers:
+        wafer.defects = list(wafer.defects)
+
+    assert content == expected
+
+
+@pytest.mark.parametrize("line_break", ["\n", "\r\n"], ids=["lf", "crlf"])
+def test_read_klarf(tmp_path, line_break):
+    path = tmp_path / "fixture.klarf"
+    path.write_bytes(get_data(line_break=line_break))
+    custom_columns_wafer, custom_columns_defect, custom_types, region_count = (
+        CUSTOM_COLUMNS[0]
+    )
+
+    content, raw_content = readKlarf(
+        klarf=path,
+        custom_columns_wafer=custom_columns_wafer,
+        custom_columns_defect=custom_columns_defect,
+    )
+
+    assert content == get_expected_content(
+        custom_types=custom_types, region_count=region_count
+    )
+    assert list(raw_content) == KLARF.splitlines(keepends=True)
+
+
+@pytest.mark.parametrize("compression", [None, gzip], ids=["mapped", "gzip"])
+def test_raw_content_sections(tmp_path, compression):
+    data = get_data(line_break="\n")
+    path = tmp_path / "fixture.klarf"
+    path.write_bytes(data if compression is None else compression.compress(data))
+
+    _, raw_content = readKlarf(klarf=path)
+
+    with raw_content:
+        # the offsets recorded while parsing are the ones of a header-only scan
+        assert raw_content.index == buildKlarfIndex(path)
+        assert bytes(raw_content.get_header()) == data[: data.index(b"WaferID")]
+
+        sections = [
+            (wafer_id, bytes(section))
+            for wafer_id, section in raw_content.iter_wafers()
+        ]
+        assert [wafer_id for wafer_id, _ in sections] == ["W01", "W02"]
+        assert (
+            b"".join(section for _, section in sections)
+            == data[data.index(b"WaferID") : data.index(b"EndOfFile")]
+        )
+        assert bytes(raw_content.get_defect_list(wafer_id="W02")) == (
+            b"DefectList\n 1 500.5 600.25 10 11 0.25 0.5 0.125 0.75 1 1 0 1 2 0 1 0.75 P4;\n"
+        )
+
+    if compression is None:
+        assert raw_content.buffer.closed
+
+
+@pytest.mark.parametrize("engine", ["python", "numba"])
+def test_parse_compact(engine):
+    data = get_data(line_break="\n")
+    custom_columns_wafer, custom_columns_defect, custom_types, region_count = (
+        CUSTOM_COLUMNS[1]
+    )
+    expected = get_expected_content(
+        custom_types=custom_types, region_count=region_count
+    )
+
+    content = parse(
+        data=data,
+        chunks=[],
+        custom_columns_wafer=custom_columns_wafer,
+        custom_columns_defect=custom_columns_defect,
+        defects_format="compact",
+        engine=engine,
+    )
+
+    assert all(isinstance(wafer, CompactWafer) for wafer in content.wafers)
+    # equal records share one frozen object
+    assert content.wafers[0].die_origin is content.wafers[1].die_origin
+
+    for expected_wafer, wafer in zip(expected.wafers, content.wafers):
+        assert wafer.id == expected_wafer.id
+        assert astuple(wafer.die_origin) == astuple(expected_wafer.die_origin)
+        assert astuple(wafer.sample_center_location) == astuple(
+            expected_wafer.sample_center_location
+        )
+        assert wafer.summary == expected_wafer.summary
+        assert all(isinstance(defect, SlottedDefect) for defect in wafer.defects)
+        assert not hasattr(wafer.defects[0], "__dict__")
+        assert [astuple(defect) for defect in wafer.defects] == [
+            astuple(defect) for defect in expected_wafer.defects
+        ]
+
+
+def test_parse_without_summary():
+    content = parse(data=get_data(line_break="\n"), chunks=[], parse_summary=False)
+
+    assert [wafer.id for wafer in content.wafers] == ["W01", "W02"]
+    assert all(wafer.summary is None for wafer in content.wafers)
+    assert [len(wafer.defects) for wafer in content.wafers] == [3, 1]
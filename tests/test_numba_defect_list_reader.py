@@ -0,0 +1,153 @@
+# MODULES
+import random
+
+import numpy as np
+import pytest
+
+# MODELS
+from klarf_reader.models.defect_table import DEFECT_TABLE_COLUMNS
+
+# READERS
+from klarf_reader.readers.klarf_file_reader import readKlarfBuffer
+
+pytest.importorskip("numba")
+
+HEADER = """FileVersion 1 1;
+FileTimestamp 01-02-23 12:34:56;
+InspectionStationID "KLA" "2835" "TOOL1";
+SampleType WAFER;
+ResultTimestamp 01-02-23 12:35:00;
+LotID "LOT1";
+SampleSize 1 300;
+DeviceID "DEV1";
+SetupID "SETUP1" 01-02-23 10:00:00;
+StepID "STEP1";
+SampleOrientationMarkType NOTCH;
+OrientationMarkLocation DOWN;
+DiePitch 1.0e+04 1.2e+04;
+DieOrigin 0.0 0.0;
+WaferID "W01";
+Slot 1;
+SampleCenterLocation 1.5e+05 1.45e+05;
+InspectionTest 1;
+AreaPerTest 7.0e+10;
+DefectRecordSpec 18 DEFECTID XREL YREL XINDEX YINDEX XSIZE YSIZE DEFECTAREA DSIZE CLASSNUMBER TEST CLUSTERNUMBER ROUGHBINNUMBER FINEBINNUMBER REVIEWSAMPLE IMAGECOUNT ADC_CONF COUNT;
+DefectList
+"""
+
+# decimals where a fast path can round differently from float(): long mantissas,
+# exponents, signed zeros, values around 2**53, subnormal and huge values
+FLOATS = [
+    "0.1",
+    "0.3",
+    "-0.0",
+    "+0.0",
+    "0",
+    "-0",
+    "1.",
+    ".5",
+    "-.25",
+    "+1.5",
+    "2.5e+03",
+    "2.5E-03",
+    "1e22",
+    "1e23",
+    "1e-22",
+    "1e-23",
+    "7.0e+10",
+    "4.9e-324",
+    "1.7976931348623157e308",
+    "0.1000000000000000055511151231257827",
+    "3.141592653589793238462643383279",
+    "123456789012345678901234567890",
+    "0.000000000000000000000000000123456789",
+    "9007199254740991",
+    "9007199254740992",
+    "9007199254740993",
+    "9007199254740993.0",
+    "-9007199254740993.5",
+    "900719925474099.3",
+    "90071992547409.93",
+    "4503599627370497.5",
+    "18014398509481985",
+    "999999999999999999",
+    "1000000000000000000",
+    "0.99999999999999999",
+    "12345.678901234567890",
+    "-1234.5e-10",
+    "5e-1",
+    "00000.000000001",
+]
+
+INTEGERS = [
+    "0",
+    "-0",
+    "+7",
+    "-42",
+    "9007199254740991",
+    "9007199254740993",
+    "-9007199254740993",
+    "999999999999999999",
+    "9223372036854775807",
+]
+
+
+def generate_defect_list(number_of_defects: int, seed: int = 0) -> bytes:
+    rand = random.Random(seed)
+    rows = []
+    for defect_index in range(number_of_defects):
+        values = [str(defect_index + 1)]
+        values += [rand.choice(FLOATS), rand.choice(FLOATS)]
+        values += [rand.choice(INTEGERS), rand.choice(INTEGERS)]
+        values += [rand.choice(FLOATS) for _ in range(4)]
+        values += [rand.choice(INTEGERS) for _ in range(7)]
+        values += [rand.choice(FLOATS), rand.choice(INTEGERS)]
+        rows.append(" " + " ".join(values))
+
+    return (HEADER + "\n".join(rows) + ";\nEndOfFile;\n").encode()
+
+
+def assert_bit_identical(expected: np.ndarray, actual: np.ndarray, column: str):
+    assert actual.dtype == expected.dtype, column
+    assert np.array_equal(actual, expected, equal_nan=True), column
+    # -0.0 == 0.0, the bits tell the signed zeros apart
+    assert np.array_equal(actual.view(np.int64), expected.view(np.int64)), column
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_numba_engine_is_bit_identical(seed):
+    buffer = generate_defect_list(number_of_defects=500, seed=seed)
+    options = dict(
+        custom_columns_defect={"ADC_CONF": float, "COUNT": int},
+        defects_format="columnar",
+    )
+
+    expected = readKlarfBuffer(buffer=buffer, engine="python", **options)
+    actual = readKlarfBuffer(buffer=buffer, engine="numba", **options)
+
+    expected_defects = expected.wafers[0].defects
+    actual_defects = actual.wafers[0].defects
+    assert len(actual_defects) == len(expected_defects) == 500
+
+    for column in DEFECT_TABLE_COLUMNS:
+        assert_bit_identical(
+            expected=getattr(expected_defects, column),
+            actual=getattr(actual_defects, column),
+            column=column,
+        )
+
+    for column, values in expected_defects.custom_attribute.items():
+        assert_bit_identical(
+            expected=values,
+            actual=actual_defects.custom_attribute[column],
+            column=column,
+        )
+
+
+def test_numba_engine_objects_are_identical():
+    buffer = generate_defect_list(number_of_defects=200)
+
+    expected = readKlarfBuffer(buffer=buffer, engine="python")
+    actual = readKlarfBuffer(buffer=buffer, engine="numba")
+
+    assert repr(actual.wafers[0].defects) == repr(expected.wafers[0].defects)